@@ -20,10 +20,20 @@ def build_exe():
         "--hidden-import", "src.ui.tool_bar", 
         "--hidden-import", "src.ui.property_panel",
         "--hidden-import", "src.ui.canvas3d",
+        "--hidden-import", "src.ui.camera3d",
+        "--hidden-import", "src.ui.rasterizer3d",
+        "--hidden-import", "src.ui.grid3d",
         # 管理器模块
         "--hidden-import", "src.managers.drawing_manager",
         "--hidden-import", "src.managers.drawing_manager3d",
         "--hidden-import", "src.managers.file_manager",
+        "--hidden-import", "src.managers.binary_format",
+        "--hidden-import", "src.managers.project_stream",
+        "--hidden-import", "src.managers.progressive_loader",
+        "--hidden-import", "src.managers.autosave_manager",
+        "--hidden-import", "src.managers.spatial_index",
+        "--hidden-import", "src.managers.viewport",
+        "--hidden-import", "src.managers.tile_cache",
         # 2D 图形模块
         "--hidden-import", "src.shapes.base_shape",
         "--hidden-import", "src.shapes.point",
@@ -34,6 +44,7 @@ def build_exe():
         "--hidden-import", "src.shapes.bezier_curve",
         "--hidden-import", "src.shapes.brush_stroke",
         "--hidden-import", "src.shapes.image",
+        "--hidden-import", "src.shapes.image_cache",
         # 3D 图形模块
         "--hidden-import", "src.shapes3d.base_shape3d",
         "--hidden-import", "src.shapes3d.point3d",
@@ -42,6 +53,7 @@ def build_exe():
         "--hidden-import", "src.shapes3d.cone3d",
         "--hidden-import", "src.shapes3d.pyramid3d",
         "--hidden-import", "src.shapes3d.vector3d",
+        "--hidden-import", "src.shapes3d.transform3d",
         "--add-data", "src;src",  # 将src目录包含到exe中
         "--windowed"         # 隐藏控制台窗口
     ]
@@ -1,5 +1,19 @@
 # 管理器模块初始化文件
-from .drawing_manager import DrawingManager
-from .file_manager import FileManager
+# 管理器类按需导入：二进制格式、流式读取等纯数据模块可以在没有 PIL / Tk 的环境中单独使用
+import importlib
 
-__all__ = ['DrawingManager', 'FileManager']
\ No newline at end of file
+_EXPORTS = {
+    'DrawingManager': 'drawing_manager',
+    'FileManager': 'file_manager',
+}
+
+__all__ = ['DrawingManager', 'FileManager']
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
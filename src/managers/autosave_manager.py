@@ -0,0 +1,120 @@
+"""
+自动保存管理器 - 定时把文档快照写入自动保存文件
+
+Tk线程只负责获取快照（每个图形的 to_dict() 浅拷贝，点列表等与图形结构共享，
+图形修改时采用写时复制，因此快照不会再被改动）；编码和“临时文件+重命名”的原子写入
+都在后台线程完成，保存期间编辑不会卡顿。
+"""
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from .file_manager import FileManager, write_project_data
+
+
+class AutosaveManager:
+    """自动保存管理器类"""
+
+    def __init__(self, root, file_manager: FileManager,
+                 get_snapshot: Callable[[], Dict[str, Any]],
+                 interval_ms: int = 60000,
+                 on_saved: Optional[Callable[[str, Optional[Exception]], None]] = None):
+        self.root = root
+        self.file_manager = file_manager
+        self.get_snapshot = get_snapshot
+        self.interval_ms = interval_ms
+        self.on_saved = on_saved
+
+        self.enabled = True
+        self.saved_change_count = 0  # 最近一次自动保存对应的修改计数
+        self.last_autosave_path = None
+        self._after_id = None
+        self._thread = None
+        self._result = None  # 后台线程写入，Tk线程轮询读取
+        self._discard_pending = False  # 写入期间请求了删除，写入结束后再删
+
+    def start(self):
+        """启动定时自动保存"""
+        self.stop()
+        self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        """停止定时自动保存（正在进行的写入会继续完成）"""
+        if self._after_id:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def is_saving(self) -> bool:
+        """后台是否正在写入"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def autosave_now(self) -> bool:
+        """立即触发一次自动保存，返回是否启动了后台写入"""
+        if not self.enabled or self.is_saving():
+            return False
+        file_manager = self.file_manager
+        if not file_manager.is_file_modified() or file_manager.change_count == self.saved_change_count:
+            return False
+
+        snapshot = self.get_snapshot()
+        path = file_manager.get_autosave_path(snapshot.get('mode', '2D'))
+        self._result = None
+        self._thread = threading.Thread(target=self._write,
+                                        args=(snapshot, path, file_manager.change_count),
+                                        daemon=True)
+        self._thread.start()
+        self.root.after(100, self._poll)
+        return True
+
+    def discard(self):
+        """文档已正式保存后删除过期的自动保存文件
+
+        后台正在写入时先记下请求，写入结束后删除刚写好的文件。
+        """
+        if self.is_saving():
+            self._discard_pending = True
+            return
+        self._discard_pending = False
+        if not self.last_autosave_path:
+            return
+        try:
+            if os.path.exists(self.last_autosave_path):
+                os.remove(self.last_autosave_path)
+        except OSError as e:
+            print(f"删除自动保存文件失败: {e}")
+        self.last_autosave_path = None
+
+    def _tick(self):
+        """定时回调"""
+        self._after_id = self.root.after(self.interval_ms, self._tick)
+        self.autosave_now()
+
+    def _write(self, snapshot: Dict[str, Any], path: str, change_count: int):
+        """后台线程：编码并原子写入快照"""
+        try:
+            write_project_data(path, snapshot)
+            self._result = (path, change_count, None)
+        except Exception as e:
+            self._result = (path, change_count, e)
+
+    def _poll(self):
+        """Tk线程轮询后台写入结果"""
+        if self.is_saving():
+            self.root.after(100, self._poll)
+            return
+
+        self._thread = None
+        if self._result is None:
+            return
+        path, change_count, error = self._result
+        self._result = None
+        if error:
+            print(f"自动保存失败: {error}")
+        else:
+            self.saved_change_count = change_count
+            self.last_autosave_path = path
+        if self._discard_pending:
+            # 写入期间文档已正式保存，这份自动保存已经过期
+            self.discard()
+        if self.on_saved:
+            self.on_saved(path, error)
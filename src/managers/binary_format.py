@@ -0,0 +1,392 @@
+"""
+二进制项目格式 - 紧凑的带版本号二进制容器，与JSON格式并存
+
+文件结构（小端序）:
+    头部      : 魔数 b'GDSB' | u16 格式版本 | u16 标志位 | u32 字符串数 | u32 类型数 | u32 图形数
+    字符串表  : 每项 u32 字节长度 + UTF-8 字节（颜色、键名等重复字符串只存一次）
+    类型表    : 每项 u32 字符串索引（图形类型名）
+    文档元数据: 一个编码后的值（顶层字典中除 shapes 以外的部分）
+    图形记录  : 每项 u16 类型索引 + u32 记录字节长度 + 编码后的字段字典
+
+数值字段直接按 i64/f64 打包；点列表、喷雾散点等同构数值元组列表存为类型化数组；
+颜色等字符串列表存为字符串表索引数组；铅笔纹理这类字典列表按键集合分组后按列存储，
+每一列再递归使用类型化数组。
+"""
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterator, List, Tuple
+
+MAGIC = b'GDSB'
+FORMAT_VERSION = 1
+BINARY_EXTENSION = '.gdsb'
+
+# 值类型标签
+TAG_NONE = 0
+TAG_TRUE = 1
+TAG_FALSE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_STR = 5
+TAG_LIST = 6
+TAG_DICT = 7
+TAG_NUM_ARRAY = 8
+TAG_RECORD_ARRAY = 9
+TAG_BIG_INT = 10
+TAG_STR_ARRAY = 11
+
+_HEADER = struct.Struct('<4sHHIII')
+_U8 = struct.Struct('<B')
+_U32 = struct.Struct('<I')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_RECORD_HEADER = struct.Struct('<HI')
+_ARRAY_HEADER = struct.Struct('<BIB')  # 元素类型码, 元素个数, 元组宽度(0表示标量)
+
+_I64_MIN = -(1 << 63)
+_I64_MAX = (1 << 63) - 1
+_NEEDS_BYTESWAP = sys.byteorder != 'little'
+
+
+class BinaryFormatError(ValueError):
+    """二进制项目文件损坏或版本不受支持"""
+
+
+class _Encoder:
+    """值编码器，负责字符串驻留与类型化数组识别"""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.string_index: Dict[str, int] = {}
+
+    def intern(self, text: str) -> int:
+        """返回字符串在字符串表中的索引"""
+        index = self.string_index.get(text)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(text)
+            self.string_index[text] = index
+        return index
+
+    def encode(self, value: Any, out: bytearray):
+        """将任意JSON兼容值编码到输出缓冲区"""
+        if value is None:
+            out += _U8.pack(TAG_NONE)
+        elif value is True:
+            out += _U8.pack(TAG_TRUE)
+        elif value is False:
+            out += _U8.pack(TAG_FALSE)
+        elif isinstance(value, int):
+            if _I64_MIN <= value <= _I64_MAX:
+                out += _U8.pack(TAG_INT)
+                out += _I64.pack(value)
+            else:
+                out += _U8.pack(TAG_BIG_INT)
+                out += _U32.pack(self.intern(str(value)))
+        elif isinstance(value, float):
+            out += _U8.pack(TAG_FLOAT)
+            out += _F64.pack(value)
+        elif isinstance(value, str):
+            out += _U8.pack(TAG_STR)
+            out += _U32.pack(self.intern(value))
+        elif isinstance(value, dict):
+            out += _U8.pack(TAG_DICT)
+            out += _U32.pack(len(value))
+            for key, item in value.items():
+                out += _U32.pack(self.intern(str(key)))
+                self.encode(item, out)
+        elif isinstance(value, (list, tuple)):
+            if (not self._encode_num_array(value, out) and not self._encode_str_array(value, out)
+                    and not self._encode_record_array(value, out)):
+                out += _U8.pack(TAG_LIST)
+                out += _U32.pack(len(value))
+                for item in value:
+                    self.encode(item, out)
+        else:
+            raise TypeError(f"无法编码的值类型: {type(value).__name__}")
+
+    def _encode_num_array(self, values, out: bytearray) -> bool:
+        """尝试把同构数值列表（或定长数值元组列表）编码为类型化数组"""
+        if not values:
+            return False
+
+        first = values[0]
+        if isinstance(first, (list, tuple)):
+            width = len(first)
+            if width == 0 or width > 255:
+                return False
+            flat = []
+            for item in values:
+                if not isinstance(item, (list, tuple)) or len(item) != width:
+                    return False
+                flat.extend(item)
+        else:
+            width = 0
+            flat = values
+
+        # 只有全部元素同为 int 或同为 float 时才用类型化数组，混合列表按普通列表保存，
+        # 避免整数被提升为浮点数
+        number_class = flat[0].__class__
+        if number_class is int:
+            typecode = 'q'
+            for number in flat:
+                if number.__class__ is not int or not _I64_MIN <= number <= _I64_MAX:
+                    return False
+        elif number_class is float:
+            typecode = 'd'
+            for number in flat:
+                if number.__class__ is not float:
+                    return False
+        else:
+            return False
+
+        data = array(typecode, flat)
+        if _NEEDS_BYTESWAP:
+            data.byteswap()
+        out += _U8.pack(TAG_NUM_ARRAY)
+        out += _ARRAY_HEADER.pack(ord(typecode), len(flat), width)
+        out += data.tobytes()
+        return True
+
+    def _encode_str_array(self, values, out: bytearray) -> bool:
+        """尝试把字符串列表编码为字符串表索引数组"""
+        if len(values) < 2 or not all(item.__class__ is str for item in values):
+            return False
+
+        data = array('I', [self.intern(item) for item in values])
+        if _NEEDS_BYTESWAP:
+            data.byteswap()
+        out += _U8.pack(TAG_STR_ARRAY)
+        out += _U32.pack(len(data))
+        out += data.tobytes()
+        return True
+
+    def _encode_record_array(self, values, out: bytearray) -> bool:
+        """尝试把字典列表按列编码（按键集合分组为若干模式，行顺序由模式编号列保存）"""
+        # 空字典没有任何列，解码时无法还原出行，这类列表按普通列表保存
+        if len(values) < 2 or not all(isinstance(item, dict) and item for item in values):
+            return False
+
+        schemas: List[Tuple[str, ...]] = []
+        schema_index: Dict[Tuple[str, ...], int] = {}
+        row_schemas = []
+        for item in values:
+            keys = tuple(item.keys())
+            index = schema_index.get(keys)
+            if index is None:
+                index = len(schemas)
+                schemas.append(keys)
+                schema_index[keys] = index
+            row_schemas.append(index)
+
+        out += _U8.pack(TAG_RECORD_ARRAY)
+        out += _U32.pack(len(values))
+        out += _U32.pack(len(schemas))
+        for keys in schemas:
+            out += _U32.pack(len(keys))
+            for key in keys:
+                out += _U32.pack(self.intern(str(key)))
+        self.encode(row_schemas, out)
+        for index, keys in enumerate(schemas):
+            rows = [item for item, row_schema in zip(values, row_schemas) if row_schema == index]
+            for key in keys:
+                self.encode([item[key] for item in rows], out)
+        return True
+
+
+class _Decoder:
+    """值解码器，基于 memoryview 与预编译 Struct 顺序读取"""
+
+    def __init__(self, buffer, strings: List[str]):
+        self.buffer = buffer
+        self.strings = strings
+
+    def decode(self, pos: int) -> Tuple[Any, int]:
+        """从指定位置解码一个值，返回 (值, 新位置)"""
+        buffer = self.buffer
+        tag = buffer[pos]
+        pos += 1
+
+        if tag == TAG_FLOAT:
+            return _F64.unpack_from(buffer, pos)[0], pos + 8
+        if tag == TAG_INT:
+            return _I64.unpack_from(buffer, pos)[0], pos + 8
+        if tag == TAG_STR:
+            return self.strings[_U32.unpack_from(buffer, pos)[0]], pos + 4
+        if tag == TAG_NONE:
+            return None, pos
+        if tag == TAG_TRUE:
+            return True, pos
+        if tag == TAG_FALSE:
+            return False, pos
+        if tag == TAG_DICT:
+            count = _U32.unpack_from(buffer, pos)[0]
+            pos += 4
+            result = {}
+            strings = self.strings
+            for _ in range(count):
+                key = strings[_U32.unpack_from(buffer, pos)[0]]
+                result[key], pos = self.decode(pos + 4)
+            return result, pos
+        if tag == TAG_LIST:
+            count = _U32.unpack_from(buffer, pos)[0]
+            pos += 4
+            result = []
+            for _ in range(count):
+                item, pos = self.decode(pos)
+                result.append(item)
+            return result, pos
+        if tag == TAG_NUM_ARRAY:
+            typecode, count, width = _ARRAY_HEADER.unpack_from(buffer, pos)
+            pos += _ARRAY_HEADER.size
+            data = array(chr(typecode))
+            end = pos + count * data.itemsize
+            data.frombytes(buffer[pos:end])
+            if _NEEDS_BYTESWAP:
+                data.byteswap()
+            if width:
+                return list(zip(*[iter(data)] * width)), end
+            return data.tolist(), end
+        if tag == TAG_RECORD_ARRAY:
+            count, schema_count = struct.unpack_from('<II', buffer, pos)
+            pos += 8
+            strings = self.strings
+            schemas = []
+            for _ in range(schema_count):
+                key_count = _U32.unpack_from(buffer, pos)[0]
+                pos += 4
+                keys = [strings[index] for index in struct.unpack_from(f'<{key_count}I', buffer, pos)]
+                pos += 4 * key_count
+                schemas.append(keys)
+            row_schemas, pos = self.decode(pos)
+            schema_rows = []
+            for keys in schemas:
+                columns = []
+                for _ in keys:
+                    column, pos = self.decode(pos)
+                    columns.append(column)
+                schema_rows.append(iter([dict(zip(keys, row)) for row in zip(*columns)]))
+            return [next(schema_rows[index]) for index in row_schemas], pos
+        if tag == TAG_STR_ARRAY:
+            count = _U32.unpack_from(buffer, pos)[0]
+            pos += 4
+            data = array('I')
+            end = pos + count * data.itemsize
+            data.frombytes(buffer[pos:end])
+            if _NEEDS_BYTESWAP:
+                data.byteswap()
+            return list(map(self.strings.__getitem__, data)), end
+        if tag == TAG_BIG_INT:
+            return int(self.strings[_U32.unpack_from(buffer, pos)[0]]), pos + 4
+
+        raise BinaryFormatError(f"未知的值类型标签: {tag}")
+
+
+def encode_document(data: Dict[str, Any]) -> bytes:
+    """将项目文档（含 shapes 列表的字典）编码为二进制字节串"""
+    encoder = _Encoder()
+    shapes = data.get('shapes', [])
+    metadata = {key: value for key, value in data.items() if key != 'shapes'}
+
+    # 图形类型表
+    type_names: List[str] = []
+    type_index: Dict[str, int] = {}
+
+    records = bytearray()
+    for shape_data in shapes:
+        type_name = str(shape_data.get('type'))
+        index = type_index.get(type_name)
+        if index is None:
+            index = len(type_names)
+            type_names.append(type_name)
+            type_index[type_name] = index
+
+        body = bytearray()
+        fields = {key: value for key, value in shape_data.items() if key != 'type'}
+        encoder.encode(fields, body)
+        records += _RECORD_HEADER.pack(index, len(body))
+        records += body
+
+    meta_bytes = bytearray()
+    encoder.encode(metadata, meta_bytes)
+    type_string_ids = [encoder.intern(name) for name in type_names]
+
+    out = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, 0,
+                                 len(encoder.strings), len(type_names), len(shapes)))
+    for text in encoder.strings:
+        raw = text.encode('utf-8')
+        out += _U32.pack(len(raw))
+        out += raw
+    for string_id in type_string_ids:
+        out += _U32.pack(string_id)
+    out += meta_bytes
+    out += records
+    return bytes(out)
+
+
+def _read_preamble(buffer) -> Tuple[List[str], List[str], Dict[str, Any], int, int]:
+    """解析头部、字符串表、类型表和元数据，返回 (字符串表, 类型表, 元数据, 图形数, 记录起始位置)"""
+    if len(buffer) < _HEADER.size:
+        raise BinaryFormatError("文件过短，不是有效的二进制项目文件")
+
+    magic, version, _flags, string_count, type_count, shape_count = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise BinaryFormatError("文件魔数不匹配，不是二进制项目文件")
+    if version > FORMAT_VERSION:
+        raise BinaryFormatError(f"不支持的二进制格式版本: {version}")
+
+    pos = _HEADER.size
+    strings = []
+    for _ in range(string_count):
+        length = _U32.unpack_from(buffer, pos)[0]
+        pos += 4
+        strings.append(bytes(buffer[pos:pos + length]).decode('utf-8'))
+        pos += length
+
+    type_names = []
+    for _ in range(type_count):
+        type_names.append(strings[_U32.unpack_from(buffer, pos)[0]])
+        pos += 4
+
+    metadata, pos = _Decoder(buffer, strings).decode(pos)
+    return strings, type_names, metadata, shape_count, pos
+
+
+def decode_preamble(buffer) -> Tuple[Dict[str, Any], int]:
+    """读取文档元数据与图形数量，不解码图形记录"""
+    _strings, _types, metadata, shape_count, _pos = _read_preamble(memoryview(buffer))
+    return metadata, shape_count
+
+
+def iter_shape_records(buffer) -> Iterator[Dict[str, Any]]:
+    """逐条解码图形记录（生成器），便于增量加载"""
+    strings, type_names, _metadata, shape_count, pos = _read_preamble(buffer)
+    decoder = _Decoder(buffer, strings)
+
+    for _ in range(shape_count):
+        type_idx, length = _RECORD_HEADER.unpack_from(buffer, pos)
+        pos += _RECORD_HEADER.size
+        shape_data = {'type': type_names[type_idx]}
+        fields, _end = decoder.decode(pos)
+        shape_data.update(fields)
+        pos += length
+        yield shape_data
+
+
+def decode_document(buffer) -> Dict[str, Any]:
+    """将二进制字节串解码为项目文档字典"""
+    buffer = memoryview(buffer)
+    _strings, _types, metadata, _count, _pos = _read_preamble(buffer)
+    data = dict(metadata)
+    data['shapes'] = list(iter_shape_records(buffer))
+    return data
+
+
+def decode_header(buffer) -> Dict[str, Any]:
+    """只解析文档元数据（不解码图形记录）"""
+    return decode_preamble(buffer)[0]
+
+
+def is_binary_data(head: bytes) -> bool:
+    """根据开头的魔数判断是否为二进制项目数据"""
+    return head[:len(MAGIC)] == MAGIC
@@ -1,17 +1,71 @@
 """
 绘图管理器 - 负责图形的创建、管理和渲染
 """
-import json
+import math
 import os
 import sys
 from typing import List, Optional, Tuple
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageTk
 
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from shapes import BaseShape, Point, Line, Rectangle, Circle, Polygon, BezierCurve, BrushStroke
 from shapes.image import Image as ImageShape
+from shapes.image_cache import read_image_size
+from .file_manager import read_project_data, write_project_data
+from .progressive_loader import ProgressiveLoader
+from .project_stream import ProjectStreamReader
+from .spatial_index import SpatialIndex
+from .viewport import Viewport, ViewCanvas, CULL_MARGIN, WORLD_EXTENT, ZOOM_STEP
+from .tile_cache import TileCache, SHAPE_PAD
+
+
+class _ShapeCanvas:
+    """画布代理：图形创建的每个画布项额外带上该图形自己的标签
+
+    这样单个图形的画布项可以单独删除、移动和调整层次，不必重绘整个场景。
+    创建的画布项ID同时记录到 items 中：Tk按ID查找是哈希表，按标签查找要遍历所有画布项。
+    其余方法原样转发给真实画布。
+    """
+    
+    def __init__(self, canvas, tags, items):
+        self._canvas = canvas
+        self._tags = tags
+        self._items = items
+        
+    def __getattr__(self, name):
+        return getattr(self._canvas, name)
+        
+    def _create(self, method, args, kwargs):
+        tags = kwargs.get('tags', ())
+        if isinstance(tags, str):
+            tags = (tags,)
+        kwargs['tags'] = tuple(tags) + self._tags
+        item = method(*args, **kwargs)
+        self._items.append(item)
+        return item
+        
+    def create_line(self, *args, **kwargs):
+        return self._create(self._canvas.create_line, args, kwargs)
+        
+    def create_rectangle(self, *args, **kwargs):
+        return self._create(self._canvas.create_rectangle, args, kwargs)
+        
+    def create_oval(self, *args, **kwargs):
+        return self._create(self._canvas.create_oval, args, kwargs)
+        
+    def create_polygon(self, *args, **kwargs):
+        return self._create(self._canvas.create_polygon, args, kwargs)
+        
+    def create_arc(self, *args, **kwargs):
+        return self._create(self._canvas.create_arc, args, kwargs)
+        
+    def create_text(self, *args, **kwargs):
+        return self._create(self._canvas.create_text, args, kwargs)
+        
+    def create_image(self, *args, **kwargs):
+        return self._create(self._canvas.create_image, args, kwargs)
 
 
 class DrawingManager:
@@ -20,7 +74,18 @@ class DrawingManager:
     def __init__(self):
         self.shapes: List[BaseShape] = []  # 所有图形列表
         self.selected_shapes: List[BaseShape] = []  # 选中的图形列表
-        self.canvas = None  # 画布引用
+        self.canvas = None  # 画布引用（按世界坐标绘制的视口代理）
+        self.raw_canvas = None  # 真实的Tk画布
+        
+        # 视口缩放；平移由画布滚动完成
+        self.viewport = Viewport()
+        self.drawn_region = None  # 上次整体重绘时绘制的世界坐标区域，区域外的图形没有画布项
+        
+        # 无限画布模式：未选中的图形渲染进缓存的瓦片图像，选中的图形照常绘制在瓦片之上
+        self.tiled_mode = False
+        self.tile_cache = TileCache(self.render_tile)
+        self.tile_items = {}  # 瓦片键 -> (画布项ID, 图像)
+        self.scroll_bounds = None  # 当前滚动区域（世界坐标）
         
         # 当前绘制状态
         self.current_tool = "select"
@@ -49,16 +114,27 @@ class DrawingManager:
         self.history = []  # 历史记录
         self.history_index = -1  # 当前历史位置
         self.max_history = 50  # 最大历史记录数
+        self.property_edit_pending = False  # 线宽滑块拖动中尚未记录的修改
         
-        # 拖拽相关
+        # 拖拽相关：拖动过程中只整体移动选择组的画布项，松开时才修改图形
         self.dragging = False
         self.drag_start_x = 0
         self.drag_start_y = 0
+        self.drag_offset_x = 0
+        self.drag_offset_y = 0
         
         # 调整大小相关
         self.resizing = False
         self.resize_handle = ""
         
+        # 框选相关：向右拖动为包含模式，向左拖动为相交模式
+        self.marquee_selecting = False
+        self.marquee_item = None
+        
+        # 按边界框索引图形，供框选查询；图形列表整体变化时标记为需要重建
+        self.spatial_index = SpatialIndex()
+        self.spatial_index_dirty = False
+        
         # 性能优化变量
         self.temp_update_throttle_ms = 16  # 约60FPS的临时图形更新频率
         self.last_temp_update_time = 0
@@ -66,6 +142,13 @@ class DrawingManager:
         # 缓存机制：避免重复绘制相同的图形
         self.shape_cache_valid = False  # 标记已绘制图形是否需要重绘
         self.last_shape_count = 0  # 上次绘制时的图形数量
+        self.shape_items = {}  # id(图形) -> 该图形的画布项ID列表
+        
+        # 渐进式加载
+        self.loader = None  # 正在进行的加载任务
+        
+        # 文档修改回调（用于修改标记和自动保存）
+        self.change_callback = None
         self.resize_shape = None
         
         # 复制粘贴
@@ -77,7 +160,17 @@ class DrawingManager:
         
     def set_canvas(self, canvas):
         """设置画布"""
-        self.canvas = canvas
+        self.raw_canvas = canvas
+        self.canvas = ViewCanvas(canvas, self.viewport)
+        
+    def set_change_callback(self, callback):
+        """设置文档修改回调"""
+        self.change_callback = callback
+        
+    def notify_change(self):
+        """通知文档已修改"""
+        if self.change_callback:
+            self.change_callback()
         
     def set_current_tool(self, tool):
         """设置当前工具"""
@@ -91,27 +184,41 @@ class DrawingManager:
     def set_current_color(self, color):
         """设置当前颜色"""
         self.current_color = color
-        # 应用到选中的图形
-        for shape in self.selected_shapes:
-            shape.set_color(color)
-        self.redraw()
+        self.apply_to_selected('color', 'set_color', color)
         
     def set_current_fill_color(self, color):
         """设置当前填充颜色"""
         self.current_fill_color = color
-        # 应用到选中的图形
-        for shape in self.selected_shapes:
-            shape.set_fill_color(color)
-        self.redraw()
+        self.apply_to_selected('fill_color', 'set_fill_color', color)
         
-    def set_current_line_width(self, width):
-        """设置当前线宽"""
+    def set_current_line_width(self, width, record=True):
+        """设置当前线宽；record为False时（滑块拖动中）暂不记录撤销状态"""
         self.current_line_width = width
-        # 应用到选中的图形
-        for shape in self.selected_shapes:
-            shape.set_line_width(width)
+        self.apply_to_selected('line_width', 'set_line_width', width, record)
+        
+    def apply_to_selected(self, attr, setter, value, record=True):
+        """把属性应用到选中的图形，只有值确实改变时才重绘并记录一次状态"""
+        changed = [shape for shape in self.selected_shapes
+                   if getattr(shape, attr, None) != value]
+        if not changed:
+            return
+        for shape in changed:
+            getattr(shape, setter)(value)
+        self.invalidate_tiles(changed)
+        if record:
+            self.property_edit_pending = False
+            self.save_state()
+        else:
+            self.property_edit_pending = True
+            self.notify_change()
         self.redraw()
         
+    def commit_property_edit(self):
+        """滑块松开时为拖动过程中的修改记录一次状态"""
+        if self.property_edit_pending:
+            self.property_edit_pending = False
+            self.save_state()
+        
     def set_current_brush_size(self, size):
         """设置当前笔刷大小"""
         self.current_brush_size = size
@@ -151,6 +258,8 @@ class DrawingManager:
                 self.handle_resize(x, y)
             elif self.dragging:
                 self.handle_drag(x, y)
+            elif self.marquee_selecting:
+                self.update_marquee(x, y)
         elif self.current_tool == "polygon" and len(self.polygon_points) > 0:
             # 多边形实时预览：显示从最后一个点到鼠标位置的临时连线
             self.draw_polygon_preview(x, y)
@@ -165,10 +274,17 @@ class DrawingManager:
         """鼠标释放事件"""
         if self.current_tool == "select":
             if self.resizing:
+                if hasattr(self.resize_shape, 'finish_resize'):
+                    self.resize_shape.finish_resize()
+                self.update_spatial_index([self.resize_shape])
                 self.resizing = False
                 self.resize_handle = ""
                 self.resize_shape = None
                 self.save_state()  # 保存状态以支持撤销
+            elif self.marquee_selecting:
+                self.finish_marquee(x, y)
+            elif self.dragging:
+                self.finish_drag()
             self.dragging = False
         elif self.current_tool.startswith("brush_") and self.current_brush_stroke:
             self.finish_brush_stroke()
@@ -194,29 +310,159 @@ class DrawingManager:
         clicked_shape = self.find_shape_at_point(x, y)
         
         if clicked_shape:
-            if clicked_shape not in self.selected_shapes:
-                self.clear_selection()
-                self.select_shape(clicked_shape)
+            if not clicked_shape.selected:
+                self.set_selection([clicked_shape])
             # 开始拖拽
             self.dragging = True
             self.drag_start_x = x
             self.drag_start_y = y
+            self.drag_offset_x = 0
+            self.drag_offset_y = 0
         else:
+            # 点击空白处开始框选
             self.clear_selection()
+            self.start_marquee(x, y)
             
     def handle_drag(self, x, y):
-        """处理拖拽"""
+        """处理拖拽：每个事件只移动一次选择组的画布项，图形本身在松开时才移动"""
         if self.selected_shapes:
             dx = x - self.drag_start_x
             dy = y - self.drag_start_y
             
-            for shape in self.selected_shapes:
-                shape.move(dx, dy)
+            if self.canvas:
+                self.canvas.move("selection_group", dx, dy)
+            self.drag_offset_x += dx
+            self.drag_offset_y += dy
                 
             self.drag_start_x = x
             self.drag_start_y = y
-            self.redraw()
             
+    def finish_drag(self):
+        """松开鼠标时把拖动的总位移提交到选中的图形"""
+        dx, dy = self.drag_offset_x, self.drag_offset_y
+        self.drag_offset_x = 0
+        self.drag_offset_y = 0
+        if not dx and not dy:
+            return
+        
+        moved = [shape for shape in self.selected_shapes if self.is_group_movable(shape)]
+        for shape in moved:
+            shape.move(dx, dy)
+        self.update_spatial_index(moved)
+        # 原本在绘制区域外（没有画布项）的图形移入区域后需要补画
+        entered = [shape for shape in moved
+                   if id(shape) not in self.shape_items and self.in_drawn_region(shape)]
+        self.redraw_shapes(entered)
+        self.restack_moved(moved)
+        self.update_visible_images()
+        self.save_state()  # 保存状态以支持撤销
+        
+    def restack_moved(self, moved):
+        """移动后的图形与其他图形产生重叠时，按绘制顺序修正层次
+        
+        画布项随选择组整体平移，组内相对层次不变；只有与组外图形重叠时才需要重绘。
+        """
+        if not self.canvas or not moved or self.tiled_mode:
+            return
+        moved_ids = {id(shape) for shape in moved}
+        index = self.get_spatial_index()
+        for shape in moved:
+            bounds = shape.get_bounds()
+            for other in index.query(*bounds):
+                if (id(other) not in moved_ids and other.visible and
+                        self._bounds_overlap(other.get_bounds(), bounds)):
+                    self.redraw_shapes(moved)
+                    return
+            
+    def start_marquee(self, x, y):
+        """开始框选"""
+        self.marquee_selecting = True
+        self.drag_start_x = x
+        self.drag_start_y = y
+        if self.canvas:
+            self.marquee_item = self.canvas.create_rectangle(x, y, x, y, outline="blue",
+                                                             width=1, tags="marquee")
+            
+    def update_marquee(self, x, y):
+        """更新框选矩形：只修改已有画布项的坐标和样式，不重绘图形"""
+        if not self.canvas or self.marquee_item is None:
+            return
+        self.canvas.coords(self.marquee_item, self.drag_start_x, self.drag_start_y, x, y)
+        if x >= self.drag_start_x:
+            self.canvas.itemconfigure(self.marquee_item, outline="blue", dash="")
+        else:
+            self.canvas.itemconfigure(self.marquee_item, outline="green", dash=(4, 2))
+            
+    def finish_marquee(self, x, y):
+        """结束框选并一次性更新选择"""
+        self.marquee_selecting = False
+        if self.canvas:
+            self.canvas.delete("marquee")
+        self.marquee_item = None
+        
+        # 几乎没有移动视为普通点击空白处
+        if abs(x - self.drag_start_x) < 3 and abs(y - self.drag_start_y) < 3:
+            return
+        
+        contain = x >= self.drag_start_x
+        shapes = self.find_shapes_in_rect(self.drag_start_x, self.drag_start_y, x, y, contain)
+        self.set_selection(shapes)
+        
+    def find_shapes_in_rect(self, x1, y1, x2, y2, contain=True) -> List[BaseShape]:
+        """查找矩形内的图形（按绘制顺序返回）
+        
+        contain 为True时要求边界框完全在矩形内，否则边界框与矩形相交即可。
+        候选图形由空间索引给出，不遍历全部图形。笔刷轨迹不可选中，不参与框选。
+        """
+        left, right = min(x1, x2), max(x1, x2)
+        top, bottom = min(y1, y2), max(y1, y2)
+        
+        found = set()
+        for shape in self.get_spatial_index().query(left, top, right, bottom):
+            if isinstance(shape, BrushStroke) or not shape.visible:
+                continue
+            sx1, sy1, sx2, sy2 = shape.get_bounds()
+            if contain:
+                hit = left <= sx1 and sx2 <= right and top <= sy1 and sy2 <= bottom
+            else:
+                hit = self._bounds_overlap((sx1, sy1, sx2, sy2), (left, top, right, bottom))
+            if hit:
+                found.add(shape)
+        
+        if not found:
+            return []
+        return [shape for shape in self.shapes if shape in found]
+        
+    @staticmethod
+    def _bounds_overlap(a, b) -> bool:
+        """两个边界框是否相交"""
+        return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+        
+    def get_spatial_index(self) -> SpatialIndex:
+        """获取空间索引，图形列表整体变化后在此时重建"""
+        if self.spatial_index_dirty:
+            self.spatial_index.rebuild(self.shapes)
+            self.spatial_index_dirty = False
+        return self.spatial_index
+        
+    def update_spatial_index(self, shapes):
+        """图形几何变化后更新其索引项"""
+        if self.spatial_index_dirty:
+            return
+        for shape in shapes:
+            if shape is not None:
+                self.spatial_index.update(shape)
+                
+    def invalidate_spatial_index(self):
+        """图形列表整体替换后标记索引需要重建（瓦片也全部作废）"""
+        self.spatial_index_dirty = True
+        self.tile_cache.clear()
+        
+    def invalidate_tiles(self, shapes, removed=False):
+        """图形添加、删除或选择状态变化后丢弃受影响的瓦片"""
+        for shape in shapes:
+            self.tile_cache.invalidate_shape(shape, not removed and self.is_tiled_shape(shape))
+        
     def handle_resize(self, x, y):
         """处理调整大小"""
         if self.resize_shape and self.resize_handle:
@@ -224,6 +470,7 @@ class DrawingManager:
             dy = y - self.drag_start_y
             
             self.resize_shape.resize_by_handle(self.resize_handle, dx, dy)
+            self.update_spatial_index([self.resize_shape])
             
             self.drag_start_x = x
             self.drag_start_y = y
@@ -669,6 +916,8 @@ class DrawingManager:
     def add_shape(self, shape):
         """添加图形"""
         self.shapes.append(shape)
+        self.update_spatial_index([shape])
+        self.invalidate_tiles([shape])
         self.save_state()
         self.shape_cache_valid = False  # 添加图形后缓存失效
         self.redraw()
@@ -685,28 +934,41 @@ class DrawingManager:
         """选中图形"""
         shape.set_selected(True)
         self.selected_shapes.append(shape)
+        self.invalidate_tiles([shape])
         self.shape_cache_valid = False  # 选择状态变化，缓存失效
         self.redraw()
         
+    def set_selection(self, shapes):
+        """把选择替换为给定的图形，只重绘选择状态变化的图形"""
+        old_selection = self.selected_shapes
+        self.selected_shapes = list(shapes)
+        new_ids = {id(shape) for shape in self.selected_shapes}
+        old_ids = {id(shape) for shape in old_selection}
+        
+        changed = [shape for shape in old_selection if id(shape) not in new_ids]
+        changed += [shape for shape in self.selected_shapes if id(shape) not in old_ids]
+        for shape in old_selection:
+            shape.set_selected(False)
+        for shape in self.selected_shapes:
+            shape.set_selected(True)
+        self.invalidate_tiles(changed)
+        self.redraw_shapes(changed)
+        
     def clear_selection(self):
         """清除选择"""
-        for shape in self.selected_shapes:
-            shape.set_selected(False)
-        self.selected_shapes.clear()
-        self.shape_cache_valid = False  # 选择状态变化，缓存失效
-        self.redraw()
+        self.set_selection([])
         
     def select_all(self):
         """全选"""
-        self.clear_selection()
-        for shape in self.shapes:
-            self.select_shape(shape)
+        self.set_selection(self.shapes)
             
     def delete_selected(self):
         """删除选中的图形"""
-        for shape in self.selected_shapes:
-            if shape in self.shapes:
-                self.shapes.remove(shape)
+        removed = set(self.selected_shapes)
+        self.shapes = [shape for shape in self.shapes if shape not in removed]
+        for shape in removed:
+            self.spatial_index.remove(shape)
+        self.invalidate_tiles(removed, removed=True)
         self.selected_shapes.clear()
         self.save_state()
         self.shape_cache_valid = False  # 删除图形后缓存失效
@@ -721,7 +983,7 @@ class DrawingManager:
         if not self.clipboard:
             return
             
-        self.clear_selection()
+        pasted = []
         for shape_data in self.clipboard:
             # 创建图形副本并稍微偏移位置
             shape_data = shape_data.copy()
@@ -732,10 +994,11 @@ class DrawingManager:
             shape = self.create_shape_from_dict(shape_data)
             if shape:
                 self.shapes.append(shape)
-                self.select_shape(shape)
+                pasted.append(shape)
                 
+        self.update_spatial_index(pasted)
         self.save_state()
-        self.redraw()
+        self.set_selection(pasted)
         
     def create_shape_from_dict(self, data):
         """从字典数据创建图形"""
@@ -753,13 +1016,21 @@ class DrawingManager:
             return Polygon.from_dict(data)
         elif shape_type == 'BezierCurve':
             return BezierCurve.from_dict(data)
+        elif shape_type == 'BrushStroke':
+            return BrushStroke.from_dict(data)
+        elif shape_type == 'image':
+            return ImageShape.from_dict(data)
         
         return None
         
     def clear(self):
         """清空所有图形"""
+        self.cancel_loading(silent=True)
         self.shapes.clear()
         self.selected_shapes.clear()
+        self.spatial_index.clear()
+        self.spatial_index_dirty = False
+        self.tile_cache.clear()
         self.polygon_points.clear()
         self.bezier_points.clear()
         self.bezier_step = 0
@@ -788,10 +1059,22 @@ class DrawingManager:
             self.canvas.delete("resize_handle")
             self.canvas.delete("brush_stroke")
             self.canvas.delete("selection")  # 清除选择框和调整手柄
+            self.canvas.delete("tile")
+            self.shape_items = {}
+            self.tile_items = {}
             
-            # 绘制所有图形
-            for shape in self.shapes:
-                shape.draw(self.canvas)
+            # 只按顺序绘制与可见区域（含边距）相交的图形
+            self.update_scroll_region()
+            self.drawn_region = self.get_drawn_region()
+            if self.tiled_mode:
+                # 无限画布：未选中的图形来自瓦片，其余图形绘制在瓦片之上
+                self.update_tiles(self.drawn_region)
+                for shape in self.shapes_in_region(self.drawn_region):
+                    if not self.is_tiled_shape(shape):
+                        self.draw_shape(shape)
+            else:
+                for shape in self.shapes_in_region(self.drawn_region):
+                    self.draw_shape(shape)
                 
             # 绘制当前正在绘制的笔刷轨迹
             if self.current_brush_stroke and len(self.current_brush_stroke.points) > 1:
@@ -804,6 +1087,327 @@ class DrawingManager:
             # 只清除临时元素
             self.canvas.delete("temp")
             
+    def get_visible_region(self):
+        """画布窗口当前显示的世界坐标区域"""
+        width = self.raw_canvas.winfo_width()
+        height = self.raw_canvas.winfo_height()
+        # 画布尚未显示时使用请求的尺寸
+        if width <= 1:
+            width = self.raw_canvas.winfo_reqwidth()
+        if height <= 1:
+            height = self.raw_canvas.winfo_reqheight()
+        return (self.canvas.canvasx(0), self.canvas.canvasy(0),
+                self.canvas.canvasx(width), self.canvas.canvasy(height))
+        
+    def get_drawn_region(self):
+        """整体重绘时绘制的区域：可见区域四周各扩展 CULL_MARGIN 倍，小幅滚动不必重绘"""
+        x1, y1, x2, y2 = self.get_visible_region()
+        margin_x = (x2 - x1) * CULL_MARGIN
+        margin_y = (y2 - y1) * CULL_MARGIN
+        return (x1 - margin_x, y1 - margin_y, x2 + margin_x, y2 + margin_y)
+        
+    def shapes_in_region(self, region) -> List[BaseShape]:
+        """按绘制顺序返回边界框与区域相交的图形"""
+        candidates = self.get_spatial_index().query(*region)
+        if len(candidates) == len(self.shapes):
+            return [shape for shape in self.shapes
+                    if self._bounds_overlap(shape.get_bounds(), region)]
+        return [shape for shape in self.shapes
+                if shape in candidates and self._bounds_overlap(shape.get_bounds(), region)]
+        
+    def in_drawn_region(self, shape) -> bool:
+        """图形是否位于上次绘制的区域内"""
+        return self.drawn_region is None or self._bounds_overlap(shape.get_bounds(), self.drawn_region)
+        
+    def draw_shape(self, shape):
+        """绘制单个图形，缩小到一定比例以下时使用简化绘制"""
+        canvas = self.tagged_canvas(shape)
+        if self.viewport.is_simplified():
+            shape.draw_simplified(canvas)
+        else:
+            shape.draw(canvas)
+        
+    def refresh_view(self):
+        """滚动或窗口尺寸变化后：可见区域超出已绘制区域时重绘，再更新视口内的图像"""
+        if not self.canvas:
+            return
+        if self.tiled_mode:
+            self.refresh_tiles()
+            return
+        region = self.drawn_region
+        x1, y1, x2, y2 = self.get_visible_region()
+        if region is None or x1 < region[0] or y1 < region[1] or x2 > region[2] or y2 > region[3]:
+            self.shape_cache_valid = False
+            self.redraw()
+        self.update_visible_images()
+        
+    def set_tiled_mode(self, enabled):
+        """切换无限画布（瓦片缓存）模式"""
+        if enabled == self.tiled_mode:
+            return
+        self.tiled_mode = enabled
+        if not enabled:
+            # 关闭后释放瓦片图像
+            self.tile_cache.clear()
+        self.shape_cache_valid = False
+        self.redraw()
+        
+    def is_tiled_shape(self, shape) -> bool:
+        """图形是否渲染进瓦片（选中的图形要单独绘制，以便拖动和显示控制点）"""
+        return shape.visible and not shape.selected
+        
+    def render_tile(self, rect, scale, candidates=None):
+        """把与瓦片相交的未选中图形按顺序渲染为瓦片图像，返回 (图像, 绘制的图形)"""
+        x1, y1, x2, y2 = rect
+        padded = (x1 - SHAPE_PAD, y1 - SHAPE_PAD, x2 + SHAPE_PAD, y2 + SHAPE_PAD)
+        if candidates is None:
+            candidates = [shape for shape in self.shapes_in_region(padded) if self.is_tiled_shape(shape)]
+        shapes = [shape for shape in candidates if self._bounds_overlap(shape.get_bounds(), padded)]
+        
+        size = self.tile_cache.tile_size
+        image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        for shape in shapes:
+            try:
+                self.draw_shape_to_image(draw, shape, -x1, -y1, image, scale, export=False)
+            except Exception as e:
+                print(f"渲染瓦片失败: {e}")
+        return ImageTk.PhotoImage(image), shapes
+        
+    def update_tiles(self, region):
+        """让覆盖区域的瓦片都显示为最新的缓存图像：复用未变化的画布项，只补上新增或作废的瓦片"""
+        keys = self.tile_cache.tile_keys(region, self.viewport.scale)
+        self.tile_cache.reserve(len(keys))
+        needed = set(keys)
+        for key in [key for key in self.tile_items if key not in needed]:
+            self.canvas.delete(self.tile_items.pop(key)[0])
+        
+        candidates = None
+        for key in keys:
+            image = self.tile_cache.peek(key)
+            if image is None:
+                # 本次需要渲染的瓦片共用一次区域查询的结果（查询范围对齐到瓦片边界）
+                if candidates is None:
+                    first = self.tile_cache.tile_rect(keys[0])
+                    last = self.tile_cache.tile_rect(keys[-1])
+                    padded = (first[0] - SHAPE_PAD, first[1] - SHAPE_PAD,
+                              last[2] + SHAPE_PAD, last[3] + SHAPE_PAD)
+                    candidates = [shape for shape in self.shapes_in_region(padded)
+                                  if self.is_tiled_shape(shape)]
+                image = self.tile_cache.get(key, candidates)
+            entry = self.tile_items.get(key)
+            if entry is not None:
+                if entry[1] is image:
+                    continue
+                self.canvas.delete(entry[0])
+            x1, y1, _x2, _y2 = self.tile_cache.tile_rect(key)
+            item = self.canvas.create_image(x1, y1, image=image, anchor="nw", tags="tile")
+            self.canvas.tag_lower(item)  # 瓦片始终位于最底层
+            self.tile_items[key] = (item, image)
+        
+    def refresh_tiles(self):
+        """无限画布平移后：扩展滚动区域，补上新进入的瓦片和选中的图形"""
+        # 可滚动的余量不足半屏时才扩展滚动区域
+        x1, y1, x2, y2 = self.get_visible_region()
+        half_width, half_height = (x2 - x1) / 2, (y2 - y1) / 2
+        bounds = self.scroll_bounds
+        if (bounds is None or x1 - half_width < bounds[0] or y1 - half_height < bounds[1] or
+                x2 + half_width > bounds[2] or y2 + half_height > bounds[3]):
+            self.update_scroll_region()
+        self.drawn_region = self.get_drawn_region()
+        self.update_tiles(self.drawn_region)
+        for shape in self.selected_shapes:
+            if id(shape) not in self.shape_items and self.in_drawn_region(shape):
+                self.draw_shape(shape)
+        self.update_visible_images()
+        
+    def window_to_world(self, x, y):
+        """窗口坐标（鼠标事件坐标）-> 世界坐标"""
+        return self.canvas.canvasx(x), self.canvas.canvasy(y)
+        
+    def get_zoom(self) -> float:
+        """当前缩放比例"""
+        return self.viewport.scale
+        
+    def zoom_to(self, scale, anchor_x=None, anchor_y=None) -> bool:
+        """缩放到指定比例，窗口坐标 (anchor_x, anchor_y) 处的世界坐标点保持不动
+        
+        未给出锚点时以窗口中心为锚点。返回缩放比例是否发生变化。
+        """
+        if not self.canvas:
+            return False
+        width = self.raw_canvas.winfo_width()
+        height = self.raw_canvas.winfo_height()
+        if anchor_x is None:
+            anchor_x = width / 2
+        if anchor_y is None:
+            anchor_y = height / 2
+        world_x, world_y = self.window_to_world(anchor_x, anchor_y)
+        
+        if not self.viewport.set_scale(scale):
+            return False
+        BaseShape.view_scale = self.viewport.scale
+        self.update_scroll_region()
+        self.scroll_to(world_x, world_y, anchor_x, anchor_y)
+        
+        # 图像显示尺寸随缩放比例变化
+        for shape in self.shapes:
+            if isinstance(shape, ImageShape):
+                shape.reset_display_image()
+        self.shape_cache_valid = False
+        self.redraw()
+        self.update_visible_images()
+        return True
+        
+    def zoom(self, factor, anchor_x=None, anchor_y=None) -> bool:
+        """按倍数缩放"""
+        return self.zoom_to(self.viewport.scale * factor, anchor_x, anchor_y)
+        
+    def zoom_in(self, anchor_x=None, anchor_y=None) -> bool:
+        """放大一级"""
+        return self.zoom(ZOOM_STEP, anchor_x, anchor_y)
+        
+    def zoom_out(self, anchor_x=None, anchor_y=None) -> bool:
+        """缩小一级"""
+        return self.zoom(1 / ZOOM_STEP, anchor_x, anchor_y)
+        
+    def actual_size(self) -> bool:
+        """恢复100%显示"""
+        return self.zoom_to(1.0)
+        
+    def fit_to_window(self) -> bool:
+        """缩放并滚动，使所有图形完整显示在窗口中"""
+        bounds = self.get_all_bounds()
+        if not self.canvas or not bounds:
+            return False
+        width = self.raw_canvas.winfo_width()
+        height = self.raw_canvas.winfo_height()
+        x1, y1, x2, y2 = bounds
+        padding = 20  # 四周留白（像素）
+        scale = min((width - 2 * padding) / max(x2 - x1, 1),
+                    (height - 2 * padding) / max(y2 - y1, 1))
+        self.zoom_to(scale)
+        # 再把图形中心移到窗口中心（缩放比例被限制时也能居中）
+        self.scroll_to((x1 + x2) / 2, (y1 + y2) / 2, width / 2, height / 2)
+        self.refresh_view()
+        return True
+        
+    def update_scroll_region(self):
+        """滚动区域覆盖默认世界范围和所有图形，按当前缩放比例换算"""
+        x1, y1, x2, y2 = WORLD_EXTENT
+        bounds = self.get_all_bounds()
+        if bounds:
+            x1, y1 = min(x1, bounds[0]), min(y1, bounds[1])
+            x2, y2 = max(x2, bounds[2]), max(y2, bounds[3])
+        if self.tiled_mode:
+            # 无限画布：在当前视口四周始终留出一屏可滚动的空间
+            vx1, vy1, vx2, vy2 = self.get_visible_region()
+            width, height = vx2 - vx1, vy2 - vy1
+            x1, y1 = min(x1, vx1 - width), min(y1, vy1 - height)
+            x2, y2 = max(x2, vx2 + width), max(y2, vy2 + height)
+        self.scroll_bounds = (x1, y1, x2, y2)
+        scale = self.viewport.scale
+        self.raw_canvas.config(scrollregion=(x1 * scale, y1 * scale, x2 * scale, y2 * scale))
+        
+    def scroll_to(self, world_x, world_y, window_x, window_y):
+        """滚动画布，使世界坐标点 (world_x, world_y) 显示在窗口坐标 (window_x, window_y) 处"""
+        region = self.raw_canvas.cget("scrollregion")
+        if isinstance(region, str):
+            region = region.split()
+        if len(region) != 4:
+            return
+        left, top, right, bottom = (float(value) for value in region)
+        canvas_x, canvas_y = self.viewport.to_canvas(world_x, world_y)
+        if right > left:
+            self.raw_canvas.xview_moveto((canvas_x - window_x - left) / (right - left))
+        if bottom > top:
+            self.raw_canvas.yview_moveto((canvas_y - window_y - top) / (bottom - top))
+        
+    @staticmethod
+    def shape_tag(shape) -> str:
+        """图形画布项共用的标签"""
+        return f"shape_{id(shape)}"
+        
+    @staticmethod
+    def is_group_movable(shape) -> bool:
+        """图形能否随选择组拖动（笔刷轨迹不可移动）"""
+        return not isinstance(shape, BrushStroke)
+        
+    def tagged_canvas(self, shape):
+        """返回给图形绘制用的画布代理
+        
+        创建的画布项都带有该图形的标签；选中的图形再加上 selection_group 标签，拖动时整体移动。
+        """
+        items = self.shape_items.setdefault(id(shape), [])
+        tags = (self.shape_tag(shape),)
+        if shape.selected and self.is_group_movable(shape):
+            tags += ("selection_group",)
+        return _ShapeCanvas(self.canvas, tags, items)
+        
+    def delete_shape_items(self, shape):
+        """删除图形的所有画布项"""
+        items = self.shape_items.pop(id(shape), None)
+        if items:
+            self.canvas.delete(*items)
+        
+    def redraw_shapes(self, shapes):
+        """只重绘给定的图形
+        
+        重绘的画布项位于最上层。只要这些图形都没有被绘制顺序在后的图形覆盖（按空间索引和
+        边界框判断），放在最上层与按顺序绘制的效果相同；否则退回整体重绘以保证层次正确。
+        """
+        if not self.canvas or not shapes:
+            return
+        if not self.shape_cache_valid:
+            self.redraw()
+            return
+        if self.tiled_mode:
+            self.redraw_shapes_tiled(shapes)
+            return
+        
+        order = {id(shape): index for index, shape in enumerate(self.shapes)}
+        changed = sorted((shape for shape in shapes if id(shape) in order),
+                         key=lambda shape: order[id(shape)])
+        index = self.get_spatial_index()
+        for shape in changed:
+            position = order[id(shape)]
+            bounds = shape.get_bounds()
+            for other in index.query(*bounds):
+                if (other.visible and order.get(id(other), -1) > position and
+                        self._bounds_overlap(other.get_bounds(), bounds)):
+                    self.shape_cache_valid = False
+                    self.redraw()
+                    return
+        
+        for shape in changed:
+            drawn = id(shape) in self.shape_items
+            self.delete_shape_items(shape)
+            # 绘制区域外、原本也没有画布项的图形不必绘制
+            if drawn or self.in_drawn_region(shape):
+                self.draw_shape(shape)
+        self.canvas.tag_raise("resize_handle")
+        self.canvas.tag_raise("selection")
+            
+    def redraw_shapes_tiled(self, shapes):
+        """无限画布模式下重绘给定的图形：作废的瓦片换成新渲染的图像，选中的图形绘制在瓦片之上"""
+        for shape in shapes:
+            self.delete_shape_items(shape)
+        self.update_tiles(self.drawn_region)
+        for shape in shapes:
+            if not self.is_tiled_shape(shape) and self.in_drawn_region(shape):
+                self.draw_shape(shape)
+        self.canvas.tag_raise("resize_handle")
+        self.canvas.tag_raise("selection")
+        
+    def update_visible_images(self):
+        """视口滚动或尺寸变化后，解码新进入视口的图像并释放移出视口的图像"""
+        if not self.canvas:
+            return
+        for shape in self.shapes:
+            # 绘制区域外的图像没有画布项
+            if isinstance(shape, ImageShape) and id(shape) in self.shape_items:
+                shape.update_visibility(self.tagged_canvas(shape))
+                
     def redraw_temp_only(self):
         """只重绘临时图形，避免频繁重绘所有图形"""
         if not self.canvas:
@@ -852,6 +1456,8 @@ class DrawingManager:
         else:
             self.history_index += 1
             
+        self.notify_change()
+            
     def undo(self):
         """撤销"""
         if self.history_index > 0:
@@ -873,24 +1479,30 @@ class DrawingManager:
             shape = self.create_shape_from_dict(shape_data)
             if shape:
                 self.shapes.append(shape)
+        self.invalidate_spatial_index()
         
         self.shape_cache_valid = False  # 恢复状态后缓存失效        
         self.redraw()
+        self.notify_change()
         
-    def save_to_file(self, filename):
-        """保存到文件"""
-        data = {
+    def get_snapshot(self):
+        """获取文档快照（用于保存和自动保存）
+        
+        每个图形的 to_dict() 只做浅拷贝，点列表等与图形共享；图形修改时采用写时复制，
+        所以快照获取后不会再变化，可以交给后台线程编码。
+        """
+        return {
             'version': '1.0',
             'shapes': [shape.to_dict() for shape in self.shapes]
         }
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    def save_to_file(self, filename):
+        """保存到文件"""
+        write_project_data(filename, self.get_snapshot())
             
     def load_from_file(self, filename):
         """从文件加载"""
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = read_project_data(filename)
             
         self.clear()
         
@@ -898,10 +1510,59 @@ class DrawingManager:
             shape = self.create_shape_from_dict(shape_data)
             if shape:
                 self.shapes.append(shape)
+        self.invalidate_spatial_index()
                 
         self.save_state()
         self.redraw()
         
+    def load_from_file_async(self, filename, on_progress=None, on_done=None):
+        """渐进式从文件加载：流式解析，分批创建并显示图形，返回可取消的加载器
+
+        分批加载由画布的 Tk 事件循环调度，必须先用 set_canvas 关联画布。
+        """
+        if self.canvas is None:
+            raise RuntimeError("2D画布未初始化，无法渐进式加载")
+        reader = ProjectStreamReader(filename)
+        self.clear()
+        
+        def add_batch(batch):
+            # 只绘制新增的图形，已显示的部分不重绘
+            self.shapes.extend(batch)
+            self.update_spatial_index(batch)
+            self.invalidate_tiles(batch)
+            if self.canvas:
+                for shape in batch:
+                    if self.in_drawn_region(shape):
+                        self.draw_shape(shape)
+            self.last_shape_count = len(self.shapes)
+            
+        def finish(loaded_count, cancelled, error):
+            self.loader = None
+            self.save_state()
+            self.redraw()
+            if on_done:
+                on_done(loaded_count, cancelled, error)
+                
+        self.loader = ProgressiveLoader(self.canvas, reader, self.create_shape_from_dict,
+                                        add_batch, on_progress, finish)
+        self.loader.start()
+        return self.loader
+        
+    def cancel_loading(self, silent=False):
+        """取消正在进行的渐进式加载（已加载的图形保留）
+
+        silent 为True时不触发加载完成回调，用于清空文档前丢弃旧的加载任务。
+        """
+        if self.loader:
+            loader = self.loader
+            if silent:
+                self.loader = None
+            loader.cancel(silent)
+            
+    def is_loading(self) -> bool:
+        """是否正在渐进式加载"""
+        return self.loader is not None
+        
     def export_image(self, filename):
         """导出为图片"""
         if not self.shapes:
@@ -929,72 +1590,142 @@ class DrawingManager:
         
         # 绘制所有图形
         for shape in self.shapes:
-            self.draw_shape_to_image(draw, shape, offset_x, offset_y)
+            self.draw_shape_to_image(draw, shape, offset_x, offset_y, image)
         
         image.save(filename)
         
-    def draw_shape_to_image(self, draw, shape, offset_x, offset_y):
-        """将图形绘制到PIL图像上"""
+    def draw_shape_to_image(self, draw, shape, offset_x, offset_y, image=None, scale=1.0, export=True):
+        """将图形绘制到PIL图像上
+        
+        像素坐标 = (世界坐标 + 偏移) × scale。export 为 False 时按屏幕显示效果渲染（画布瓦片）：
+        图片取自共享缓存，白色填充与屏幕一致视为不填充。
+        """
         from shapes import Point, Line, Rectangle, Circle, Polygon, BezierCurve
         
         # 转换颜色格式
         fill_color = shape.fill_color if hasattr(shape, 'fill_color') and shape.fill_color else None
+        if not export and fill_color and fill_color.lower() == "white":
+            fill_color = None
         outline_color = shape.color if hasattr(shape, 'color') else 'black'
         line_width = shape.line_width if hasattr(shape, 'line_width') else 1
+        line_width = max(1, int(round(line_width * scale)))
+        
+        # 坐标统一取整到像素网格，分块渲染的结果与整体渲染逐像素一致
+        def tx(x):
+            return math.floor((x + offset_x) * scale + 0.5)
+        
+        def ty(y):
+            return math.floor((y + offset_y) * scale + 0.5)
         
         if isinstance(shape, Point):
-            x = shape.x + offset_x
-            y = shape.y + offset_y
-            r = max(line_width, 2)
+            x = tx(shape.x)
+            y = ty(shape.y)
+            r = max(line_width, 2 * scale, 1)
             draw.ellipse([x-r, y-r, x+r, y+r], fill=outline_color)
             
         elif isinstance(shape, Line):
-            x1 = shape.x1 + offset_x
-            y1 = shape.y1 + offset_y
-            x2 = shape.x2 + offset_x
-            y2 = shape.y2 + offset_y
-            draw.line([x1, y1, x2, y2], fill=outline_color, width=line_width)
+            draw.line([tx(shape.x1), ty(shape.y1), tx(shape.x2), ty(shape.y2)],
+                      fill=outline_color, width=line_width)
+            
+        elif isinstance(shape, ImageShape):
+            # 导出时按导出尺寸从文件读取，不使用屏幕显示用的工作副本
+            if image is not None:
+                width = int(round(shape.width * scale))
+                height = int(round(shape.height * scale))
+                if export:
+                    picture = shape.get_export_image(width, height)
+                else:
+                    picture = shape.get_render_image(width, height)
+                if picture is not None:
+                    position = (int(round(tx(shape.x1))), int(round(ty(shape.y1))))
+                    mask = picture if 'A' in picture.getbands() else None
+                    image.paste(picture.convert('RGB'), position, mask)
             
         elif isinstance(shape, Rectangle):
-            x1 = shape.x + offset_x
-            y1 = shape.y + offset_y
-            x2 = shape.x + shape.width + offset_x
-            y2 = shape.y + shape.height + offset_y
-            draw.rectangle([x1, y1, x2, y2], fill=fill_color, outline=outline_color, width=line_width)
+            draw.rectangle([tx(shape.x1), ty(shape.y1), tx(shape.x2), ty(shape.y2)],
+                           fill=fill_color, outline=outline_color, width=line_width)
             
         elif isinstance(shape, Circle):
-            x1 = shape.x - shape.radius + offset_x
-            y1 = shape.y - shape.radius + offset_y
-            x2 = shape.x + shape.radius + offset_x
-            y2 = shape.y + shape.radius + offset_y
+            x1 = tx(shape.x - shape.radius_x)
+            y1 = ty(shape.y - shape.radius_y)
+            x2 = tx(shape.x + shape.radius_x)
+            y2 = ty(shape.y + shape.radius_y)
             draw.ellipse([x1, y1, x2, y2], fill=fill_color, outline=outline_color, width=line_width)
             
         elif isinstance(shape, Polygon):
-            points = [(p[0] + offset_x, p[1] + offset_y) for p in shape.points]
+            points = [(tx(p[0]), ty(p[1])) for p in shape.points]
             if len(points) >= 3:
-                draw.polygon(points, fill=fill_color, outline=outline_color)
+                if fill_color:
+                    draw.polygon(points, fill=fill_color)
+                # 边框按线宽逐边描绘，与屏幕上的 Bresenham 描边一致
+                draw.line(points + points[:1], fill=outline_color, width=line_width, joint="curve")
                 
         elif isinstance(shape, BezierCurve):
-            # 绘制贝塞尔曲线
-            points = []
-            for t in range(101):  # 100段
-                t_normalized = t / 100.0
-                x, y = shape.bezier_point(t_normalized)
-                points.append((x + offset_x, y + offset_y))
-            
-            # 绘制曲线
-            for i in range(len(points) - 1):
-                draw.line([points[i], points[i + 1]], fill=outline_color, width=line_width)
+            # 绘制贝塞尔曲线（与屏幕绘制共用缓存的自适应折线）
+            points = [(tx(x), ty(y)) for x, y in shape.get_curve_points(scale)]
+            draw.line(points, fill=outline_color, width=line_width, joint="curve")
                 
         elif isinstance(shape, BrushStroke):
             # 绘制笔刷轨迹
             if len(shape.points) >= 2:
-                for i in range(len(shape.points) - 1):
-                    x1 = shape.points[i][0] + offset_x
-                    y1 = shape.points[i][1] + offset_y
-                    x2 = shape.points[i + 1][0] + offset_x
-                    y2 = shape.points[i + 1][1] + offset_y
-                    draw.line([x1, y1, x2, y2], fill=outline_color, width=shape.brush_size)
+                self.draw_brush_to_image(draw, shape, tx, ty, image, scale)
+        
+    def draw_brush_to_image(self, draw, shape, tx, ty, image, scale):
+        """按笔刷类型把轨迹绘制到PIL图像上，使用与屏幕绘制相同的预生成散点和纹理"""
+        from PIL import ImageColor
+        
+        def dot(x, y, radius, color):
+            draw.ellipse([tx(x - radius), ty(y - radius), tx(x + radius), ty(y + radius)],
+                         fill=color, outline=color)
+        
+        width = max(1, int(round(shape.brush_size * scale)))
+        points = [(tx(x), ty(y)) for x, y in shape.points]
+        
+        if shape.brush_type == "brush_spray":
+            for x, y, dot_size in shape.spray_dots:
+                dot(x, y, dot_size, shape.color)
+                
+        elif shape.brush_type == "brush_pencil":
+            for item in shape.pencil_texture:
+                if item['type'] == 'line':
+                    draw.line([tx(item['x1']), ty(item['y1']), tx(item['x2']), ty(item['y2'])],
+                              fill=item['color'], width=max(1, int(round(item['width'] * scale))))
+                elif item['type'] == 'dot':
+                    dot(item['x'], item['y'], item['size'], item['color'])
+                    
+        elif shape.brush_type == "brush_highlighter":
+            # 半透明笔迹先画到单独的图层，再整体叠加，自身重叠处不会加深
+            if image is None:
+                return
+            x1, y1, x2, y2 = shape.get_bounds()
+            pad = shape.brush_size / 2 + 2
+            left, top = max(0, tx(x1 - pad)), max(0, ty(y1 - pad))
+            right, bottom = min(image.width, tx(x2 + pad)), min(image.height, ty(y2 + pad))
+            if right <= left or bottom <= top:
+                return
+            try:
+                r, g, b = ImageColor.getrgb(shape.color)[:3]
+            except ValueError:
+                r, g, b = (0, 0, 0)
+            rgba = (r, g, b, 128)
+            layer = Image.new('RGBA', (right - left, bottom - top), (0, 0, 0, 0))
+            layer_draw = ImageDraw.Draw(layer)
+            local = [(x - left, y - top) for x, y in points]
+            layer_draw.line(local, fill=rgba, width=width, joint="curve")
+            radius = width / 2
+            for x, y in local:
+                layer_draw.ellipse([x - radius, y - radius, x + radius, y + radius], fill=rgba)
+            if image.mode == 'RGBA':
+                image.alpha_composite(layer, (left, top))
+            else:
+                image.paste(layer, (left, top), layer)
+                
+        else:
+            # 圆珠笔（及未知类型）：圆头连续线段
+            draw.line(points, fill=shape.color, width=width, joint="curve")
+            radius = width / 2
+            for x, y in (points[0], points[-1]):
+                draw.ellipse([x - radius, y - radius, x + radius, y + radius], fill=shape.color)
         
     def get_all_bounds(self):
         """获取所有图形的边界"""
@@ -1031,13 +1762,13 @@ class DrawingManager:
         )
         
         if file_path:
-            # 先创建临时图像对象获取原始尺寸
-            temp_image = ImageShape(0, 0, 100, 100, file_path)
+            # 只读取文件头获取原始尺寸，像素由后台线程解码
+            image_size = read_image_size(file_path)
+            image_shape = None
             
-            if temp_image.pil_image:  # 确保图片加载成功
+            if image_size:  # 确保图片可以识别
                 # 获取原始图片尺寸
-                original_width = temp_image.original_width
-                original_height = temp_image.original_height
+                original_width, original_height = image_size
                 
                 # 计算合适的显示尺寸，保持长宽比
                 max_size = 300  # 最大边长
@@ -1057,9 +1788,10 @@ class DrawingManager:
                 y2 = y + display_height // 2
                 
                 # 创建正确尺寸的图像对象
-                image_shape = ImageShape(x1, y1, x2, y2, file_path)
+                image_shape = ImageShape(x1, y1, x2, y2)
+                image_shape.set_image_info(file_path, original_width, original_height)
             
-            if image_shape.pil_image:  # 确保图片加载成功
+            if image_shape and image_shape.is_loaded():  # 确保图片加载成功
                 # 应用当前的填充和边框设置
                 image_shape.color = self.current_color
                 image_shape.fill_color = self.current_fill_color
@@ -1069,12 +1801,7 @@ class DrawingManager:
                 self.add_shape(image_shape)
                 
                 # 自动选择新创建的图像
-                self.clear_selection()
-                image_shape.selected = True
-                self.selected_shapes = [image_shape]
-                
-                # 重绘画布
-                self.redraw()
+                self.set_selection([image_shape])
                 
                 print(f"图片导入成功: {file_path}")
             else:
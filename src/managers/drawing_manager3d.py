@@ -1,15 +1,20 @@
 """
 3D绘图管理器 - 负责3D图形的创建、管理和渲染
 """
-import json
 import os
 import sys
+import time
 from typing import List, Optional, Tuple
 
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from shapes3d import BaseShape3D, Point3D, Vector3D, Cube3D, Sphere3D, Pyramid3D, Cone3D
+from .file_manager import read_project_data, write_project_data
+from .progressive_loader import ProgressiveLoader
+from .project_stream import ProjectStreamReader
+
+LOAD_REDRAW_INTERVAL = 0.25  # 渐进式加载期间两次整场景重绘的最小间隔（秒）
 
 
 class DrawingManager3D:
@@ -34,10 +39,32 @@ class DrawingManager3D:
         self.history = []  # 历史记录
         self.history_index = -1  # 当前历史位置
         self.max_history = 50  # 最大历史记录数
+        self.property_edit_pending = False  # 线宽滑块拖动中尚未记录的修改
+        
+        # 渐进式加载
+        self.loader = None  # 正在进行的加载任务
+        
+        # 文档修改回调（用于修改标记和自动保存）
+        self.change_callback = None
         
     def set_canvas3d(self, canvas3d):
         """设置3D画布引用"""
         self.canvas3d = canvas3d
+        # 画布上拖动图形或操作控件修改图形后记录状态
+        canvas3d.set_change_callback(self.on_canvas_shape_changed)
+    
+    def on_canvas_shape_changed(self, shape: BaseShape3D):
+        """3D画布上拖动修改了图形"""
+        self.save_state()
+    
+    def set_change_callback(self, callback):
+        """设置文档修改回调"""
+        self.change_callback = callback
+    
+    def notify_change(self):
+        """通知文档已修改"""
+        if self.change_callback:
+            self.change_callback()
     
     def create_shape(self, tool_name: str, x: float = 0, y: float = 0, z: float = 0, **kwargs) -> Optional[BaseShape3D]:
         """根据工具名称创建3D图形"""
@@ -116,6 +143,7 @@ class DrawingManager3D:
     
     def clear(self):
         """清空所有图形"""
+        self.cancel_loading(silent=True)
         self.shapes.clear()
         self.selected_shapes.clear()
         if self.canvas3d:
@@ -150,33 +178,48 @@ class DrawingManager3D:
     def set_current_color(self, color: str):
         """设置当前颜色"""
         self.current_color = color
-        # 应用到选中的图形
-        for shape in self.selected_shapes:
-            shape.set_color(color)
-        if self.canvas3d:
-            self.canvas3d.redraw()
+        self.apply_to_selected('color', 'set_color', color)
     
     def set_current_fill_color(self, fill_color: str):
         """设置当前填充颜色"""
         self.current_fill_color = fill_color
-        for shape in self.selected_shapes:
-            shape.set_fill_color(fill_color)
-        if self.canvas3d:
-            self.canvas3d.redraw()
+        self.apply_to_selected('fill_color', 'set_fill_color', fill_color)
     
-    def set_current_line_width(self, line_width: int):
-        """设置当前线宽"""
+    def set_current_line_width(self, line_width: int, record: bool = True):
+        """设置当前线宽；record为False时（滑块拖动中）暂不记录撤销状态"""
         self.current_line_width = line_width
-        for shape in self.selected_shapes:
-            shape.set_line_width(line_width)
+        self.apply_to_selected('line_width', 'set_line_width', line_width, record)
+    
+    def apply_to_selected(self, attr: str, setter: str, value, record: bool = True):
+        """把属性应用到选中的图形，只有值确实改变时才重绘并记录一次状态"""
+        changed = [shape for shape in self.selected_shapes
+                   if getattr(shape, attr, None) != value]
+        if not changed:
+            return
+        for shape in changed:
+            getattr(shape, setter)(value)
+        if record:
+            self.property_edit_pending = False
+            self.save_state()
+        else:
+            self.property_edit_pending = True
+            self.notify_change()
         if self.canvas3d:
             self.canvas3d.redraw()
     
+    def commit_property_edit(self):
+        """滑块松开时为拖动过程中的修改记录一次状态"""
+        if self.property_edit_pending:
+            self.property_edit_pending = False
+            self.save_state()
+    
     # 变换操作
     def move_selected(self, dx: float, dy: float, dz: float):
         """移动选中的图形"""
         for shape in self.selected_shapes:
             shape.move(dx, dy, dz)
+        if self.selected_shapes:
+            self.save_state()
         if self.canvas3d:
             self.canvas3d.redraw()
     
@@ -184,6 +227,8 @@ class DrawingManager3D:
         """旋转选中的图形"""
         for shape in self.selected_shapes:
             shape.rotate(rx, ry, rz)
+        if self.selected_shapes:
+            self.save_state()
         if self.canvas3d:
             self.canvas3d.redraw()
     
@@ -191,6 +236,8 @@ class DrawingManager3D:
         """缩放选中的图形"""
         for shape in self.selected_shapes:
             shape.scale(sx, sy, sz)
+        if self.selected_shapes:
+            self.save_state()
         if self.canvas3d:
             self.canvas3d.redraw()
     
@@ -214,6 +261,8 @@ class DrawingManager3D:
         if len(self.history) > self.max_history:
             self.history.pop(0)
             self.history_index -= 1
+        
+        self.notify_change()
     
     def undo(self):
         """撤销"""
@@ -241,6 +290,8 @@ class DrawingManager3D:
             self.canvas3d.clear_objects()
             for shape in self.shapes:
                 self.canvas3d.add_shape(shape)
+        
+        self.notify_change()
     
     def create_shape_from_dict(self, data: dict) -> Optional[BaseShape3D]:
         """从字典创建图形"""
@@ -266,21 +317,21 @@ class DrawingManager3D:
         return shape
     
     # 文件操作
-    def save_to_file(self, filename: str):
-        """保存到文件"""
-        data = {
+    def get_snapshot(self):
+        """获取文档快照（用于保存和自动保存），每个图形只做浅拷贝"""
+        return {
             'version': '1.0',
             'mode': '3D',
             'shapes': [shape.to_dict() for shape in self.shapes]
         }
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    
+    def save_to_file(self, filename: str):
+        """保存到文件"""
+        write_project_data(filename, self.get_snapshot())
     
     def load_from_file(self, filename: str):
         """从文件加载"""
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = read_project_data(filename)
         
         if data.get('mode') != '3D':
             raise ValueError("文件不是3D场景文件")
@@ -290,4 +341,62 @@ class DrawingManager3D:
         for shape_data in data.get('shapes', []):
             shape = self.create_shape_from_dict(shape_data)
             if shape:
-                self.add_shape(shape)
\ No newline at end of file
+                self.add_shape(shape)
+    
+    def load_from_file_async(self, filename: str, on_progress=None, on_done=None):
+        """渐进式从文件加载：流式解析，分批创建并显示图形，返回可取消的加载器
+
+        分批加载由画布的 Tk 事件循环调度，必须先用 set_canvas3d 关联3D画布。
+        """
+        if self.canvas3d is None:
+            raise RuntimeError("3D画布未初始化，无法渐进式加载")
+        reader = ProjectStreamReader(filename)
+        if reader.header.get('mode') != '3D':
+            reader.close()
+            raise ValueError("文件不是3D场景文件")
+        
+        self.clear()
+        
+        # 画家算法需要整个场景一起排序，无法只画新增的一批；场景越大重绘越慢，
+        # 因此加载期间限制重绘频率，加载结束后再完整重绘一次
+        last_redraw = 0.0
+        
+        def add_batch(batch):
+            nonlocal last_redraw
+            # 整批加入，且不为每个图形单独保存撤销状态
+            self.shapes.extend(batch)
+            if self.canvas3d:
+                self.canvas3d.shapes_3d.extend(batch)
+                self.canvas3d.has_content = True
+                now = time.perf_counter()
+                if now - last_redraw >= LOAD_REDRAW_INTERVAL:
+                    self.canvas3d.redraw()
+                    last_redraw = time.perf_counter()
+        
+        def finish(loaded_count, cancelled, error):
+            self.loader = None
+            if self.canvas3d:
+                self.canvas3d.redraw()
+            self.save_state()
+            if on_done:
+                on_done(loaded_count, cancelled, error)
+        
+        self.loader = ProgressiveLoader(self.canvas3d.canvas, reader, self.create_shape_from_dict,
+                                        add_batch, on_progress, finish)
+        self.loader.start()
+        return self.loader
+    
+    def cancel_loading(self, silent: bool = False):
+        """取消正在进行的渐进式加载（已加载的图形保留）
+
+        silent 为True时不触发加载完成回调，用于清空文档前丢弃旧的加载任务。
+        """
+        if self.loader:
+            loader = self.loader
+            if silent:
+                self.loader = None
+            loader.cancel(silent)
+    
+    def is_loading(self) -> bool:
+        """是否正在渐进式加载"""
+        return self.loader is not None
\ No newline at end of file
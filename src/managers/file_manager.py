@@ -3,7 +3,82 @@
 """
 import json
 import os
-from typing import Dict, Any, List
+import stat
+import tempfile
+from typing import Dict, Any, List, Optional
+
+from .binary_format import BINARY_EXTENSION, MAGIC, encode_document, decode_document, is_binary_data
+from .project_stream import ProjectStreamReader
+
+
+# 打开/保存对话框使用的项目文件类型
+PROJECT_FILETYPES = [
+    ("项目文件", "*.json *" + BINARY_EXTENSION),
+    ("JSON项目文件", "*.json"),
+    ("二进制项目文件", "*" + BINARY_EXTENSION),
+    ("所有文件", "*.*")
+]
+
+# umask 是进程级设置，读取时必须临时改写，只在导入时（主线程、尚无工作线程）读取一次
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def is_binary_filename(filename: str) -> bool:
+    """根据扩展名判断是否保存为二进制格式"""
+    return os.path.splitext(filename)[1].lower() == BINARY_EXTENSION
+
+
+def is_binary_file(filename: str) -> bool:
+    """根据文件头魔数判断文件是否为二进制格式"""
+    with open(filename, 'rb') as f:
+        return is_binary_data(f.read(len(MAGIC)))
+
+
+def _target_file_mode(filename: str) -> int:
+    """替换后文件应有的权限：沿用已有文件的权限，新文件按 umask 取默认权限"""
+    try:
+        return stat.S_IMODE(os.stat(filename).st_mode)
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def write_project_data(filename: str, data: Dict[str, Any]):
+    """按扩展名选择格式写入项目数据（.gdsb 为二进制，其余为JSON）
+
+    先写入同目录下的临时文件再原子替换，写入中途出错或退出不会损坏原文件。
+    临时文件创建时仅所有者可读写，替换前改为目标文件应有的权限。
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_path = tempfile.mkstemp(prefix='.saving_', suffix='.tmp', dir=directory)
+    try:
+        if is_binary_filename(filename):
+            with os.fdopen(fd, 'wb') as f:
+                f.write(encode_document(data))
+        else:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        os.chmod(temp_path, _target_file_mode(filename))
+        os.replace(temp_path, filename)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def read_project_data(filename: str) -> Dict[str, Any]:
+    """按文件头魔数识别格式并读取完整的项目数据"""
+    with open(filename, 'rb') as f:
+        raw = f.read()
+    if is_binary_data(raw):
+        return decode_document(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+def read_project_header(filename: str) -> Dict[str, Any]:
+    """读取 shapes 之前的项目元数据，只解析文件开头，不解码图形"""
+    with ProjectStreamReader(filename) as reader:
+        return dict(reader.header)
 
 
 class FileManager:
@@ -11,10 +86,9 @@ class FileManager:
     
     def __init__(self):
         self.current_file = None
-        self.file_filters = [
-            ("项目文件", "*.json"),
-            ("所有文件", "*.*")
-        ]
+        self.modified = False  # 自上次保存后是否有修改
+        self.change_count = 0  # 修改计数，自动保存据此判断快照是否过期
+        self.file_filters = PROJECT_FILETYPES
         self.image_filters = [
             ("PNG文件", "*.png"),
             ("JPEG文件", "*.jpg *.jpeg"),
@@ -35,10 +109,9 @@ class FileManager:
                 'shapes': shapes
             }
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            write_project_data(filename, data)
                 
-            self.current_file = filename
+            self.mark_saved(filename)
             return True
             
         except Exception as e:
@@ -48,10 +121,9 @@ class FileManager:
     def load_project(self, filename: str) -> List[Dict[str, Any]]:
         """加载项目文件"""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = read_project_data(filename)
                 
-            self.current_file = filename
+            self.mark_saved(filename)
             return data.get('shapes', [])
             
         except Exception as e:
@@ -68,8 +140,23 @@ class FileManager:
         
     def is_file_modified(self) -> bool:
         """检查文件是否被修改"""
-        # 这里可以添加文件修改检测逻辑
-        return False
+        return self.modified
+        
+    def mark_modified(self):
+        """标记文档已修改"""
+        self.modified = True
+        self.change_count += 1
+        
+    def mark_saved(self, filename: Optional[str] = None):
+        """标记文档已保存（或新建/打开后未修改）"""
+        self.current_file = filename
+        self.modified = False
+        
+    def get_autosave_path(self, mode: str = '2D') -> str:
+        """获取自动保存文件路径：已命名的文件保存在同目录，未命名的保存在临时目录"""
+        if self.current_file:
+            return os.path.splitext(self.current_file)[0] + '.autosave' + BINARY_EXTENSION
+        return os.path.join(tempfile.gettempdir(), f'GraphicsDrawingSystem_untitled_{mode}.autosave' + BINARY_EXTENSION)
         
     def get_file_info(self, filename: str) -> Dict[str, Any]:
         """获取文件信息"""
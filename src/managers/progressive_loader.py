@@ -0,0 +1,108 @@
+"""
+渐进式加载器 - 在Tk空闲回调中分批创建图形，首屏尽快显示，其余部分逐步补齐
+"""
+import time
+from typing import Callable, List, Optional
+
+from .project_stream import ProjectStreamReader
+
+
+class ProgressiveLoader:
+    """渐进式加载器类
+
+    每次空闲回调只在时间预算内解析并创建图形，然后把这一批交给 add_batch 显示，
+    再通过 after_idle 调度下一批，期间界面保持响应。
+    """
+
+    def __init__(self, widget, reader: ProjectStreamReader,
+                 create_shape: Callable, add_batch: Callable[[List], None],
+                 on_progress: Optional[Callable[[int, float], None]] = None,
+                 on_done: Optional[Callable[[int, bool, Optional[Exception]], None]] = None,
+                 time_budget_ms: float = 30, max_budget_ms: float = 100):
+        self.widget = widget
+        self.reader = reader
+        self.create_shape = create_shape
+        self.add_batch = add_batch
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.base_budget = time_budget_ms / 1000.0
+        self.max_budget = max(max_budget_ms, time_budget_ms) / 1000.0
+        self.time_budget = self.base_budget
+
+        self.loaded_count = 0
+        self.cancelled = False
+        self.finished = False
+        self._shapes = iter(reader)
+        self._after_id = None
+
+    def start(self):
+        """开始加载"""
+        self._after_id = self.widget.after_idle(self._pump)
+
+    def cancel(self, silent: bool = False):
+        """取消加载，已加载的图形保留
+
+        silent 为True时不调用 on_done（调用方即将清空文档并开始新的加载）。
+        """
+        if self.finished:
+            return
+        self.cancelled = True
+        if silent:
+            self.on_done = None
+        if self._after_id:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        self._finish(None)
+
+    def _pump(self):
+        """处理一批图形"""
+        self._after_id = None
+        if self.finished:
+            return
+
+        batch = []
+        exhausted = False
+        deadline = time.perf_counter() + self.time_budget
+        try:
+            for shape_data in self._shapes:
+                shape = self.create_shape(shape_data)
+                if shape:
+                    batch.append(shape)
+                if time.perf_counter() >= deadline:
+                    break
+            else:
+                exhausted = True
+        except Exception as e:
+            print(f"加载文件失败: {e}")
+            self._add(batch)
+            self._finish(e)
+            return
+
+        add_time = self._add(batch)
+        # 显示开销超过解析预算时放大下一批的预算，避免每批都重绘导致总耗时成倍增长；
+        # 预算跟随最近一批的显示开销并设上限，单次空闲回调不会越来越长
+        self.time_budget = min(max(self.base_budget, add_time), self.max_budget)
+
+        if self.on_progress:
+            self.on_progress(self.loaded_count, self.reader.progress())
+
+        if exhausted:
+            self._finish(None)
+        else:
+            self._after_id = self.widget.after_idle(self._pump)
+
+    def _add(self, batch) -> float:
+        """显示一批图形，返回耗时（秒）"""
+        if not batch:
+            return 0.0
+        start = time.perf_counter()
+        self.add_batch(batch)
+        self.loaded_count += len(batch)
+        return time.perf_counter() - start
+
+    def _finish(self, error: Optional[Exception]):
+        """结束加载并通知调用方"""
+        self.finished = True
+        self.reader.close()
+        if self.on_done:
+            self.on_done(self.loaded_count, self.cancelled, error)
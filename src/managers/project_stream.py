@@ -0,0 +1,206 @@
+"""
+项目流式读取 - 增量解析项目文件中的图形，避免一次性读入整个文档
+
+JSON 文件按块读取，用 json.JSONDecoder.raw_decode 逐个解析 shapes 数组中的元素；
+二进制文件（.gdsb）逐条解码图形记录。两种格式都先解析出 shapes 之前的元数据，
+因此只需读取文件开头即可判断2D/3D模式。
+"""
+import codecs
+import json
+import os
+from typing import Any, Dict, Iterator, Optional
+
+from .binary_format import MAGIC, decode_preamble, is_binary_data, iter_shape_records
+
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_END = _WHITESPACE + ',]}'
+
+
+class _JsonShapeStream:
+    """JSON项目文件的增量分词器"""
+
+    def __init__(self, file, chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+        self.header: Dict[str, Any] = {}
+        self.in_shapes = False
+
+    def _fill(self, min_size: int = 0) -> bool:
+        """再读入一块数据，文件结束时返回False"""
+        if self.eof:
+            return False
+
+        # 丢弃已经消费的文本，避免缓冲区无限增长
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+
+        chunk = self.file.read(max(self.chunk_size, min_size))
+        self.bytes_read += len(chunk)
+        if not chunk:
+            self.eof = True
+            self.buffer += self.text_decoder.decode(b'', final=True)
+            return False
+        self.buffer += self.text_decoder.decode(chunk)
+        return True
+
+    def _peek(self) -> str:
+        """跳过空白并返回下一个字符，文件结束时返回空串"""
+        while True:
+            buffer = self.buffer
+            pos = self.pos
+            length = len(buffer)
+            while pos < length and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < length:
+                return buffer[pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str):
+        """读取指定的分隔符"""
+        if self._peek() != char:
+            raise ValueError(f"项目文件格式错误：位置 {self.bytes_read} 附近缺少 '{char}'")
+        self.pos += 1
+
+    def _value(self) -> Any:
+        """解析一个完整的JSON值，数据不完整时继续读取"""
+        self._peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # 元素被块边界截断：读取至少与待解析部分等量的数据，保证总体线性
+                if not self._fill(len(self.buffer) - self.pos):
+                    raise
+                continue
+            # 数字可能在缓冲区末尾被截断（"12" 或 "2." 只解析出前缀），
+            # 需要确认后面还有字符，且紧跟的是空白或分隔符
+            if not self.eof and (end == len(self.buffer) or (
+                    value.__class__ in (int, float) and self.buffer[end] not in _NUMBER_END)):
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def _read_member(self) -> Optional[str]:
+        """读取顶层对象的下一个键，对象结束时返回None"""
+        char = self._peek()
+        if char == ',':
+            self.pos += 1
+            char = self._peek()
+        if char == '}':
+            self.pos += 1
+            return None
+        key = self._value()
+        self._expect(':')
+        return key
+
+    def read_header(self):
+        """解析 shapes 之前的所有顶层字段，并停在 shapes 数组开头"""
+        self._expect('{')
+        while True:
+            key = self._read_member()
+            if key is None:
+                return
+            if key == 'shapes':
+                self._expect('[')
+                self.in_shapes = True
+                return
+            self.header[key] = self._value()
+
+    def iter_shapes(self) -> Iterator[Dict[str, Any]]:
+        """逐个产出 shapes 数组中的元素，结束后继续解析剩余的顶层字段"""
+        if not self.in_shapes:
+            return
+
+        while True:
+            char = self._peek()
+            if char == ',':
+                self.pos += 1
+                char = self._peek()
+            if char == ']':
+                self.pos += 1
+                break
+            yield self._value()
+        self.in_shapes = False
+
+        while True:
+            key = self._read_member()
+            if key is None:
+                return
+            value = self._value()
+            if key != 'shapes':
+                self.header[key] = value
+
+
+class ProjectStreamReader:
+    """项目文件流式读取器
+
+    打开后 header 即可用（shapes 以外的顶层字段），随后迭代读取器逐个得到图形字典。
+    """
+
+    def __init__(self, filename: str, chunk_size: int = 64 * 1024):
+        self.filename = filename
+        self.total_bytes = os.path.getsize(filename)
+        self.header: Dict[str, Any] = {}
+        self.shape_count: Optional[int] = None  # JSON 文件事先不知道图形数量
+        self.shapes_read = 0
+        self.is_binary = False
+        self._file = open(filename, 'rb')
+        self._json_stream = None
+        self._shapes = None
+
+        try:
+            if is_binary_data(self._file.read(len(MAGIC))):
+                # 二进制格式本身很紧凑，整体读入后逐条解码记录
+                self.is_binary = True
+                self._file.seek(0)
+                buffer = self._file.read()
+                self._file.close()
+                self.header, self.shape_count = decode_preamble(buffer)
+                self._shapes = iter_shape_records(buffer)
+            else:
+                self._file.seek(0)
+                self._json_stream = _JsonShapeStream(self._file, chunk_size)
+                self._json_stream.read_header()
+                self.header = self._json_stream.header
+                self._shapes = self._json_stream.iter_shapes()
+        except Exception:
+            self.close()
+            raise
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for shape_data in self._shapes:
+            self.shapes_read += 1
+            yield shape_data
+
+    def progress(self) -> float:
+        """返回 0~1 之间的读取进度"""
+        if self.is_binary:
+            if not self.shape_count:
+                return 1.0
+            return self.shapes_read / self.shape_count
+        if not self.total_bytes:
+            return 1.0
+        return min(1.0, self._json_stream.bytes_read / self.total_bytes)
+
+    def close(self):
+        """关闭文件并停止解析"""
+        if self._shapes is not None:
+            self._shapes.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
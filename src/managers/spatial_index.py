@@ -0,0 +1,112 @@
+"""
+空间索引 - 按边界框把图形分配到均匀网格中，用于框选等区域查询
+
+每个图形登记到其边界框覆盖的所有网格单元；覆盖单元过多的大图形单独存放，
+查询时总是作为候选。查询只返回候选集合，调用方再用精确的边界框判断。
+"""
+import math
+from typing import Dict, Iterable, Set, Tuple
+
+DEFAULT_CELL_SIZE = 256  # 网格单元边长（画布单位）
+MAX_CELLS_PER_SHAPE = 1024  # 超过该单元数的图形不进网格
+
+
+class SpatialIndex:
+    """均匀网格空间索引"""
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], Set] = {}  # 单元坐标 -> 图形集合
+        self._entries: Dict[int, Tuple] = {}  # id(图形) -> (图形, 单元范围或None)
+        self._large: Set = set()  # 不进网格的大图形
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, shape) -> bool:
+        return id(shape) in self._entries
+
+    def _cell_range(self, bounds) -> Tuple[int, int, int, int]:
+        """边界框覆盖的单元范围（含两端）"""
+        x1, y1, x2, y2 = bounds
+        size = self.cell_size
+        return (math.floor(x1 / size), math.floor(y1 / size),
+                math.floor(x2 / size), math.floor(y2 / size))
+
+    def insert(self, shape):
+        """登记图形（已登记则按当前边界框更新）"""
+        if id(shape) in self._entries:
+            self.remove(shape)
+
+        cx1, cy1, cx2, cy2 = self._cell_range(shape.get_bounds())
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > MAX_CELLS_PER_SHAPE:
+            self._large.add(shape)
+            self._entries[id(shape)] = (shape, None)
+            return
+
+        cells = self._cells
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = bucket = set()
+                bucket.add(shape)
+        self._entries[id(shape)] = (shape, (cx1, cy1, cx2, cy2))
+
+    def remove(self, shape):
+        """注销图形"""
+        entry = self._entries.pop(id(shape), None)
+        if entry is None:
+            return
+        cell_range = entry[1]
+        if cell_range is None:
+            self._large.discard(shape)
+            return
+
+        cx1, cy1, cx2, cy2 = cell_range
+        cells = self._cells
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.discard(shape)
+                    if not bucket:
+                        del cells[(cx, cy)]
+
+    def update(self, shape):
+        """图形几何变化后重新登记"""
+        self.insert(shape)
+
+    def rebuild(self, shapes: Iterable):
+        """按图形列表重建索引"""
+        self.clear()
+        for shape in shapes:
+            self.insert(shape)
+
+    def clear(self):
+        """清空索引"""
+        self._cells.clear()
+        self._entries.clear()
+        self._large.clear()
+
+    def query(self, x1: float, y1: float, x2: float, y2: float) -> Set:
+        """返回边界框可能与矩形相交的候选图形"""
+        if x1 > x2:
+            x1, x2 = x2, x1
+        if y1 > y2:
+            y1, y2 = y2, y1
+
+        cx1, cy1, cx2, cy2 = self._cell_range((x1, y1, x2, y2))
+        # 查询区域的单元数超过已占用单元数时，直接遍历已占用单元更快
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > len(self._cells):
+            buckets = [bucket for (cx, cy), bucket in self._cells.items()
+                       if cx1 <= cx <= cx2 and cy1 <= cy <= cy2]
+        else:
+            cells = self._cells
+            buckets = [cells[(cx, cy)] for cx in range(cx1, cx2 + 1)
+                       for cy in range(cy1, cy2 + 1) if (cx, cy) in cells]
+
+        result = set(self._large)
+        for bucket in buckets:
+            result.update(bucket)
+        return result
@@ -0,0 +1,126 @@
+"""
+瓦片缓存 - 无限画布模式下把世界空间划分为固定大小的瓦片，每块瓦片渲染为图像后缓存
+
+瓦片在屏幕上的边长固定（TILE_SIZE 像素），对应的世界尺寸随缩放比例变化，缓存键为
+(缩放比例, 列号, 行号)。图形变化时只丢弃与其新旧边界框重叠的瓦片，平移时直接复用已缓存的瓦片。
+"""
+import math
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+
+TILE_SIZE = 256  # 瓦片边长（屏幕像素）
+MAX_TILES = 192  # 最多缓存的瓦片数的下限（约48MB），绘制区域较大时由 reserve 提高
+SHAPE_PAD = 32  # 边界框外扩（世界单位），覆盖线宽和笔刷超出边界框的部分
+
+
+class TileCache:
+    """瓦片缓存（LRU）
+
+    render(rect, scale, *args) 负责把与世界矩形 rect 相交的图形渲染为显示用图像，
+    返回 (图像, 绘制的图形列表)。
+    """
+
+    def __init__(self, render: Callable, tile_size: int = TILE_SIZE, max_tiles: int = MAX_TILES):
+        self.render = render
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()  # (缩放比例, 列, 行) -> 图像
+        self._rendered: Dict[int, Tuple] = {}  # id(图形) -> 渲染进瓦片时的边界框
+        self._tile_shapes: Dict[Tuple, List[int]] = {}  # 瓦片键 -> 渲染进该瓦片的图形id
+        self._refs: Dict[int, int] = {}  # id(图形) -> 含有该图形的已缓存瓦片数
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    def __contains__(self, key) -> bool:
+        return key in self._tiles
+
+    def world_tile_size(self, scale: float) -> float:
+        """瓦片对应的世界尺寸"""
+        return self.tile_size / scale
+
+    def tile_rect(self, key) -> Tuple[float, float, float, float]:
+        """瓦片覆盖的世界矩形"""
+        scale, tx, ty = key
+        size = self.world_tile_size(scale)
+        return (tx * size, ty * size, (tx + 1) * size, (ty + 1) * size)
+
+    def tile_keys(self, region, scale: float) -> List[Tuple]:
+        """覆盖世界矩形 region 的所有瓦片键"""
+        x1, y1, x2, y2 = region
+        size = self.world_tile_size(scale)
+        return [(scale, tx, ty)
+                for ty in range(math.floor(y1 / size), math.floor(y2 / size) + 1)
+                for tx in range(math.floor(x1 / size), math.floor(x2 / size) + 1)]
+
+    def reserve(self, count: int):
+        """保证能同时缓存 count 块瓦片的两倍，避免同一次绘制中新渲染的瓦片互相淘汰"""
+        self.max_tiles = max(self.max_tiles, 2 * count)
+
+    def peek(self, key):
+        """获取已缓存的瓦片，未缓存时返回None"""
+        image = self._tiles.get(key)
+        if image is not None:
+            self._tiles.move_to_end(key)
+        return image
+
+    def get(self, key, *args):
+        """获取瓦片，未缓存时渲染（额外参数原样传给 render）"""
+        image = self.peek(key)
+        if image is not None:
+            return image
+
+        image, shapes = self.render(self.tile_rect(key), key[0], *args)
+        for shape in shapes:
+            self._rendered[id(shape)] = shape.get_bounds()
+            self._refs[id(shape)] = self._refs.get(id(shape), 0) + 1
+        self._tile_shapes[key] = [id(shape) for shape in shapes]
+        self._tiles[key] = image
+        while len(self._tiles) > self.max_tiles:
+            self._discard(next(iter(self._tiles)))
+        return image
+
+    def _discard(self, key):
+        """丢弃瓦片；不再出现在任何已缓存瓦片中的图形同时移出 _rendered"""
+        del self._tiles[key]
+        for shape_id in self._tile_shapes.pop(key, ()):
+            refs = self._refs[shape_id] - 1
+            if refs:
+                self._refs[shape_id] = refs
+            else:
+                del self._refs[shape_id]
+                self._rendered.pop(shape_id, None)
+
+    def invalidate_rect(self, rect):
+        """丢弃与世界矩形（按 SHAPE_PAD 外扩）相交的瓦片"""
+        x1, y1, x2, y2 = rect
+        x1 -= SHAPE_PAD
+        y1 -= SHAPE_PAD
+        x2 += SHAPE_PAD
+        y2 += SHAPE_PAD
+        stale = []
+        for key in self._tiles:
+            tx1, ty1, tx2, ty2 = self.tile_rect(key)
+            if tx1 <= x2 and x1 <= tx2 and ty1 <= y2 and y1 <= ty2:
+                stale.append(key)
+        for key in stale:
+            self._discard(key)
+
+    def invalidate_shape(self, shape, tiled: bool):
+        """图形变化后丢弃受影响的瓦片
+
+        渲染过该图形的瓦片按渲染时的边界框丢弃；tiled 表示图形变化后仍应画进瓦片，
+        此时再按当前边界框丢弃。
+        """
+        old_bounds = self._rendered.pop(id(shape), None)
+        if old_bounds is not None:
+            self.invalidate_rect(old_bounds)
+        if tiled:
+            self.invalidate_rect(shape.get_bounds())
+
+    def clear(self):
+        """清空缓存"""
+        self._tiles.clear()
+        self._rendered.clear()
+        self._tile_shapes.clear()
+        self._refs.clear()
@@ -0,0 +1,116 @@
+"""
+视口 - 二维画布的缩放与平移
+
+画布坐标 = 世界坐标 × 缩放比例，平移由Tk画布自身的滚动（xview/yview）完成。
+图形和绘图管理器始终按世界坐标绘制，由 ViewCanvas 代理统一换算成画布坐标；
+线宽、字体等保持屏幕像素不变。
+"""
+from typing import Tuple
+
+MIN_SCALE = 0.05  # 最小缩放比例
+MAX_SCALE = 20.0  # 最大缩放比例
+ZOOM_STEP = 1.25  # 每次放大/缩小的倍数
+LOD_SCALE = 0.5  # 缩放比例低于该值时使用简化绘制
+CULL_MARGIN = 0.5  # 绘制区域在可见区域四周额外扩展的比例（相对视口尺寸），小幅滚动无需重绘
+WORLD_EXTENT = (0, 0, 2000, 2000)  # 默认世界范围（原固定滚动区域）
+
+
+class Viewport:
+    """视口变换：只保存缩放比例，平移量由画布滚动位置决定"""
+
+    def __init__(self):
+        self.scale = 1.0
+
+    def set_scale(self, scale: float) -> bool:
+        """设置缩放比例（限制在允许范围内），返回是否发生变化"""
+        scale = max(MIN_SCALE, min(MAX_SCALE, scale))
+        if abs(scale - self.scale) < 1e-9:
+            return False
+        self.scale = scale
+        return True
+
+    def to_canvas(self, x: float, y: float) -> Tuple[float, float]:
+        """世界坐标 -> 画布坐标"""
+        return x * self.scale, y * self.scale
+
+    def to_world(self, x: float, y: float) -> Tuple[float, float]:
+        """画布坐标 -> 世界坐标"""
+        return x / self.scale, y / self.scale
+
+    def is_simplified(self) -> bool:
+        """当前缩放比例下是否使用简化绘制"""
+        return self.scale < LOD_SCALE
+
+
+class ViewCanvas:
+    """画布代理：按世界坐标创建和修改画布项
+
+    create_*、coords、move 的坐标按缩放比例换算；canvasx/canvasy 返回世界坐标。
+    其余方法原样转发给真实画布。缩放比例为1时直接转发，不产生额外开销。
+    """
+
+    def __init__(self, canvas, viewport: Viewport):
+        self._canvas = canvas
+        self.viewport = viewport
+
+    def __getattr__(self, name):
+        return getattr(self._canvas, name)
+
+    def _scaled(self, args):
+        """把坐标参数（数值序列或点序列）换算为画布坐标"""
+        if len(args) == 1 and isinstance(args[0], (list, tuple)):
+            args = args[0]
+        scale = self.viewport.scale
+        coords = []
+        for value in args:
+            if isinstance(value, (list, tuple)):
+                coords.extend(c * scale for c in value)
+            else:
+                coords.append(value * scale)
+        return coords
+
+    def _create(self, method, args, kwargs):
+        if self.viewport.scale == 1.0:
+            return method(*args, **kwargs)
+        return method(*self._scaled(args), **kwargs)
+
+    def create_line(self, *args, **kwargs):
+        return self._create(self._canvas.create_line, args, kwargs)
+
+    def create_rectangle(self, *args, **kwargs):
+        return self._create(self._canvas.create_rectangle, args, kwargs)
+
+    def create_oval(self, *args, **kwargs):
+        return self._create(self._canvas.create_oval, args, kwargs)
+
+    def create_polygon(self, *args, **kwargs):
+        return self._create(self._canvas.create_polygon, args, kwargs)
+
+    def create_arc(self, *args, **kwargs):
+        return self._create(self._canvas.create_arc, args, kwargs)
+
+    def create_text(self, *args, **kwargs):
+        return self._create(self._canvas.create_text, args, kwargs)
+
+    def create_image(self, *args, **kwargs):
+        return self._create(self._canvas.create_image, args, kwargs)
+
+    def coords(self, item, *args):
+        """读取或设置画布项坐标（世界坐标）"""
+        scale = self.viewport.scale
+        if args:
+            return self._canvas.coords(item, *self._scaled(args))
+        return [c / scale for c in self._canvas.coords(item)]
+
+    def move(self, tag, dx: float, dy: float):
+        """按世界坐标位移移动画布项"""
+        scale = self.viewport.scale
+        return self._canvas.move(tag, dx * scale, dy * scale)
+
+    def canvasx(self, x, gridspacing=None):
+        """窗口坐标 -> 世界坐标"""
+        return self._canvas.canvasx(x) / self.viewport.scale
+
+    def canvasy(self, y, gridspacing=None):
+        """窗口坐标 -> 世界坐标"""
+        return self._canvas.canvasy(y) / self.viewport.scale
@@ -1,4 +1,6 @@
 # 图形模块初始化文件
+import importlib
+
 from .base_shape import BaseShape
 from .point import Point
 from .line import Line
@@ -7,6 +9,14 @@ from .circle import Circle
 from .polygon import Polygon
 from .bezier_curve import BezierCurve
 from .brush_stroke import BrushStroke
-from .image import Image
 
-__all__ = ['BaseShape', 'Point', 'Line', 'Rectangle', 'Circle', 'Polygon', 'BezierCurve', 'BrushStroke', 'Image']
\ No newline at end of file
+__all__ = ['BaseShape', 'Point', 'Line', 'Rectangle', 'Circle', 'Polygon', 'BezierCurve', 'BrushStroke', 'Image']
+
+
+def __getattr__(name):
+    # Image 依赖 PIL / Tk，按需导入，几何图形可以在没有它们的环境中单独使用
+    if name != 'Image':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = importlib.import_module('.image', __name__).Image
+    globals()[name] = value
+    return value
@@ -9,6 +9,8 @@ from typing import Tuple, Dict, Any, List
 class BaseShape(ABC):
     """所有图形的基础类"""
     
+    view_scale = 1.0  # 当前视图缩放比例（屏幕像素/画布单位），用于决定绘制精度
+    
     def __init__(self, x: float = 0, y: float = 0):
         self.x = x  # 图形的x坐标
         self.y = y  # 图形的y坐标
@@ -18,6 +20,8 @@ class BaseShape(ABC):
         self.selected = False  # 是否被选中
         self.visible = True  # 是否可见
         self.resize_handle_size = 6  # 调整大小控制点的大小
+        self._geometry = None  # 派生几何缓存（边界框、边表等）
+        self._geometry_key = None
         
     @abstractmethod
     def draw(self, canvas):
@@ -44,6 +48,37 @@ class BaseShape(ABC):
         """缩放图形"""
         pass
     
+    def geometry_key(self):
+        """返回决定派生几何的值，与缓存时不同则重建缓存
+        
+        子类返回能快速比较的元组；点列表采用写时复制，用 (id, 长度) 即可识别变化，
+        缓存本身持有该列表的引用，id 不会被复用。
+        """
+        return None
+    
+    def build_geometry(self) -> Dict[str, Any]:
+        """计算点击判定和边界框用的派生几何，子类重写"""
+        return {}
+    
+    def get_geometry(self) -> Dict[str, Any]:
+        """获取派生几何缓存，几何数据变化后自动重建"""
+        key = self.geometry_key()
+        if self._geometry is None or key != self._geometry_key:
+            self._geometry = self.build_geometry()
+            self._geometry_key = key
+        return self._geometry
+    
+    def invalidate_geometry(self):
+        """原地修改几何数据后显式使缓存失效"""
+        self._geometry = None
+    
+    def draw_simplified(self, canvas):
+        """缩小显示时的简化绘制（细节级别），默认与完整绘制相同
+        
+        逐像素绘制的图形在子类中改用单个画布项绘制轮廓。
+        """
+        self.draw(canvas)
+    
     def set_color(self, color: str):
         """设置图形颜色"""
         self.color = color
@@ -92,9 +127,9 @@ class BaseShape(ABC):
         return []  # 默认实现，子类可以重写
     
     def get_handle_at_point(self, x: float, y: float) -> str:
-        """获取指定点处的控制点类型"""
+        """获取指定点处的控制点类型（控制点大小按屏幕像素计算，不随缩放变化）"""
         handles = self.get_resize_handles()
-        handle_size = self.resize_handle_size
+        handle_size = self.resize_handle_size / self.view_scale
         
         for hx, hy, handle_type in handles:
             if (abs(x - hx) <= handle_size and abs(y - hy) <= handle_size):
@@ -115,13 +150,13 @@ class BaseShape(ABC):
             return
             
         handles = self.get_resize_handles()
-        handle_size = self.resize_handle_size
+        half_size = self.resize_handle_size // 2 / self.view_scale
         
         for hx, hy, handle_type in handles:
-            x1 = hx - handle_size // 2
-            y1 = hy - handle_size // 2
-            x2 = hx + handle_size // 2
-            y2 = hy + handle_size // 2
+            x1 = hx - half_size
+            y1 = hy - half_size
+            x2 = hx + half_size
+            y2 = hy + half_size
             
             # 根据控制点类型设置不同的颜色
             if handle_type == 'center':
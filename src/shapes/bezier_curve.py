@@ -3,10 +3,70 @@
 实现三次贝塞尔曲线，支持4个控制点调整曲率
 """
 import math
-from typing import Tuple, Dict, Any, List
+from typing import Tuple, Dict, Any, List, Optional
 from .base_shape import BaseShape
 
 
+HIT_TOLERANCE = 5  # 点击判定的容错距离（像素）
+FLATNESS_EPSILON = 0.01  # 距离计算时把子曲线视为直线的最大偏差（像素）
+FLATTEN_TOLERANCE = 0.25  # 绘制时折线与曲线的最大偏差（屏幕像素）
+MAX_FLATTEN_DEPTH = 16  # 细分最大深度，防止退化曲线无限细分
+
+
+def _split(points, t: float = 0.5):
+    """de Casteljau 细分，把控制点序列在参数t处分成两段"""
+    (x0, y0), (x1, y1), (x2, y2), (x3, y3) = points
+    ax, ay = x0 + (x1 - x0) * t, y0 + (y1 - y0) * t
+    bx, by = x1 + (x2 - x1) * t, y1 + (y2 - y1) * t
+    cx, cy = x2 + (x3 - x2) * t, y2 + (y3 - y2) * t
+    dx, dy = ax + (bx - ax) * t, ay + (by - ay) * t
+    ex, ey = bx + (cx - bx) * t, by + (cy - by) * t
+    mx, my = dx + (ex - dx) * t, dy + (ey - dy) * t
+    return ((x0, y0), (ax, ay), (dx, dy), (mx, my)), ((mx, my), (ex, ey), (cx, cy), (x3, y3))
+
+
+def _flatness(points) -> float:
+    """曲线偏离弦的最大距离的平方上界，用于判断子曲线能否视为直线"""
+    (x0, y0), (x1, y1), (x2, y2), (x3, y3) = points
+    ux = 3 * x1 - 2 * x0 - x3
+    uy = 3 * y1 - 2 * y0 - y3
+    vx = 3 * x2 - x0 - 2 * x3
+    vy = 3 * y2 - y0 - 2 * y3
+    return (max(ux * ux, vx * vx) + max(uy * uy, vy * vy)) / 16
+
+
+def _segment_distance_sq(x: float, y: float, x1: float, y1: float, x2: float, y2: float) -> float:
+    """点到线段距离的平方"""
+    dx = x2 - x1
+    dy = y2 - y1
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return (x - x1) ** 2 + (y - y1) ** 2
+    t = max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / length_sq))
+    px = x1 + t * dx - x
+    py = y1 + t * dy - y
+    return px * px + py * py
+
+
+def _axis_extrema(a: float, b: float, c: float, d: float) -> List[float]:
+    """一维三次贝塞尔在 (0, 1) 内导数为零的参数"""
+    # B'(t)/3 = qa*t² + qb*t + qc
+    qa = -a + 3 * b - 3 * c + d
+    qb = 2 * (a - 2 * b + c)
+    qc = b - a
+    roots = []
+    if abs(qa) < 1e-12:
+        if abs(qb) > 1e-12:
+            roots.append(-qc / qb)
+    else:
+        disc = qb * qb - 4 * qa * qc
+        if disc >= 0:
+            sqrt_disc = math.sqrt(disc)
+            roots.append((-qb + sqrt_disc) / (2 * qa))
+            roots.append((-qb - sqrt_disc) / (2 * qa))
+    return [t for t in roots if 0 < t < 1]
+
+
 class BezierCurve(BaseShape):
     """三次贝塞尔曲线图形"""
     
@@ -29,7 +89,7 @@ class BezierCurve(BaseShape):
         self.p2 = p2  # 第二个控制点
         self.p3 = p3  # 终点
         
-        self.curve_resolution = 50  # 曲线分段数，影响绘制精度
+        self.curve_resolution = 50  # 旧版固定分段数，仅为兼容文件格式保留，绘制改为自适应细分
         
     def bezier_point(self, t: float) -> Tuple[float, float]:
         """
@@ -58,12 +118,37 @@ class BezierCurve(BaseShape):
         
         return (x, y)
     
-    def get_curve_points(self) -> List[Tuple[float, float]]:
-        """获取曲线上的所有点"""
-        points = []
-        for i in range(self.curve_resolution + 1):
-            t = i / self.curve_resolution
-            points.append(self.bezier_point(t))
+    def get_curve_points(self, scale: float = 1.0) -> List[Tuple[float, float]]:
+        """获取逼近曲线的折线点
+        
+        按平直度自适应细分：偏差不超过 FLATTEN_TOLERANCE 个屏幕像素，scale 为屏幕像素/画布单位，
+        因此短而平的曲线只有几段，长而弯的曲线段数更多。结果按容差缓存到控制点变化为止，
+        屏幕绘制和导出共用。
+        """
+        polylines = self.get_geometry()['polylines']
+        tolerance = FLATTEN_TOLERANCE / max(scale, 1e-6)
+        points = polylines.get(tolerance)
+        if points is None:
+            if len(polylines) >= 4:
+                polylines.clear()
+            points = self._flatten(tolerance)
+            polylines[tolerance] = points
+        return points
+    
+    def _flatten(self, tolerance: float) -> List[Tuple[float, float]]:
+        """把曲线细分为偏差不超过 tolerance 的折线"""
+        tolerance_sq = tolerance * tolerance
+        points = [self.p0]
+        # 后进先出，先压入后半段，保证输出点按参数顺序排列
+        stack = [((self.p0, self.p1, self.p2, self.p3), 0)]
+        while stack:
+            segment, depth = stack.pop()
+            if depth >= MAX_FLATTEN_DEPTH or _flatness(segment) <= tolerance_sq:
+                points.append(segment[3])
+            else:
+                first, second = _split(segment)
+                stack.append((second, depth + 1))
+                stack.append((first, depth + 1))
         return points
     
     def draw(self, canvas):
@@ -73,17 +158,15 @@ class BezierCurve(BaseShape):
             
         outline_color = "red" if self.selected else self.color
         
-        # 获取曲线上的所有点
-        curve_points = self.get_curve_points()
-        
-        # 绘制曲线（连接所有点）
-        for i in range(len(curve_points) - 1):
-            x1, y1 = curve_points[i]
-            x2, y2 = curve_points[i + 1]
-            canvas.create_line(x1, y1, x2, y2,
-                              fill=outline_color,
-                              width=self.line_width,
-                              tags="shape")
+        # 整条曲线作为一个多点线条绘制
+        curve_points = self.get_curve_points(self.view_scale)
+        coords = [c for point in curve_points for c in point]
+        canvas.create_line(*coords,
+                          fill=outline_color,
+                          width=max(1, self.line_width * self.view_scale),
+                          capstyle="round",
+                          joinstyle="round",
+                          tags="shape")
         
         # 如果被选中，绘制控制点和控制线
         if self.selected:
@@ -114,29 +197,73 @@ class BezierCurve(BaseShape):
         canvas.create_oval(self.p2[0]-r2, self.p2[1]-r2, self.p2[0]+r2, self.p2[1]+r2,
                           fill="green", outline="darkgreen", width=2, tags="shape")
     
+    def geometry_key(self):
+        """控制点决定全部派生几何"""
+        return (self.p0, self.p1, self.p2, self.p3)
+    
+    def build_geometry(self) -> Dict[str, Any]:
+        """边界框在首次使用时计算，折线按容差缓存（容差 -> 点列表）"""
+        return {'bounds': None, 'polylines': {}}
+    
     def contains_point(self, x: float, y: float) -> bool:
-        """检查点是否在曲线附近"""
-        curve_points = self.get_curve_points()
-        
-        # 检查是否靠近曲线上的任意一点
-        for px, py in curve_points:
-            distance = math.sqrt((x - px) ** 2 + (y - py) ** 2)
-            if distance <= 5:  # 5像素的容错范围
-                return True
+        """检查点是否在曲线附近（精确距离，容错 HIT_TOLERANCE 像素）"""
+        x1, y1, x2, y2 = self.get_bounds()
+        # 容差按屏幕像素计算
+        tolerance = HIT_TOLERANCE / self.view_scale
+        if (x < x1 - tolerance or x > x2 + tolerance or
+                y < y1 - tolerance or y > y2 + tolerance):
+            return False
+        return self.distance_to_point(x, y, tolerance) <= tolerance
+    
+    def distance_to_point(self, x: float, y: float, limit: Optional[float] = None) -> float:
+        """点到曲线的距离
         
-        return False
+        递归细分曲线：控制点包围盒（曲线一定在其内）离点比当前最优值还远的子曲线直接丢弃，
+        弦距离加上平直度偏差已能确定结果时不再细分，近的一半先处理。
+        给出 limit 时只关心距离是否不超过它：超过时返回值只保证大于 limit。
+        """
+        best_sq = math.inf
+        prune_sq = math.inf if limit is None else limit * limit + 1e-9
+        stack = [(self.p0, self.p1, self.p2, self.p3)]
+        while stack:
+            points = stack.pop()
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            gap_x = max(min(xs) - x, 0.0, x - max(xs))
+            gap_y = max(min(ys) - y, 0.0, y - max(ys))
+            if gap_x * gap_x + gap_y * gap_y >= min(best_sq, prune_sq):
+                continue
+            
+            start, end = points[0], points[3]
+            chord_sq = _segment_distance_sq(x, y, start[0], start[1], end[0], end[1])
+            deviation = math.sqrt(_flatness(points))
+            if limit is not None and math.sqrt(chord_sq) + deviation <= limit:
+                return math.sqrt(chord_sq)
+            if deviation <= FLATNESS_EPSILON:
+                best_sq = min(best_sq, chord_sq)
+                continue
+            
+            first, second = _split(points)
+            if (x - start[0]) ** 2 + (y - start[1]) ** 2 < (x - end[0]) ** 2 + (y - end[1]) ** 2:
+                stack.append(second)
+                stack.append(first)
+            else:
+                stack.append(first)
+                stack.append(second)
+        return math.sqrt(best_sq)
     
     def get_bounds(self) -> Tuple[float, float, float, float]:
-        """获取曲线的边界框"""
-        curve_points = self.get_curve_points()
-        
-        if not curve_points:
-            return (0, 0, 0, 0)
-        
-        x_coords = [p[0] for p in curve_points]
-        y_coords = [p[1] for p in curve_points]
-        
-        return (min(x_coords), min(y_coords), max(x_coords), max(y_coords))
+        """获取曲线的精确边界框（端点与导数零点处的极值），结果缓存到控制点变化为止"""
+        geometry = self.get_geometry()
+        if geometry['bounds'] is None:
+            xs = [self.p0[0], self.p3[0]]
+            ys = [self.p0[1], self.p3[1]]
+            for t in _axis_extrema(self.p0[0], self.p1[0], self.p2[0], self.p3[0]):
+                xs.append(self.bezier_point(t)[0])
+            for t in _axis_extrema(self.p0[1], self.p1[1], self.p2[1], self.p3[1]):
+                ys.append(self.bezier_point(t)[1])
+            geometry['bounds'] = (min(xs), min(ys), max(xs), max(ys))
+        return geometry['bounds']
     
     def move(self, dx: float, dy: float):
         """移动曲线"""
@@ -199,6 +199,17 @@ class BrushStroke(BaseShape):
             # 默认绘制方法
             self.draw_ballpoint(canvas)
     
+    def draw_simplified(self, canvas):
+        """缩小显示时整条轨迹用单个线条项绘制"""
+        if not self.visible or len(self.points) < 2:
+            return
+        canvas.create_line([c for point in self.points for c in point],
+                          fill=self.color,
+                          width=max(1, self.brush_size * self.view_scale),
+                          capstyle="round",
+                          joinstyle="round",
+                          tags="brush_stroke")
+    
     # ======= 实时绘制生命周期（与 DrawingManager 配合） =======
     def begin_live(self):
         """开始一次实时笔刷绘制，初始化临时缓存（为未来批量渲染预留）"""
@@ -221,7 +232,7 @@ class BrushStroke(BaseShape):
             # 绘制线段
             canvas.create_line(x1, y1, x2, y2,
                              fill=self.color,
-                             width=self.brush_size,
+                             width=self.brush_size * self.view_scale,
                              capstyle="round",
                              smooth=True,
                              tags="brush_stroke")
@@ -245,7 +256,7 @@ class BrushStroke(BaseShape):
                 canvas.create_line(texture_item['x1'], texture_item['y1'],
                                  texture_item['x2'], texture_item['y2'],
                                  fill=texture_item['color'],
-                                 width=texture_item['width'],
+                                 width=texture_item['width'] * self.view_scale,
                                  capstyle="round",
                                  smooth=True,
                                  tags="brush_stroke")
@@ -283,14 +294,15 @@ class BrushStroke(BaseShape):
                 xsb, ysb = self.points[i + 1]
                 canvas.create_line(xsa, ysa, xsb, ysb,
                                    fill=effective_color,
-                                   width=self.brush_size,
+                                   width=self.brush_size * self.view_scale,
                                    capstyle="round",
                                    smooth=True,
                                    tags="brush_stroke")
             return
 
-        # 创建透明画布
-        img = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+        # 创建透明画布（按当前缩放比例生成屏幕分辨率的图像）
+        s = self.view_scale
+        img = Image.new("RGBA", (max(1, int(w * s)), max(1, int(h * s))), (0, 0, 0, 0))
         draw = ImageDraw.Draw(img, "RGBA")
 
         # 颜色解析 + 50% 透明
@@ -305,11 +317,11 @@ class BrushStroke(BaseShape):
             xsa, ysa = self.points[i]
             xsb, ysb = self.points[i + 1]
             # 偏移到局部坐标
-            ax, ay = xsa - x0, ysa - y0
-            bx, by = xsb - x0, ysb - y0
-            draw.line([(ax, ay), (bx, by)], fill=rgba, width=self.brush_size)
+            ax, ay = (xsa - x0) * s, (ysa - y0) * s
+            bx, by = (xsb - x0) * s, (ysb - y0) * s
+            draw.line([(ax, ay), (bx, by)], fill=rgba, width=max(1, int(self.brush_size * s)))
             # 端点加圆头（近似）
-            rcap = self.brush_size / 2
+            rcap = self.brush_size * s / 2
             draw.ellipse([ax - rcap, ay - rcap, ax + rcap, ay + rcap], fill=rgba)
             draw.ellipse([bx - rcap, by - rcap, bx + rcap, by + rcap], fill=rgba)
 
@@ -346,21 +358,32 @@ class BrushStroke(BaseShape):
             # 解析失败返回黑色
             return (0, 0, 0)
     
-    def get_bounds(self) -> Tuple[float, float, float, float]:
-        """获取边界框"""
+    def geometry_key(self):
+        """轨迹点只会追加，列表对象、长度和笔刷大小即可识别变化"""
+        return (id(self.points), len(self.points), self.brush_size, self.x, self.y)
+    
+    def build_geometry(self) -> Dict[str, Any]:
+        """预计算边界框"""
         if not self.points:
-            return (self.x, self.y, self.x, self.y)
+            return {'points': self.points, 'bounds': (self.x, self.y, self.x, self.y)}
             
         xs = [p[0] for p in self.points]
         ys = [p[1] for p in self.points]
         
         half_brush = self.brush_size / 2
-        return (
-            min(xs) - half_brush,
-            min(ys) - half_brush,
-            max(xs) + half_brush,
-            max(ys) + half_brush
-        )
+        return {
+            'points': self.points,  # 持有列表引用，保证 geometry_key 中的 id 有效
+            'bounds': (
+                min(xs) - half_brush,
+                min(ys) - half_brush,
+                max(xs) + half_brush,
+                max(ys) + half_brush
+            ),
+        }
+    
+    def get_bounds(self) -> Tuple[float, float, float, float]:
+        """获取边界框"""
+        return self.get_geometry()['bounds']
     
     def contains_point(self, x: float, y: float) -> bool:
         """检查点是否在轨迹内 - 笔刷轨迹不可选中，始终返回False"""
@@ -223,6 +223,17 @@ class Circle(BaseShape):
                         tags="temp"  # 使用temp标签便于清除
                     )
 
+    def draw_simplified(self, canvas):
+        """缩小显示时用单个椭圆项绘制"""
+        if not self.visible:
+            return
+        outline_color = "red" if self.selected else self.color
+        fill_color = self.fill_color if self.fill_color and self.fill_color.lower() != "white" else ""
+        canvas.create_oval(self.x - self.radius_x, self.y - self.radius_y,
+                          self.x + self.radius_x, self.y + self.radius_y,
+                          outline=outline_color, fill=fill_color, width=1, tags="shape")
+        self.draw_resize_handles(canvas)
+    
     def draw(self, canvas):
         """在画布上绘制圆形/椭圆 - 使用中点椭圆算法"""
         if not self.visible:
@@ -292,21 +303,36 @@ class Circle(BaseShape):
         # 绘制调整大小的控制点
         self.draw_resize_handles(canvas)
     
+    def geometry_key(self):
+        """圆心和两个半径决定派生几何"""
+        return (self.x, self.y, self.radius_x, self.radius_y)
+    
+    def build_geometry(self) -> Dict[str, Any]:
+        """预计算边界框和半径平方的倒数"""
+        valid = self.radius_x > 0 and self.radius_y > 0
+        return {
+            'bounds': (self.x - self.radius_x, self.y - self.radius_y,
+                       self.x + self.radius_x, self.y + self.radius_y),
+            'valid': valid,
+            'inv_rx_sq': 1.0 / (self.radius_x * self.radius_x) if valid else 0.0,
+            'inv_ry_sq': 1.0 / (self.radius_y * self.radius_y) if valid else 0.0,
+        }
+    
     def contains_point(self, x: float, y: float) -> bool:
         """检查点是否在椭圆内部"""
         # 椭圆内部判断公式：(x-cx)²/rx² + (y-cy)²/ry² <= 1
+        geometry = self.get_geometry()
         # 防止除零错误
-        if self.radius_x <= 0 or self.radius_y <= 0:
+        if not geometry['valid']:
             return False
             
         dx = x - self.x
         dy = y - self.y
-        return (dx * dx) / (self.radius_x * self.radius_x) + (dy * dy) / (self.radius_y * self.radius_y) <= 1
+        return dx * dx * geometry['inv_rx_sq'] + dy * dy * geometry['inv_ry_sq'] <= 1
     
     def get_bounds(self) -> Tuple[float, float, float, float]:
         """获取椭圆的边界框"""
-        return (self.x - self.radius_x, self.y - self.radius_y,
-                self.x + self.radius_x, self.y + self.radius_y)
+        return self.get_geometry()['bounds']
     
     def move(self, dx: float, dy: float):
         """移动圆形"""
@@ -3,8 +3,9 @@
 """
 from typing import Tuple, Dict, Any, Optional
 from .rectangle import Rectangle
+from .image_cache import image_cache, decode_image, read_image_size
 import tkinter as tk
-from PIL import Image as PILImage, ImageTk
+from PIL import Image as PILImage
 import os
 
 
@@ -14,56 +15,187 @@ class Image(Rectangle):
     def __init__(self, x1: float, y1: float, x2: float, y2: float, image_path: str = None):
         super().__init__(x1, y1, x2, y2)
         self.image_path = image_path
-        self.pil_image = None  # PIL图像对象
-        self.tk_image = None   # Tkinter图像对象
+        self.cache_key = None  # 共享图像缓存中的文件键（首次显示时计算）
+        self.tk_image = None   # Tkinter图像对象（来自共享缓存，只在可见时保留）
         self.canvas_image_id = None  # 画布图像ID
+        self.canvas = None  # 最近一次绘制所用的画布（后台缩放完成后更新图像）
+        self.placeholder_id = None  # 后台解码期间显示的占位框
         self.original_width = 0
         self.original_height = 0
         
-        # 如果提供了图片路径，尝试加载图片
+        # 如果提供了图片路径，只读取文件头获取尺寸，像素延迟到可见时解码
         if image_path:
             self.load_image(image_path)
     
     def load_image(self, image_path: str) -> bool:
-        """加载图片文件"""
+        """加载图片文件（只读取文件头中的尺寸，不解码像素）"""
         try:
             if not os.path.exists(image_path):
                 raise FileNotFoundError(f"图片文件不存在: {image_path}")
             
-            # 使用PIL加载图片
-            self.pil_image = PILImage.open(image_path)
-            self.original_width, self.original_height = self.pil_image.size
-            self.image_path = image_path
-            
-            # 初始时调整图片大小以适应矩形
-            self._resize_image()
+            # 只解析文件头
+            size = read_image_size(image_path)
+            if not size:
+                return False
+            self.set_image_info(image_path, size[0], size[1])
             return True
             
         except Exception as e:
             print(f"加载图片失败: {e}")
             return False
     
+    def set_image_info(self, image_path: str, original_width: int, original_height: int):
+        """设置图片文件及其原始尺寸（已从文件头读取时使用，避免重复打开文件）"""
+        self.image_path = image_path
+        self.original_width = original_width
+        self.original_height = original_height
+        self.cache_key = None
+        self.tk_image = None
+    
+    def is_loaded(self) -> bool:
+        """图片文件是否可用（已读取到尺寸）"""
+        return bool(self.image_path and self.original_width and self.original_height)
+    
+    def get_cache_key(self):
+        """获取图像在共享缓存中的文件键"""
+        if self.cache_key is None and self.image_path:
+            self.cache_key = image_cache.file_key(self.image_path)
+        return self.cache_key
+    
+    def get_export_image(self, width: int, height: int):
+        """按导出尺寸重新读取文件并缩放（高于工作副本的分辨率只在导出时读取，不进入缓存）"""
+        if not self.is_loaded() or width <= 0 or height <= 0:
+            return None
+        try:
+            image, _full = decode_image(self.image_path, (width, height))
+            return image.resize((width, height), PILImage.Resampling.LANCZOS)
+        except Exception as e:
+            print(f"加载图片失败: {e}")
+            return None
+    
+    def get_render_image(self, width: int, height: int):
+        """屏幕分辨率渲染（如画布瓦片）用的图像：从共享缓存的金字塔层级缩放，不重新读取文件"""
+        if not self.is_loaded() or not self.get_cache_key() or width <= 0 or height <= 0:
+            return None
+        level = image_cache.get_pyramid_level(self.cache_key, (width, height))
+        if level is None:
+            return None
+        return level.resize((width, height), PILImage.Resampling.BILINEAR)
+    
+    def _display_size(self) -> Tuple[int, int]:
+        """当前显示尺寸（屏幕像素，随视图缩放变化）"""
+        return int(self.width * self.view_scale), int(self.height * self.view_scale)
+    
+    def reset_display_image(self):
+        """视图缩放变化后丢弃当前显示图像，下次绘制时按新尺寸取用"""
+        self.tk_image = None
+    
+    def intersects_viewport(self, canvas) -> bool:
+        """判断图像是否与画布当前可见区域相交"""
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        # 画布尚未显示时使用请求的尺寸
+        if width <= 1:
+            width = canvas.winfo_reqwidth()
+        if height <= 1:
+            height = canvas.winfo_reqheight()
+        left = canvas.canvasx(0)
+        top = canvas.canvasy(0)
+        right = canvas.canvasx(width)
+        bottom = canvas.canvasy(height)
+        return (self.x2 >= left and self.x1 <= right and
+                self.y2 >= top and self.y1 <= bottom)
+    
+    def update_visibility(self, canvas):
+        """视口变化后更新图像：进入视口时解码显示，离开视口时释放显示图像"""
+        if self.canvas_image_id is None or not self.visible:
+            return
+        
+        self.canvas = canvas
+        if self.intersects_viewport(canvas):
+            if self.tk_image is None:
+                self._resize_image()
+                if self.tk_image is not None:
+                    canvas.itemconfigure(self.canvas_image_id, image=self.tk_image)
+                else:
+                    self._show_placeholder(canvas)
+            else:
+                image_cache.mark_used(self.cache_key, self._display_size())
+        else:
+            self._hide_placeholder()
+            if self.tk_image is not None:
+                canvas.itemconfigure(self.canvas_image_id, image='')
+                self.tk_image = None
+    
     def _resize_image(self):
-        """根据当前矩形大小调整图片"""
-        if not self.pil_image:
+        """根据当前矩形大小调整图片（同一文件、同一尺寸的结果在所有图像对象间共享）
+        
+        缓存中已有该尺寸时立即使用，否则交给后台线程池解码和缩放，完成后由
+        _on_variant_ready 更新画布，期间 tk_image 为 None（显示占位框）。
+        """
+        self.tk_image = None
+        if not self.is_loaded() or not self.get_cache_key():
             return
         
-        try:
-            # 计算新的图片尺寸
-            new_width = int(self.width)
-            new_height = int(self.height)
-            
-            if new_width <= 0 or new_height <= 0:
-                return
-            
-            # 调整图片大小
-            resized_image = self.pil_image.resize((new_width, new_height), PILImage.Resampling.LANCZOS)
-            
-            # 转换为Tkinter可用的格式
-            self.tk_image = ImageTk.PhotoImage(resized_image)
-            
-        except Exception as e:
-            print(f"调整图片大小失败: {e}")
+        # 计算新的图片尺寸
+        size = self._display_size()
+        if size[0] <= 0 or size[1] <= 0:
+            return
+        
+        self.tk_image = image_cache.peek_variant(self.cache_key, size)
+        if self.tk_image is None and self.canvas is not None:
+            image_cache.request_variant(self.cache_key, size, self._on_variant_ready, self.canvas)
+    
+    def _show_placeholder(self, canvas):
+        """在图像位置显示占位框（位于图像项之上，不改变与其他图形的层次）"""
+        if self.placeholder_id is not None or self.canvas_image_id is None:
+            return
+        self.placeholder_id = canvas.create_rectangle(
+            self.x1, self.y1, self.x2, self.y2,
+            outline="#b0b0b0", fill="#f0f0f0", dash=(4, 4), tags="shape"
+        )
+        canvas.tag_raise(self.placeholder_id, self.canvas_image_id)
+    
+    def _hide_placeholder(self):
+        """移除占位框"""
+        if self.placeholder_id is not None and self.canvas is not None:
+            self.canvas.delete(self.placeholder_id)
+        self.placeholder_id = None
+    
+    def _resize_preview(self):
+        """交互式缩放：从金字塔层级快速重采样，松开鼠标后再生成高质量结果"""
+        self.tk_image = None
+        if not self.is_loaded() or not self.get_cache_key():
+            return
+        
+        new_width, new_height = self._display_size()
+        if new_width <= 0 or new_height <= 0:
+            return
+        
+        size = (new_width, new_height)
+        self.tk_image = image_cache.get_preview(self.cache_key, size)
+        if self.tk_image is None and self.canvas is not None:
+            # 工作副本尚未解码：交给后台解码，期间显示占位框
+            image_cache.request_variant(self.cache_key, size, self._on_variant_ready, self.canvas)
+    
+    def finish_resize(self):
+        """缩放结束：在后台生成最终尺寸的 LANCZOS 结果，完成前继续显示预览"""
+        if not self.is_loaded() or not self.get_cache_key() or self.canvas is None:
+            return
+        
+        size = self._display_size()
+        if size[0] > 0 and size[1] > 0:
+            image_cache.request_variant(self.cache_key, size, self._on_variant_ready, self.canvas)
+    
+    def _on_variant_ready(self, size, photo):
+        """高质量缩放结果就绪（Tk线程）"""
+        # 期间尺寸又发生变化时丢弃过期结果
+        if photo is None or size != self._display_size():
+            return
+        self.tk_image = photo
+        if self.canvas is not None and self.canvas_image_id is not None:
+            self.canvas.itemconfigure(self.canvas_image_id, image=photo)
+        self._hide_placeholder()
     
     def draw(self, canvas):
         """在画布上绘制图像"""
@@ -71,10 +203,22 @@ class Image(Rectangle):
             return
         
         # 如果有图片，绘制图片
-        if self.tk_image:
-            # 删除之前的图像
+        if self.is_loaded():
+            # 删除之前的图像和占位框
             if self.canvas_image_id:
                 canvas.delete(self.canvas_image_id)
+            self.canvas = canvas
+            self._hide_placeholder()
+            
+            # 只在与视口相交时解码；视口外的图像先占住绘制顺序，滚动进入视口后再显示
+            in_viewport = self.intersects_viewport(canvas)
+            if in_viewport:
+                if self.tk_image is None:
+                    self._resize_image()
+                else:
+                    image_cache.mark_used(self.cache_key, self._display_size())
+            else:
+                self.tk_image = None
             
             # 绘制图片到画布中心
             center_x = (self.x1 + self.x2) / 2
@@ -82,9 +226,14 @@ class Image(Rectangle):
             
             self.canvas_image_id = canvas.create_image(
                 center_x, center_y,
-                image=self.tk_image,
-                anchor=tk.CENTER
+                image=self.tk_image or '',
+                anchor=tk.CENTER,
+                tags="shape"
             )
+            
+            # 后台解码尚未完成时显示占位框
+            if in_viewport and self.tk_image is None:
+                self._show_placeholder(canvas)
         
         # 如果被选中，绘制选择框
         if self.selected:
@@ -95,9 +244,13 @@ class Image(Rectangle):
             # 绘制调整手柄
             self._draw_resize_handles(canvas)
     
+    def draw_simplified(self, canvas):
+        """图像本身已按显示尺寸缓存，缩小显示时仍按原方式绘制"""
+        self.draw(canvas)
+    
     def _draw_resize_handles(self, canvas):
-        """绘制调整手柄"""
-        handle_size = 6
+        """绘制调整手柄（屏幕上大小固定）"""
+        handle_size = 6 / self.view_scale
         handles = [
             (self.x1, self.y1),  # 左上
             (self.x2, self.y1),  # 右上
@@ -111,8 +264,8 @@ class Image(Rectangle):
         
         for x, y in handles:
             canvas.create_rectangle(
-                x - handle_size // 2, y - handle_size // 2,
-                x + handle_size // 2, y + handle_size // 2,
+                x - handle_size / 2, y - handle_size / 2,
+                x + handle_size / 2, y + handle_size / 2,
                 outline="red", fill="white", width=1, tags="selection"
             )
     
@@ -132,16 +285,8 @@ class Image(Rectangle):
         self.x = (self.x1 + self.x2) / 2
         self.y = (self.y1 + self.y2) / 2
         
-        # 重新调整图片大小
-        self._resize_image()
-    
-    def move(self, dx: float, dy: float):
-        """移动图像"""
-        super().move(dx, dy)
-        self.x1 += dx
-        self.y1 += dy
-        self.x2 += dx
-        self.y2 += dy
+        # 尺寸变化后旧的显示图像失效，下次绘制时再按新尺寸生成
+        self.tk_image = None
     
     def contains_point(self, x: float, y: float) -> bool:
         """检查点是否在图像内"""
@@ -185,15 +330,18 @@ class Image(Rectangle):
         image.original_width = data.get('original_width', 0)
         image.original_height = data.get('original_height', 0)
         
-        # 重新加载图片
-        if image.image_path:
+        # 已保存尺寸时无需读取文件，像素在首次可见时才解码
+        if image.image_path and not image.is_loaded():
             image.load_image(image.image_path)
         
         return image
     
     def copy(self) -> 'Image':
-        """创建图像的副本"""
-        new_image = Image(self.x1, self.y1, self.x2, self.y2, self.image_path)
+        """创建图像的副本（共享缓存中的图像数据，不重新读取文件）"""
+        new_image = Image(self.x1, self.y1, self.x2, self.y2)
+        new_image.set_image_info(self.image_path, self.original_width, self.original_height)
+        new_image.cache_key = self.cache_key
+        new_image.tk_image = self.tk_image
         new_image.color = self.color
         new_image.fill_color = self.fill_color
         new_image.line_width = self.line_width
@@ -202,7 +350,7 @@ class Image(Rectangle):
     
     def resize_by_handle(self, handle_type: str, dx: float, dy: float):
         """保持长宽比的调整大小"""
-        if not self.pil_image:
+        if not self.is_loaded():
             # 如果没有图片，使用默认的resize行为
             super().resize_by_handle(handle_type, dx, dy)
             return
@@ -282,5 +430,5 @@ class Image(Rectangle):
         self.x = (self.x1 + self.x2) / 2
         self.y = (self.y1 + self.y2) / 2
         
-        # 重新调整图片大小
-        self._resize_image()
+        # 拖动过程中只做快速预览，高质量缩放在 finish_resize 中后台完成
+        self._resize_preview()
@@ -0,0 +1,323 @@
+"""
+图像缓存 - 进程内共享、按文件内容寻址的图像缓存
+
+缓存键由文件绝对路径、修改时间和文件大小组成，同一文件的所有 Image 对象（复制、粘贴、
+撤销/重做重建的对象）共享同一份解码后的工作副本，以及按显示尺寸缓存的缩放结果。
+所有缓存项在一个LRU中按内存上限统一淘汰。
+
+源图像分辨率策略：不保留完整分辨率的像素，只保留一份降采样解码的工作副本，尺寸为已请求的
+最大显示尺寸的 WORKING_COPY_SCALE 倍（不超过原图）；需要更大尺寸时才重新读取文件，
+导出时按导出尺寸单独读取且不进入缓存。
+
+交互式缩放时从源图像的金字塔（逐级减半）中选取最接近的层级做快速重采样；
+解码和高质量 LANCZOS 缩放由后台线程池完成（大图先用 draft/reduce 按目标尺寸降采样解码），
+结果经队列交回Tk线程生成 PhotoImage。
+"""
+import os
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from PIL import Image as PILImage, ImageTk
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 缓存的默认内存上限
+PYRAMID_MIN_SIZE = 64  # 金字塔最小层级的边长
+POLL_INTERVAL_MS = 30  # 轮询后台结果的间隔
+MAX_WORKERS = min(4, os.cpu_count() or 1)  # 后台解码线程数
+WORKING_COPY_SCALE = 2.0  # 工作副本相对最大显示尺寸的余量，放大到该倍数内无需重新读取文件
+
+
+def image_nbytes(pil_image) -> int:
+    """估算PIL图像解码后占用的字节数"""
+    width, height = pil_image.size
+    return width * height * max(1, len(pil_image.getbands()))
+
+
+def read_image_size(path: str) -> Optional[Tuple[int, int]]:
+    """只读取文件头获取图片尺寸，不解码像素"""
+    try:
+        with PILImage.open(path) as header:
+            return header.size
+    except Exception as e:
+        print(f"读取图片信息失败: {e}")
+        return None
+
+
+def _normalize_mode(image):
+    """调色板、二值等模式无法做平滑缩放和金字塔减半，统一转为RGB(A)"""
+    if image.mode in ('RGB', 'RGBA', 'L', 'LA'):
+        return image
+    return image.convert('RGBA' if 'transparency' in image.info or 'A' in image.mode else 'RGB')
+
+
+def decode_image(path: str, size: Optional[Tuple[int, int]] = None):
+    """解码图片；给出目标尺寸时对大图降采样解码
+
+    JPEG 用 draft 让解码器直接按 1/2、1/4、1/8 输出，其他格式解码后用 reduce 做整数倍盒式缩小，
+    结果仍不小于目标尺寸。返回 (图像, 是否为完整分辨率)。
+    """
+    image = PILImage.open(path)
+    full_size = image.size
+    if size and image.format == 'JPEG':
+        image.draft('RGB', size)
+    image.load()
+    image = _normalize_mode(image)
+    if size:
+        factor = min(image.width // max(1, size[0]), image.height // max(1, size[1]))
+        if factor >= 2:
+            image = image.reduce(factor)
+    return image, image.size == full_size
+
+
+class ImageCache:
+    """按内容寻址的图像LRU缓存
+
+    工作副本缓存项的键为 ('source', 文件键)，值为 (图像, 是否完整分辨率)；
+    金字塔为 ('pyramid', 文件键)，缩放结果为 ('variant', 文件键, (宽, 高))。
+    被淘汰的缩放结果如果仍在画布上显示，由图像对象自己的引用保持有效，只是不再共享。
+    缓存本身只在Tk线程访问，后台线程只做解码和缩放计算。
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()  # 缓存键 -> (对象, 字节数)
+
+        # 后台解码/缩放线程池
+        self._executor = None
+        self._results = queue.Queue()  # 后台线程 -> Tk线程
+        self._pending = {}  # 缩放结果键 -> 回调列表（相同请求合并）
+        self._poll_widget = None
+
+    @staticmethod
+    def file_key(path: str) -> Optional[Tuple]:
+        """根据路径+修改时间+大小生成文件键，文件被修改后自动得到新键"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.normcase(os.path.abspath(path)), stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def working_size(size: Tuple[int, int]) -> Tuple[int, int]:
+        """显示尺寸对应的工作副本目标尺寸"""
+        return (max(1, int(size[0] * WORKING_COPY_SCALE)),
+                max(1, int(size[1] * WORKING_COPY_SCALE)))
+
+    def _cached_working_copy(self, file_key: Tuple, size: Tuple[int, int]):
+        """返回足以显示目标尺寸的已缓存工作副本，没有时返回None"""
+        key = ('source', file_key)
+        entry = self._entries.get(key)
+        if not entry:
+            return None
+        image, full = entry[0]
+        if full or (image.width >= size[0] and image.height >= size[1]):
+            self._entries.move_to_end(key)
+            return image
+        return None
+
+    def _store_working_copy(self, file_key: Tuple, image, full: bool):
+        """保存工作副本（只在比现有副本更大时替换），旧副本的金字塔随之失效"""
+        key = ('source', file_key)
+        entry = self._entries.get(key)
+        if entry:
+            old_image, old_full = entry[0]
+            if old_full or old_image.width >= image.width:
+                return
+            self._remove(key)
+        self._remove(('pyramid', file_key))
+        self._put(key, (image, full), image_nbytes(image))
+
+    def get_working_image(self, file_key: Tuple, size: Tuple[int, int]):
+        """获取足以显示目标尺寸的工作副本，不够大时在当前线程重新按需解码"""
+        image = self._cached_working_copy(file_key, size)
+        if image is not None:
+            return image
+
+        try:
+            image, full = decode_image(file_key[0], self.working_size(size))
+        except Exception as e:
+            print(f"加载图片失败: {e}")
+            return None
+        self._store_working_copy(file_key, image, full)
+        return image
+
+    def peek_variant(self, file_key: Tuple, size: Tuple[int, int]):
+        """获取已缓存的缩放结果，未缓存时返回None（不触发解码）"""
+        key = ('variant', file_key, size)
+        entry = self._entries.get(key)
+        if entry:
+            self._entries.move_to_end(key)
+            return entry[0]
+        return None
+
+    def get_pyramid_level(self, file_key: Tuple, size: Tuple[int, int], decode: bool = True):
+        """返回金字塔中不小于目标尺寸的最小层级，需要时逐级减半生成
+
+        交互式缩放不为预览重新读取文件：已有工作副本不够大时直接放大使用，
+        松开鼠标后的高质量请求会在后台换上更大的工作副本。
+        还没有工作副本时，decode 为False则返回None，不在当前线程解码。
+        """
+        source = self._cached_working_copy(file_key, (0, 0))
+        if source is None and decode:
+            source = self.get_working_image(file_key, size)
+        if source is None:
+            return None
+
+        key = ('pyramid', file_key)
+        entry = self._entries.get(key)
+        if entry and entry[0][0] is source:
+            self._entries.move_to_end(key)
+            levels = entry[0]
+        else:
+            # 工作副本被替换或淘汰后重新解码时重建金字塔
+            self._remove(key)
+            levels = [source]
+            self._put(key, levels, 0)
+
+        width, height = size
+        while True:
+            level = levels[-1]
+            if (level.width // 2 < max(width, PYRAMID_MIN_SIZE) or
+                    level.height // 2 < max(height, PYRAMID_MIN_SIZE)):
+                break
+            levels.append(level.reduce(2))
+            self._grow(key, image_nbytes(levels[-1]))
+
+        # 从小到大找第一个足够大的层级
+        for level in reversed(levels):
+            if level.width >= width and level.height >= height:
+                return level
+        return source
+
+    def get_preview(self, file_key: Tuple, size: Tuple[int, int]):
+        """交互式缩放用的快速预览：从金字塔层级做双线性（放大时最近邻）重采样，不进入缓存
+
+        拖动期间在Tk线程调用，工作副本尚未解码时返回None，由调用方用 request_variant 交给后台。
+        """
+        level = self.get_pyramid_level(file_key, size, decode=False)
+        if level is None:
+            return None
+        if size[0] > level.width or size[1] > level.height:
+            resample = PILImage.Resampling.NEAREST
+        else:
+            resample = PILImage.Resampling.BILINEAR
+        try:
+            return ImageTk.PhotoImage(level.resize(size, resample))
+        except Exception as e:
+            print(f"调整图片大小失败: {e}")
+            return None
+
+    def request_variant(self, file_key: Tuple, size: Tuple[int, int],
+                        callback: Callable, widget):
+        """在后台线程解码并生成高质量缩放结果，完成后在Tk线程调用 callback(size, photo)"""
+        key = ('variant', file_key, size)
+        entry = self._entries.get(key)
+        if entry:
+            self._entries.move_to_end(key)
+            callback(size, entry[0])
+            return
+
+        if key in self._pending:
+            self._pending[key].append(callback)
+            return
+
+        # 工作副本足够大时后台只需缩放，否则后台按工作副本尺寸重新解码
+        source = self._cached_working_copy(file_key, size)
+
+        self._pending[key] = [callback]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='image-worker')
+        self._executor.submit(self._variant_job, key, file_key, source, size)
+        self._schedule_poll(widget)
+
+    def _variant_job(self, key, file_key, source, size):
+        """后台线程：解码（需要时）并做 LANCZOS 缩放，PIL在解码和缩放时释放GIL"""
+        try:
+            decoded = None
+            if source is None:
+                source, full = decode_image(file_key[0], self.working_size(size))
+                decoded = (source, full)
+            resized = source if source.size == size else source.resize(size, PILImage.Resampling.LANCZOS)
+            self._results.put((key, resized, decoded, None))
+        except Exception as e:
+            self._results.put((key, None, None, e))
+
+    def _schedule_poll(self, widget):
+        """在Tk线程上调度结果轮询"""
+        if self._poll_widget is None:
+            self._poll_widget = widget
+            widget.after(POLL_INTERVAL_MS, self._poll_results)
+
+    def _poll_results(self):
+        """Tk线程：取出后台结果，生成 PhotoImage 并通知等待的图像"""
+        widget = self._poll_widget
+        while True:
+            try:
+                key, resized, decoded, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            callbacks = self._pending.pop(key, [])
+            file_key, size = key[1], key[2]
+            photo = None
+            if error:
+                print(f"加载图片失败: {error}")
+            else:
+                if decoded is not None:
+                    self._store_working_copy(file_key, *decoded)
+                photo = ImageTk.PhotoImage(resized)
+                self._put(key, photo, size[0] * size[1] * 4)
+            for callback in callbacks:
+                callback(size, photo)
+
+        if self._pending:
+            widget.after(POLL_INTERVAL_MS, self._poll_results)
+        else:
+            self._poll_widget = None
+
+    def mark_used(self, file_key: Tuple, size: Tuple[int, int]):
+        """图像仍在视口中：刷新源图像和缩放结果的最近使用时间"""
+        for key in (('source', file_key), ('pyramid', file_key), ('variant', file_key, size)):
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def clear(self):
+        """清空缓存"""
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def _put(self, key, value, nbytes: int):
+        """加入缓存项，超出上限时从最久未使用的一端淘汰（不淘汰刚加入的项）"""
+        self._entries[key] = (value, nbytes)
+        self.total_bytes += nbytes
+        self._evict(key)
+
+    def _remove(self, key):
+        """移除缓存项"""
+        entry = self._entries.pop(key, None)
+        if entry:
+            self.total_bytes -= entry[1]
+
+    def _grow(self, key, nbytes: int):
+        """已有缓存项（金字塔新增层级）占用增加"""
+        value, old_bytes = self._entries[key]
+        self._entries[key] = (value, old_bytes + nbytes)
+        self.total_bytes += nbytes
+        self._evict(key)
+
+    def _evict(self, key):
+        """从最久未使用的一端淘汰，直到低于内存上限"""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            if oldest == key:
+                self._entries.move_to_end(key)
+                continue
+            _value, old_bytes = self._entries.pop(oldest)
+            self.total_bytes -= old_bytes
+
+
+# 进程内共享的缓存实例
+image_cache = ImageCache()
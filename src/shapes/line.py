@@ -88,6 +88,15 @@ class Line(BaseShape):
                 tags="temp"  # 使用temp标签便于清除
             )
     
+    def draw_simplified(self, canvas):
+        """缩小显示时用单个线条项绘制"""
+        if not self.visible:
+            return
+        outline_color = "red" if self.selected else self.color
+        canvas.create_line(self.x1, self.y1, self.x2, self.y2,
+                          fill=outline_color, width=1, tags="shape")
+        self.draw_resize_handles(canvas)
+    
     def draw(self, canvas):
         """在画布上绘制直线 - 使用Bresenham算法"""
         if not self.visible:
@@ -126,32 +135,44 @@ class Line(BaseShape):
         # 绘制调整大小的控制点
         self.draw_resize_handles(canvas)
     
+    def geometry_key(self):
+        """端点决定派生几何"""
+        return (self.x1, self.y1, self.x2, self.y2)
+    
+    def build_geometry(self) -> Dict[str, Any]:
+        """预计算边界框、方向向量和长度平方的倒数"""
+        dx = self.x2 - self.x1
+        dy = self.y2 - self.y1
+        length_sq = dx * dx + dy * dy
+        return {
+            'bounds': (min(self.x1, self.x2), min(self.y1, self.y2),
+                       max(self.x1, self.x2), max(self.y1, self.y2)),
+            'dx': dx,
+            'dy': dy,
+            'inv_length_sq': 1.0 / length_sq if length_sq else 0.0,
+        }
+    
     def contains_point(self, x: float, y: float) -> bool:
-        """检查点是否在直线附近"""
-        # 计算点到直线的距离
-        A = self.y2 - self.y1
-        B = self.x1 - self.x2
-        C = self.x2 * self.y1 - self.x1 * self.y2
-        
-        # 避免除零错误
-        denominator = (A * A + B * B) ** 0.5
-        if denominator == 0:
+        """检查点是否在直线附近（到线段的距离不超过5像素）"""
+        geometry = self.get_geometry()
+        min_x, min_y, max_x, max_y = geometry['bounds']
+        # 容差按屏幕像素计算
+        tolerance = 5 / self.view_scale
+        if not (min_x - tolerance <= x <= max_x + tolerance and min_y - tolerance <= y <= max_y + tolerance):
             return False
-            
-        distance = abs(A * x + B * y + C) / denominator
-        
-        # 检查点是否在线段范围内
-        min_x, max_x = min(self.x1, self.x2), max(self.x1, self.x2)
-        min_y, max_y = min(self.y1, self.y2), max(self.y1, self.y2)
         
-        return (distance <= 5 and  # 距离阈值
-                min_x - 5 <= x <= max_x + 5 and
-                min_y - 5 <= y <= max_y + 5)
+        # 投影到线段上并截断到端点之间
+        dx = geometry['dx']
+        dy = geometry['dy']
+        t = ((x - self.x1) * dx + (y - self.y1) * dy) * geometry['inv_length_sq']
+        t = max(0.0, min(1.0, t))
+        px = self.x1 + t * dx - x
+        py = self.y1 + t * dy - y
+        return px * px + py * py <= tolerance * tolerance
     
     def get_bounds(self) -> Tuple[float, float, float, float]:
         """获取直线的边界框"""
-        return (min(self.x1, self.x2), min(self.y1, self.y2),
-                max(self.x1, self.x2), max(self.y1, self.y2))
+        return self.get_geometry()['bounds']
     
     def move(self, dx: float, dy: float):
         """移动直线"""
@@ -6,6 +6,11 @@ from typing import List, Tuple, Dict, Any
 from .base_shape import BaseShape
 
 
+EDGE_GRID_MIN_VERTICES = 64  # 顶点数达到该值时按水平条带对边分桶
+EDGE_GRID_EDGES_PER_BAND = 4  # 每个条带平均分到的边数，决定条带数量
+EDGE_GRID_MAX_BANDS = 4096
+
+
 class Polygon(BaseShape):
     """多边形图形"""
     
@@ -262,6 +267,16 @@ class Polygon(BaseShape):
                             tags="temp"  # 使用temp标签便于清除
                         )
     
+    def draw_simplified(self, canvas):
+        """缩小显示时用单个多边形项绘制"""
+        if not self.visible or len(self.points) < 2:
+            return
+        outline_color = "red" if self.selected else self.color
+        fill_color = self.fill_color if self.fill_color and self.fill_color.lower() != "white" else ""
+        canvas.create_polygon([c for point in self.points for c in point],
+                             outline=outline_color, fill=fill_color, width=1, tags="shape")
+        self.draw_resize_handles(canvas)
+    
     def draw(self, canvas):
         """在画布上绘制多边形 - 使用Bresenham直线算法"""
         if not self.visible:
@@ -323,31 +338,78 @@ class Polygon(BaseShape):
         # 绘制调整大小的控制点
         self.draw_resize_handles(canvas)
     
+    def geometry_key(self):
+        """点列表写时复制，列表对象和长度即可识别变化"""
+        return (id(self.points), len(self.points))
+    
+    def build_geometry(self) -> Dict[str, Any]:
+        """预计算边界框和边表
+        
+        边表只保留非水平边，每条边存为 (y_min, y_max, 在y_min处的x, dx/dy)。
+        顶点较多时再把边按所覆盖的水平条带分桶，射线法只需检查点所在条带内的边。
+        """
+        points = self.points
+        if not points:
+            return {'points': points, 'bounds': (0, 0, 0, 0), 'edges': [], 'bands': None}
+        
+        x_coords = [p[0] for p in points]
+        y_coords = [p[1] for p in points]
+        min_y, max_y = min(y_coords), max(y_coords)
+        geometry = {
+            'points': points,  # 持有列表引用，保证 geometry_key 中的 id 有效
+            'bounds': (min(x_coords), min_y, max(x_coords), max_y),
+            'edges': [],
+            'bands': None,
+        }
+        
+        edges = geometry['edges']
+        n = len(points)
+        for i in range(n):
+            xi, yi = points[i]
+            xj, yj = points[i - 1]
+            if yi == yj:
+                continue
+            if yi > yj:
+                xi, yi, xj, yj = xj, yj, xi, yi
+            edges.append((yi, yj, xi, (xj - xi) / (yj - yi)))
+        
+        if n >= EDGE_GRID_MIN_VERTICES and max_y > min_y:
+            band_count = min(EDGE_GRID_MAX_BANDS, max(1, len(edges) // EDGE_GRID_EDGES_PER_BAND))
+            band_height = (max_y - min_y) / band_count
+            bands = [[] for _ in range(band_count)]
+            for edge in edges:
+                first = int((edge[0] - min_y) / band_height)
+                last = min(band_count - 1, int((edge[1] - min_y) / band_height))
+                for band in range(first, last + 1):
+                    bands[band].append(edge)
+            geometry['bands'] = bands
+            geometry['band_height'] = band_height
+        return geometry
+    
     def contains_point(self, x: float, y: float) -> bool:
         """使用射线法检查点是否在多边形内部"""
-        n = len(self.points)
-        inside = False
+        geometry = self.get_geometry()
+        min_x, min_y, max_x, max_y = geometry['bounds']
+        if not (min_x <= x <= max_x and min_y <= y <= max_y):
+            return False
         
-        j = n - 1
-        for i in range(n):
-            xi, yi = self.points[i]
-            xj, yj = self.points[j]
-            
-            if ((yi > y) != (yj > y)) and (x < (xj - xi) * (y - yi) / (yj - yi) + xi):
-                inside = not inside
-            j = i
+        bands = geometry['bands']
+        if bands is None:
+            edges = geometry['edges']
+        else:
+            index = min(len(bands) - 1, int((y - min_y) / geometry['band_height']))
+            edges = bands[index]
         
+        # 半开区间 [y_min, y_max) 保证经过顶点的射线只计一次
+        inside = False
+        for y_low, y_high, x_low, slope in edges:
+            if y_low <= y < y_high and x < x_low + (y - y_low) * slope:
+                inside = not inside
         return inside
     
     def get_bounds(self) -> Tuple[float, float, float, float]:
         """获取多边形的边界框"""
-        if not self.points:
-            return (0, 0, 0, 0)
-        
-        x_coords = [p[0] for p in self.points]
-        y_coords = [p[1] for p in self.points]
-        
-        return (min(x_coords), min(y_coords), max(x_coords), max(y_coords))
+        return self.get_geometry()['bounds']
     
     def move(self, dx: float, dy: float):
         """移动多边形"""
@@ -377,7 +439,8 @@ class Polygon(BaseShape):
     
     def add_point(self, x: float, y: float):
         """添加一个新的顶点"""
-        self.points.append((x, y))
+        # 写时复制：to_dict 返回的点列表可能被历史记录或自动保存快照共享，不能原地修改
+        self.points = self.points + [(x, y)]
         # 重新计算中心点
         self.x = sum(p[0] for p in self.points) / len(self.points)
         self.y = sum(p[1] for p in self.points) / len(self.points)
@@ -417,7 +480,9 @@ class Polygon(BaseShape):
             if 0 <= vertex_index < len(self.points):
                 # 移动指定的顶点
                 x, y = self.points[vertex_index]
-                self.points[vertex_index] = (x + dx, y + dy)
+                points = list(self.points)  # 写时复制，避免改动共享的快照
+                points[vertex_index] = (x + dx, y + dy)
+                self.points = points
                 
                 # 重新计算中心点
                 self.x = sum(p[0] for p in self.points) / len(self.points)
@@ -148,6 +148,16 @@ class Rectangle(BaseShape):
                             tags="temp"  # 使用temp标签便于清除
                         )
     
+    def draw_simplified(self, canvas):
+        """缩小显示时用单个矩形项绘制"""
+        if not self.visible:
+            return
+        outline_color = "red" if self.selected else self.color
+        fill_color = self.fill_color if self.fill_color and self.fill_color.lower() != "white" else ""
+        canvas.create_rectangle(self.x1, self.y1, self.x2, self.y2,
+                               outline=outline_color, fill=fill_color, width=1, tags="shape")
+        self.draw_resize_handles(canvas)
+    
     def draw(self, canvas):
         """在画布上绘制矩形 - 使用Bresenham直线算法"""
         if not self.visible:
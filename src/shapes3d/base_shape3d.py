@@ -4,11 +4,30 @@
 import json
 import math
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from typing import Tuple, Dict, Any, List, Optional
 
+from .transform3d import face_planes, model_matrix, transform_points
+
+MESH_CACHE_SIZE = 256  # 最多缓存的局部网格数（按图形类型和网格参数区分，同参数图形共用）
+LOD_PIXEL_RADII = (48.0, 16.0)  # 投影半径（像素）依次低于这些值时细节降一级
+LOD_HYSTERESIS = 1.25  # 细节级别切换的滞后系数，避免在阈值附近来回跳变
+
 
 class BaseShape3D(ABC):
-    """所有3D图形的基础类"""
+    """所有3D图形的基础类
+    
+    子类用 build_vertices/build_edges/build_faces 生成局部坐标系下的网格，mesh_key 返回
+    决定网格的参数。局部网格按参数缓存；变换后的顶点按版本号缓存，修改变换或网格参数的
+    方法都会调用 mark_changed 递增版本号。面法向量和亮度同样按版本号缓存，
+    只移动相机时无需重新计算。
+    
+    lod_enabled 为True的曲面图形按屏幕上的投影大小选择细节级别（lod），
+    用 lod_count 得到当前级别的分段数，并把 lod 计入 mesh_key。
+    """
+    
+    _mesh_cache = OrderedDict()  # (图形类型, 网格参数) -> (顶点, 边, 面, 包围球半径)
+    lod_enabled = False  # 是否按投影大小自动选择细节级别
     
     def __init__(self, x: float = 0, y: float = 0, z: float = 0):
         # 位置
@@ -39,20 +58,122 @@ class BaseShape3D(ABC):
         self.rotatable = True  # 是否可旋转
         self.scalable = True  # 是否可缩放
         
+        # 缓存
+        self.version = 0  # 几何版本号
+        self.lod = 0  # 细节级别，0为最精细
+        self._vertex_cache = None  # (版本号, 网格参数, 变换后的顶点)
+        self._plane_cache = None  # (版本号, 网格参数, 法向量, 平面常数)
+        self._shading_cache = None  # (版本号, 网格参数, 光源方向, 亮度)
+        
     @abstractmethod
-    def get_vertices(self) -> List[Tuple[float, float, float]]:
-        """获取3D顶点列表（应用变换后）"""
+    def mesh_key(self) -> Tuple:
+        """决定局部网格的参数"""
         pass
     
     @abstractmethod
-    def get_edges(self) -> List[Tuple[int, int]]:
-        """获取边列表（顶点索引对）"""
+    def build_vertices(self) -> List[Tuple[float, float, float]]:
+        """生成局部坐标系下的顶点列表（未应用变换）"""
         pass
     
     @abstractmethod
+    def build_edges(self) -> List[Tuple[int, int]]:
+        """生成边列表（顶点索引对）"""
+        pass
+    
+    @abstractmethod
+    def build_faces(self) -> List[List[int]]:
+        """生成面列表（顶点索引列表）"""
+        pass
+    
+    def mark_changed(self):
+        """变换或网格参数已修改，使缓存的顶点失效"""
+        self.version += 1
+    
+    def get_mesh(self) -> Tuple[List, List, List, float]:
+        """获取局部网格 (顶点, 边, 面, 包围球半径)，按网格参数缓存，返回值不可修改"""
+        key = (type(self), self.mesh_key())
+        cache = BaseShape3D._mesh_cache
+        mesh = cache.get(key)
+        if mesh is not None:
+            cache.move_to_end(key)
+            return mesh
+        
+        vertices = self.build_vertices()
+        radius = max((math.sqrt(x*x + y*y + z*z) for x, y, z in vertices), default=0.0)
+        mesh = (vertices, self.build_edges(), self.build_faces(), radius)
+        cache[key] = mesh
+        while len(cache) > MESH_CACHE_SIZE:
+            cache.popitem(last=False)
+        return mesh
+    
+    def get_bounding_radius(self) -> float:
+        """以 get_center() 为球心、包住变换后网格的包围球半径"""
+        return self.get_mesh()[3] * max(abs(self.scale_x), abs(self.scale_y), abs(self.scale_z))
+    
+    def lod_count(self, full: int, minimum: int) -> int:
+        """当前细节级别下的分段数（每降一级减半，不低于 minimum）"""
+        return max(minimum, full >> self.lod)
+    
+    def update_lod(self, screen_radius: float) -> bool:
+        """按包围球在屏幕上的投影半径（像素）选择细节级别，返回级别是否变化"""
+        if not self.lod_enabled:
+            return False
+        level = self.lod
+        while level > 0 and screen_radius > LOD_PIXEL_RADII[level - 1] * LOD_HYSTERESIS:
+            level -= 1
+        while level < len(LOD_PIXEL_RADII) and screen_radius < LOD_PIXEL_RADII[level] / LOD_HYSTERESIS:
+            level += 1
+        if level == self.lod:
+            return False
+        self.lod = level
+        return True
+    
+    def get_vertices(self) -> List[Tuple[float, float, float]]:
+        """获取3D顶点列表（应用变换后），按版本号缓存，返回值不可修改"""
+        key = self.mesh_key()
+        cache = self._vertex_cache
+        if cache is not None and cache[0] == self.version and cache[1] == key:
+            return cache[2]
+        
+        vertices = self.apply_vertex_transform(self.get_mesh()[0])
+        self._vertex_cache = (self.version, key, vertices)
+        return vertices
+    
+    def get_edges(self) -> List[Tuple[int, int]]:
+        """获取边列表（顶点索引对）"""
+        return self.get_mesh()[1]
+    
+    def get_face_planes(self) -> Tuple[List[Tuple[float, float, float]], List[float]]:
+        """获取各面的单位法向量和平面常数 (法向量列表, 常数列表)，按版本号缓存
+        
+        面所在平面为 n·p = d，相机位置 c 满足 n·c < d 时面朝向相机。
+        """
+        key = self.mesh_key()
+        cache = self._plane_cache
+        if cache is not None and cache[0] == self.version and cache[1] == key:
+            return cache[2], cache[3]
+        
+        normals, offsets = face_planes(self.get_vertices(), self.get_faces())
+        self._plane_cache = (self.version, key, normals, offsets)
+        return normals, offsets
+    
+    def get_face_brightness(self, light_direction: Tuple[float, float, float]) -> List[float]:
+        """获取各面在定向光下的亮度（0.3 ~ 1.0），按版本号和光源方向缓存"""
+        key = self.mesh_key()
+        cache = self._shading_cache
+        if (cache is not None and cache[0] == self.version and cache[1] == key
+                and cache[2] == light_direction):
+            return cache[3]
+        
+        lx, ly, lz = light_direction
+        brightness = [max(0.3, min(1.0, (1 - (nx * lx + ny * ly + nz * lz)) / 2))
+                      for nx, ny, nz in self.get_face_planes()[0]]
+        self._shading_cache = (self.version, key, light_direction, brightness)
+        return brightness
+    
     def get_faces(self) -> List[List[int]]:
         """获取面列表（顶点索引列表）"""
-        pass
+        return self.get_mesh()[2]
     
     @abstractmethod
     def contains_point(self, x: float, y: float, z: float) -> bool:
@@ -70,6 +191,7 @@ class BaseShape3D(ABC):
             self.x += dx
             self.y += dy
             self.z += dz
+            self.mark_changed()
     
     def translate(self, dx: float, dy: float, dz: float):
         """平移图形（move的别名）"""
@@ -81,6 +203,7 @@ class BaseShape3D(ABC):
             self.rotation_x += rx
             self.rotation_y += ry
             self.rotation_z += rz
+            self.mark_changed()
     
     def scale(self, sx: float, sy: float = None, sz: float = None):
         """缩放图形"""
@@ -92,18 +215,21 @@ class BaseShape3D(ABC):
             self.scale_x *= sx
             self.scale_y *= sy
             self.scale_z *= sz
+            self.mark_changed()
     
     def set_position(self, x: float, y: float, z: float):
         """设置位置"""
         self.x = x
         self.y = y
         self.z = z
+        self.mark_changed()
     
     def set_rotation(self, rx: float, ry: float, rz: float):
         """设置旋转（弧度）"""
         self.rotation_x = rx
         self.rotation_y = ry
         self.rotation_z = rz
+        self.mark_changed()
     
     def set_scale(self, sx: float, sy: float = None, sz: float = None):
         """设置缩放"""
@@ -114,6 +240,7 @@ class BaseShape3D(ABC):
         self.scale_x = sx
         self.scale_y = sy
         self.scale_z = sz
+        self.mark_changed()
     
     def set_color(self, color: str):
         """设置线条颜色"""
@@ -140,6 +267,7 @@ class BaseShape3D(ABC):
                 self.scale_x *= matrix[0][0]
                 self.scale_y *= matrix[1][1] 
                 self.scale_z *= matrix[2][2]
+                self.mark_changed()
             else:
                 # 这是一个旋转矩阵，我们需要提取旋转角度
                 # 简化处理：直接累加小的旋转增量
@@ -166,6 +294,7 @@ class BaseShape3D(ABC):
         self.rotation_x += rotation_x
         self.rotation_y += rotation_y
         self.rotation_z += rotation_z
+        self.mark_changed()
     
     # 为了向后兼容，添加别名方法
     def apply_transform(self, matrix):
@@ -184,49 +313,15 @@ class BaseShape3D(ABC):
         """获取图形中心点"""
         return (self.x, self.y, self.z)
     
+    def get_model_matrix(self) -> List[List[float]]:
+        """获取模型矩阵（缩放 -> 按 X、Y、Z 顺序旋转 -> 平移）"""
+        return model_matrix((self.x, self.y, self.z),
+                            (self.rotation_x, self.rotation_y, self.rotation_z),
+                            (self.scale_x, self.scale_y, self.scale_z))
+    
     def apply_vertex_transform(self, vertices: List[Tuple[float, float, float]]) -> List[Tuple[float, float, float]]:
-        """对顶点应用变换（缩放、旋转、平移）"""
-        transformed = []
-        
-        for vx, vy, vz in vertices:
-            # 1. 缩放
-            vx *= self.scale_x
-            vy *= self.scale_y
-            vz *= self.scale_z
-            
-            # 2. 旋转（按照 X -> Y -> Z 顺序）
-            # X轴旋转
-            if self.rotation_x != 0:
-                cos_x = math.cos(self.rotation_x)
-                sin_x = math.sin(self.rotation_x)
-                new_y = vy * cos_x - vz * sin_x
-                new_z = vy * sin_x + vz * cos_x
-                vy, vz = new_y, new_z
-            
-            # Y轴旋转
-            if self.rotation_y != 0:
-                cos_y = math.cos(self.rotation_y)
-                sin_y = math.sin(self.rotation_y)
-                new_x = vx * cos_y + vz * sin_y
-                new_z = -vx * sin_y + vz * cos_y
-                vx, vz = new_x, new_z
-            
-            # Z轴旋转
-            if self.rotation_z != 0:
-                cos_z = math.cos(self.rotation_z)
-                sin_z = math.sin(self.rotation_z)
-                new_x = vx * cos_z - vy * sin_z
-                new_y = vx * sin_z + vy * cos_z
-                vx, vy = new_x, new_y
-            
-            # 3. 平移
-            vx += self.x
-            vy += self.y
-            vz += self.z
-            
-            transformed.append((vx, vy, vz))
-        
-        return transformed
+        """对顶点应用变换（缩放、旋转、平移），由合成后的模型矩阵一次完成"""
+        return transform_points(self.get_model_matrix(), vertices)
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典（用于保存）"""
@@ -261,4 +356,5 @@ class BaseShape3D(ABC):
         self.color = data.get('color', 'black')
         self.fill_color = data.get('fill_color', None)
         self.line_width = data.get('line_width', 1)
-        self.visible = data.get('visible', True)
\ No newline at end of file
+        self.visible = data.get('visible', True)
+        self.mark_changed()
\ No newline at end of file
@@ -9,6 +9,8 @@ import math
 class Cone3D(BaseShape3D):
     """3D圆锥类"""
     
+    lod_enabled = True
+    
     def __init__(self, x: float = 0, y: float = 0, z: float = 0, 
                  radius: float = 1.0, height: float = 1.0):
         super().__init__(x, y, z)
@@ -16,16 +18,21 @@ class Cone3D(BaseShape3D):
         self.height = height  # 高度
         self.segments = 16  # 底面圆的分段数
         
-    def get_vertices(self) -> List[Tuple[float, float, float]]:
-        """获取圆锥的顶点"""
+    def mesh_key(self) -> Tuple:
+        """网格由底面半径、高度、分段数和细节级别决定"""
+        return (self.radius, self.height, self.segments, self.lod)
+    
+    def build_vertices(self) -> List[Tuple[float, float, float]]:
+        """生成圆锥的顶点"""
+        segments = self.lod_count(self.segments, 3)
         vertices = []
         
         # 底面圆心（在y=-height/2，即底部）
         vertices.append((0, -self.height/2, 0))  # 0: 底面圆心
         
         # 底面圆周上的点（在XZ平面上）
-        for i in range(self.segments):
-            angle = 2 * math.pi * i / self.segments
+        for i in range(segments):
+            angle = 2 * math.pi * i / segments
             x = self.radius * math.cos(angle)
             z = self.radius * math.sin(angle)
             y = -self.height / 2  # 底面在y=-height/2
@@ -34,42 +41,44 @@ class Cone3D(BaseShape3D):
         # 顶点（在y=height/2，即顶部）
         vertices.append((0, self.height/2, 0))  # 最后一个: 圆锥顶点
         
-        return self.apply_vertex_transform(vertices)
+        return vertices
     
-    def get_edges(self) -> List[Tuple[int, int]]:
-        """获取圆锥的边"""
+    def build_edges(self) -> List[Tuple[int, int]]:
+        """生成圆锥的边"""
+        segments = self.lod_count(self.segments, 3)
         edges = []
         
         # 底面圆周的边
-        for i in range(self.segments):
+        for i in range(segments):
             curr = 1 + i
-            next_vertex = 1 + ((i + 1) % self.segments)
+            next_vertex = 1 + ((i + 1) % segments)
             edges.append((curr, next_vertex))
         
         # 从底面圆心到圆周的边（可选，用于显示底面结构）
-        for i in range(self.segments):
+        for i in range(segments):
             edges.append((0, 1 + i))
         
         # 从圆周到顶点的边
-        apex_idx = len(self.get_vertices()) - 1
-        for i in range(self.segments):
+        apex_idx = 1 + segments
+        for i in range(segments):
             edges.append((1 + i, apex_idx))
         
         return edges
     
-    def get_faces(self) -> List[List[int]]:
-        """获取圆锥的面"""
+    def build_faces(self) -> List[List[int]]:
+        """生成圆锥的面"""
+        segments = self.lod_count(self.segments, 3)
         faces = []
-        apex_idx = 1 + self.segments  # 顶点索引
+        apex_idx = 1 + segments  # 顶点索引
         
         # 底面（三角形扇形）
-        for i in range(self.segments):
-            next_i = (i + 1) % self.segments
+        for i in range(segments):
+            next_i = (i + 1) % segments
             faces.append([0, 1 + next_i, 1 + i])  # 顺时针
         
         # 侧面（三角形）
-        for i in range(self.segments):
-            next_i = (i + 1) % self.segments
+        for i in range(segments):
+            next_i = (i + 1) % segments
             faces.append([1 + i, 1 + next_i, apex_idx])
         
         return faces
@@ -112,14 +121,17 @@ class Cone3D(BaseShape3D):
     def set_radius(self, radius: float):
         """设置底面半径"""
         self.radius = max(0.1, radius)
+        self.mark_changed()
     
     def set_height(self, height: float):
         """设置高度"""
         self.height = max(0.1, height)
+        self.mark_changed()
     
     def set_segments(self, segments: int):
         """设置分段数"""
         self.segments = max(3, segments)
+        self.mark_changed()
     
     def to_dict(self):
         """转换为字典"""
@@ -12,8 +12,12 @@ class Cube3D(BaseShape3D):
         super().__init__(x, y, z)
         self.size = size  # 立方体边长
         
-    def get_vertices(self) -> List[Tuple[float, float, float]]:
-        """获取立方体的8个顶点"""
+    def mesh_key(self) -> Tuple:
+        """网格由边长决定"""
+        return (self.size,)
+    
+    def build_vertices(self) -> List[Tuple[float, float, float]]:
+        """生成立方体的8个顶点"""
         half_size = self.size / 2
         
         # 立方体的8个顶点（相对于中心）
@@ -28,10 +32,10 @@ class Cube3D(BaseShape3D):
             (-half_size,  half_size,  half_size),  # 7: 左上前
         ]
         
-        return self.apply_vertex_transform(vertices)
+        return vertices
     
-    def get_edges(self) -> List[Tuple[int, int]]:
-        """获取立方体的12条边"""
+    def build_edges(self) -> List[Tuple[int, int]]:
+        """生成立方体的12条边"""
         return [
             # 后面的4条边
             (0, 1), (1, 2), (2, 3), (3, 0),
@@ -41,8 +45,8 @@ class Cube3D(BaseShape3D):
             (0, 4), (1, 5), (2, 6), (3, 7)
         ]
     
-    def get_faces(self) -> List[List[int]]:
-        """获取立方体的6个面"""
+    def build_faces(self) -> List[List[int]]:
+        """生成立方体的6个面"""
         return [
             [0, 1, 2, 3],  # 后面
             [4, 7, 6, 5],  # 前面
@@ -78,6 +82,7 @@ class Cube3D(BaseShape3D):
     def set_size(self, size: float):
         """设置立方体大小"""
         self.size = max(0.1, size)
+        self.mark_changed()
     
     def to_dict(self):
         """转换为字典"""
@@ -9,17 +9,23 @@ import math
 class Point3D(BaseShape3D):
     """3D点类 - 显示为实心小球"""
     
+    lod_enabled = True
+    
     def __init__(self, x: float = 0, y: float = 0, z: float = 0):
         super().__init__(x, y, z)
         self.radius = 0.15  # 点球的半径
         
-    def get_vertices(self) -> List[Tuple[float, float, float]]:
+    def mesh_key(self) -> Tuple:
+        """网格由半径和细节级别决定"""
+        return (self.radius, self.lod)
+    
+    def build_vertices(self) -> List[Tuple[float, float, float]]:
         """生成球体的顶点（简化版）"""
         vertices = []
         
         # 使用较少的分段数以避免过于复杂
-        lat_segments = 8  # 纬度分段
-        lon_segments = 12  # 经度分段
+        lat_segments = self.lod_count(8, 3)  # 纬度分段
+        lon_segments = self.lod_count(12, 4)  # 经度分段
         
         # 生成球体顶点
         for i in range(lat_segments + 1):
@@ -32,20 +38,21 @@ class Point3D(BaseShape3D):
                 z = self.radius * math.cos(lat) * math.sin(lon)
                 vertices.append((x, y, z))
         
-        return self.apply_vertex_transform(vertices)
+        return vertices
     
-    def get_edges(self) -> List[Tuple[int, int]]:
+    def build_edges(self) -> List[Tuple[int, int]]:
         """生成球体的边（简化版线框）"""
         edges = []
-        lat_segments = 8
-        lon_segments = 12
+        lat_segments = self.lod_count(8, 3)
+        lon_segments = self.lod_count(12, 4)
+        vertex_count = (lat_segments + 1) * lon_segments
         
         # 生成纬线
         for i in range(lat_segments + 1):
             for j in range(lon_segments):
                 current = i * lon_segments + j
                 next_j = i * lon_segments + (j + 1) % lon_segments
-                if current < len(self.get_vertices()) and next_j < len(self.get_vertices()):
+                if current < vertex_count and next_j < vertex_count:
                     edges.append((current, next_j))
         
         # 生成经线
@@ -53,16 +60,16 @@ class Point3D(BaseShape3D):
             for j in range(lon_segments):
                 current = i * lon_segments + j
                 next_i = (i + 1) * lon_segments + j
-                if current < len(self.get_vertices()) and next_i < len(self.get_vertices()):
+                if current < vertex_count and next_i < vertex_count:
                     edges.append((current, next_i))
         
         return edges
     
-    def get_faces(self) -> List[List[int]]:
+    def build_faces(self) -> List[List[int]]:
         """球体的面（简化版）"""
         faces = []
-        lat_segments = 8
-        lon_segments = 12
+        lat_segments = self.lod_count(8, 3)
+        lon_segments = self.lod_count(12, 4)
         
         # 生成四边形面（简化为三角形）
         for i in range(lat_segments):
@@ -99,6 +106,7 @@ class Point3D(BaseShape3D):
     def set_radius(self, radius: float):
         """设置球体半径"""
         self.radius = max(0.05, radius)
+        self.mark_changed()
     
     def to_dict(self):
         """转换为字典"""
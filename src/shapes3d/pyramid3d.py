@@ -14,8 +14,12 @@ class Pyramid3D(BaseShape3D):
         self.base_size = base_size  # 底面边长
         self.height = height  # 高度
         
-    def get_vertices(self) -> List[Tuple[float, float, float]]:
-        """获取四棱锥的5个顶点"""
+    def mesh_key(self) -> Tuple:
+        """网格由底面边长和高度决定"""
+        return (self.base_size, self.height)
+    
+    def build_vertices(self) -> List[Tuple[float, float, float]]:
+        """生成四棱锥的5个顶点"""
         half_base = self.base_size / 2
         
         # 四棱锥的5个顶点（相对于中心，沿Y轴向上）
@@ -29,10 +33,10 @@ class Pyramid3D(BaseShape3D):
             (0, self.height/2, 0),  # 4: 顶点
         ]
         
-        return self.apply_vertex_transform(vertices)
+        return vertices
     
-    def get_edges(self) -> List[Tuple[int, int]]:
-        """获取四棱锥的8条边"""
+    def build_edges(self) -> List[Tuple[int, int]]:
+        """生成四棱锥的8条边"""
         return [
             # 底面的4条边
             (0, 1), (1, 2), (2, 3), (3, 0),
@@ -40,8 +44,8 @@ class Pyramid3D(BaseShape3D):
             (0, 4), (1, 4), (2, 4), (3, 4)
         ]
     
-    def get_faces(self) -> List[List[int]]:
-        """获取四棱锥的5个面"""
+    def build_faces(self) -> List[List[int]]:
+        """生成四棱锥的5个面"""
         return [
             [0, 3, 2, 1],  # 底面（逆时针）
             [0, 1, 4],     # 侧面1
@@ -89,10 +93,12 @@ class Pyramid3D(BaseShape3D):
     def set_base_size(self, base_size: float):
         """设置底面大小"""
         self.base_size = max(0.1, base_size)
+        self.mark_changed()
     
     def set_height(self, height: float):
         """设置高度"""
         self.height = max(0.1, height)
+        self.mark_changed()
     
     def to_dict(self):
         """转换为字典"""
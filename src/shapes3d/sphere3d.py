@@ -9,91 +9,100 @@ import math
 class Sphere3D(BaseShape3D):
     """3D球体类"""
     
+    lod_enabled = True
+    
     def __init__(self, x: float = 0, y: float = 0, z: float = 0, radius: float = 1.0):
         super().__init__(x, y, z)
         self.radius = radius  # 球体半径
         self.segments = 16  # 分段数（影响显示精度）
         
-    def get_vertices(self) -> List[Tuple[float, float, float]]:
-        """获取球体的顶点（使用经纬线划分）"""
+    def mesh_key(self) -> Tuple:
+        """网格由半径、分段数和细节级别决定"""
+        return (self.radius, self.segments, self.lod)
+    
+    def build_vertices(self) -> List[Tuple[float, float, float]]:
+        """生成球体的顶点（使用经纬线划分）"""
+        segments = self.lod_count(self.segments, 4)
         vertices = []
         
         # 添加顶点和底点
         vertices.append((0, self.radius, 0))  # 顶点
         
         # 中间的纬线
-        for i in range(1, self.segments):
-            phi = math.pi * i / self.segments  # 纬度角
+        for i in range(1, segments):
+            phi = math.pi * i / segments  # 纬度角
             y = self.radius * math.cos(phi)
             radius_at_phi = self.radius * math.sin(phi)
             
             # 每条纬线上的点
-            for j in range(self.segments):
-                theta = 2 * math.pi * j / self.segments  # 经度角
+            for j in range(segments):
+                theta = 2 * math.pi * j / segments  # 经度角
                 x = radius_at_phi * math.cos(theta)
                 z = radius_at_phi * math.sin(theta)
                 vertices.append((x, y, z))
         
         vertices.append((0, -self.radius, 0))  # 底点
         
-        return self.apply_vertex_transform(vertices)
+        return vertices
     
-    def get_edges(self) -> List[Tuple[int, int]]:
-        """获取球体的边（经线和纬线）"""
+    def build_edges(self) -> List[Tuple[int, int]]:
+        """生成球体的边（经线和纬线）"""
+        segments = self.lod_count(self.segments, 4)
         edges = []
         
         # 从顶点到第一条纬线的经线
-        for j in range(self.segments):
+        for j in range(segments):
             edges.append((0, 1 + j))
         
         # 纬线
-        for i in range(self.segments - 1):
-            for j in range(self.segments):
-                curr = 1 + i * self.segments + j
-                next_j = 1 + i * self.segments + ((j + 1) % self.segments)
+        for i in range(segments - 1):
+            for j in range(segments):
+                curr = 1 + i * segments + j
+                next_j = 1 + i * segments + ((j + 1) % segments)
                 edges.append((curr, next_j))
         
         # 经线（垂直线）
-        for i in range(self.segments - 2):
-            for j in range(self.segments):
-                curr = 1 + i * self.segments + j
-                down = 1 + (i + 1) * self.segments + j
+        for i in range(segments - 2):
+            for j in range(segments):
+                curr = 1 + i * segments + j
+                down = 1 + (i + 1) * segments + j
                 edges.append((curr, down))
         
         # 从最后一条纬线到底点的经线
-        bottom_idx = len(self.get_vertices()) - 1
-        for j in range(self.segments):
-            last_ring_start = 1 + (self.segments - 2) * self.segments
+        bottom_idx = 1 + (segments - 1) * segments
+        for j in range(segments):
+            last_ring_start = 1 + (segments - 2) * segments
             edges.append((last_ring_start + j, bottom_idx))
         
         return edges
     
-    def get_faces(self) -> List[List[int]]:
-        """获取球体的面（三角形面片）"""
+    def build_faces(self) -> List[List[int]]:
+        """生成球体的面（三角形面片）"""
+        segments = self.lod_count(self.segments, 4)
         faces = []
         
         # 顶部三角形
-        for j in range(self.segments):
-            next_j = (j + 1) % self.segments
+        for j in range(segments):
+            next_j = (j + 1) % segments
             faces.append([0, 1 + j, 1 + next_j])
         
         # 中间的四边形面（分为两个三角形）
-        for i in range(self.segments - 2):
-            for j in range(self.segments):
-                curr = 1 + i * self.segments + j
-                next_j = 1 + i * self.segments + ((j + 1) % self.segments)
-                down = 1 + (i + 1) * self.segments + j
-                down_next = 1 + (i + 1) * self.segments + ((j + 1) % self.segments)
+        for i in range(segments - 2):
+            for j in range(segments):
+                curr = 1 + i * segments + j
+                next_j = 1 + i * segments + ((j + 1) % segments)
+                down = 1 + (i + 1) * segments + j
+                down_next = 1 + (i + 1) * segments + ((j + 1) % segments)
                 
                 # 分为两个三角形
                 faces.append([curr, down, next_j])
                 faces.append([next_j, down, down_next])
         
         # 底部三角形
-        bottom_idx = len(self.get_vertices()) - 1
-        last_ring_start = 1 + (self.segments - 2) * self.segments
-        for j in range(self.segments):
-            next_j = (j + 1) % self.segments
+        bottom_idx = 1 + (segments - 1) * segments
+        last_ring_start = 1 + (segments - 2) * segments
+        for j in range(segments):
+            next_j = (j + 1) % segments
             faces.append([bottom_idx, last_ring_start + next_j, last_ring_start + j])
         
         return faces
@@ -127,10 +136,12 @@ class Sphere3D(BaseShape3D):
     def set_radius(self, radius: float):
         """设置球体半径"""
         self.radius = max(0.1, radius)
+        self.mark_changed()
     
     def set_segments(self, segments: int):
         """设置分段数"""
         self.segments = max(4, segments)
+        self.mark_changed()
     
     def to_dict(self):
         """转换为字典"""
@@ -0,0 +1,208 @@
+"""
+3D变换工具 - 4×4矩阵合成与顶点批量变换、投影
+
+矩阵按行存放（列表的列表），作用于列向量 [x, y, z, 1]。安装了NumPy时，
+顶点较多的批量变换和投影用数组运算一次完成；未安装时使用等价的纯Python实现。
+跨越近平面的多边形和线段在透视除法之前、于齐次坐标中裁剪到 W >= near 一侧。
+"""
+import math
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy为可选依赖
+    np = None
+
+NUMPY_MIN_POINTS = 64  # 顶点数少于该值时纯Python更快
+
+Matrix = List[List[float]]
+Point = Tuple[float, float, float]
+
+
+def identity_matrix() -> Matrix:
+    """单位矩阵"""
+    return [[1.0 if i == j else 0.0 for j in range(4)] for i in range(4)]
+
+
+def multiply_matrices(a: Matrix, b: Matrix) -> Matrix:
+    """矩阵乘法 a·b"""
+    return [[a[i][0] * b[0][j] + a[i][1] * b[1][j] + a[i][2] * b[2][j] + a[i][3] * b[3][j]
+             for j in range(4)]
+            for i in range(4)]
+
+
+def model_matrix(position: Sequence[float], rotation: Sequence[float],
+                 scale: Sequence[float]) -> Matrix:
+    """模型矩阵：先缩放，再依次绕X、Y、Z轴旋转（弧度），最后平移"""
+    cx, sx = math.cos(rotation[0]), math.sin(rotation[0])
+    cy, sy = math.cos(rotation[1]), math.sin(rotation[1])
+    cz, sz = math.cos(rotation[2]), math.sin(rotation[2])
+
+    # R = Rz·Ry·Rx
+    r00, r01, r02 = cz * cy, cz * sy * sx - sz * cx, cz * sy * cx + sz * sx
+    r10, r11, r12 = sz * cy, sz * sy * sx + cz * cx, sz * sy * cx - cz * sx
+    r20, r21, r22 = -sy, cy * sx, cy * cx
+
+    kx, ky, kz = scale
+    return [
+        [r00 * kx, r01 * ky, r02 * kz, position[0]],
+        [r10 * kx, r11 * ky, r12 * kz, position[1]],
+        [r20 * kx, r21 * ky, r22 * kz, position[2]],
+        [0.0, 0.0, 0.0, 1.0],
+    ]
+
+
+def transform_points(matrix: Matrix, points: Sequence[Point]) -> List[Point]:
+    """用仿射矩阵批量变换顶点"""
+    if np is not None and len(points) >= NUMPY_MIN_POINTS:
+        m = np.asarray(matrix, dtype=float)
+        result = np.asarray(points, dtype=float) @ m[:3, :3].T + m[:3, 3]
+        return list(map(tuple, result.tolist()))
+
+    (m00, m01, m02, m03), (m10, m11, m12, m13), (m20, m21, m22, m23) = matrix[:3]
+    return [(m00 * x + m01 * y + m02 * z + m03,
+             m10 * x + m11 * y + m12 * z + m13,
+             m20 * x + m21 * y + m22 * z + m23)
+            for x, y, z in points]
+
+
+def project_points(matrix: Matrix, points: Sequence[Point],
+                   near: float) -> List[Optional[Tuple[float, float]]]:
+    """用视图投影矩阵批量投影顶点并做透视除法
+
+    矩阵第4行给出深度 w；w 不超过 near 的顶点在相机近平面之前，结果为None。
+    """
+    return project_points_depth(matrix, points, near)[0]
+
+
+def project_points_depth(matrix: Matrix, points: Sequence[Point],
+                         near: float) -> Tuple[List[Optional[Tuple[float, float]]], List[float]]:
+    """同 project_points，同时返回各顶点的深度 w"""
+    if np is not None and len(points) >= NUMPY_MIN_POINTS:
+        m = np.asarray(matrix, dtype=float)
+        clip = np.asarray(points, dtype=float) @ m[:, :3].T + m[:, 3]
+        w = clip[:, 3]
+        valid = w > near
+        safe_w = np.where(valid, w, 1.0)
+        sx = (clip[:, 0] / safe_w).tolist()
+        sy = (clip[:, 1] / safe_w).tolist()
+        screen = [(x, y) if ok else None for x, y, ok in zip(sx, sy, valid.tolist())]
+        return screen, w.tolist()
+
+    (m00, m01, m02, m03), (m10, m11, m12, m13), _, (m30, m31, m32, m33) = matrix
+    screen = []
+    depths = []
+    for x, y, z in points:
+        w = m30 * x + m31 * y + m32 * z + m33
+        depths.append(w)
+        if w <= near:
+            screen.append(None)
+            continue
+        screen.append(((m00 * x + m01 * y + m02 * z + m03) / w,
+                       (m10 * x + m11 * y + m12 * z + m13) / w))
+    return screen, depths
+
+
+def homogeneous_points(matrix: Matrix, points: Sequence[Point]) -> List[Point]:
+    """用视图投影矩阵把顶点变换到透视除法前的齐次坐标 (X, Y, W)"""
+    if np is not None and len(points) >= NUMPY_MIN_POINTS:
+        m = np.asarray(matrix, dtype=float)[[0, 1, 3]]
+        result = np.asarray(points, dtype=float) @ m[:, :3].T + m[:, 3]
+        return list(map(tuple, result.tolist()))
+
+    (m00, m01, m02, m03), (m10, m11, m12, m13), _, (m30, m31, m32, m33) = matrix
+    return [(m00 * x + m01 * y + m02 * z + m03,
+             m10 * x + m11 * y + m12 * z + m13,
+             m30 * x + m31 * y + m32 * z + m33)
+            for x, y, z in points]
+
+
+def clip_polygon_near(polygon: Sequence[Point], near: float) -> List[Point]:
+    """把齐次坐标多边形裁剪到近平面 W >= near 一侧（Sutherland-Hodgman）"""
+    result = []
+    prev = polygon[-1]
+    prev_in = prev[2] >= near
+    for point in polygon:
+        point_in = point[2] >= near
+        if point_in != prev_in:
+            # 边与近平面相交：在齐次坐标中线性插值出交点
+            t = (near - prev[2]) / (point[2] - prev[2])
+            result.append((prev[0] + t * (point[0] - prev[0]),
+                           prev[1] + t * (point[1] - prev[1]),
+                           near))
+        if point_in:
+            result.append(point)
+        prev, prev_in = point, point_in
+    return result
+
+
+def project_segments(matrix: Matrix, starts: Sequence[Point], ends: Sequence[Point],
+                     near: float) -> List[Optional[Tuple[float, float, float, float]]]:
+    """批量裁剪并投影线段：先在齐次坐标中裁剪到近平面 W >= near 一侧，再做透视除法
+
+    返回每条线段的屏幕坐标 (x1, y1, x2, y2)，整条线段在近平面之前时为None。
+    """
+    if np is not None and len(starts) >= NUMPY_MIN_POINTS:
+        m = np.asarray(matrix, dtype=float)[[0, 1, 3]]
+        a = np.asarray(starts, dtype=float) @ m[:, :3].T + m[:, 3]
+        b = np.asarray(ends, dtype=float) @ m[:, :3].T + m[:, 3]
+        wa, wb = a[:, 2:3], b[:, 2:3]
+        keep = ((wa >= near) | (wb >= near))[:, 0]
+        denom = np.where(wb != wa, wb - wa, 1.0)
+        t = (near - wa) / denom
+        crossing = a + t * (b - a)
+        a = np.where(wa < near, crossing, a)
+        b = np.where(wb < near, crossing, b)
+        with np.errstate(divide='ignore', invalid='ignore'):  # 整条被裁掉的线段结果随后丢弃
+            a = a[:, :2] / a[:, 2:3]
+            b = b[:, :2] / b[:, 2:3]
+        coords = np.hstack((a, b)).tolist()
+        return [tuple(c) if ok else None for c, ok in zip(coords, keep.tolist())]
+
+    hs = homogeneous_points(matrix, starts)
+    he = homogeneous_points(matrix, ends)
+    result = []
+    for (x1, y1, w1), (x2, y2, w2) in zip(hs, he):
+        if w1 < near and w2 < near:
+            result.append(None)
+            continue
+        if w1 < near:
+            t = (near - w1) / (w2 - w1)
+            x1, y1, w1 = x1 + t * (x2 - x1), y1 + t * (y2 - y1), near
+        elif w2 < near:
+            t = (near - w2) / (w1 - w2)
+            x2, y2, w2 = x2 + t * (x1 - x2), y2 + t * (y1 - y2), near
+        result.append((x1 / w1, y1 / w1, x2 / w2, y2 / w2))
+    return result
+
+
+def face_planes(vertices: Sequence[Point], faces: Sequence[Sequence[int]]) -> Tuple[List[Point], List[float]]:
+    """各面的单位法向量 n 和平面常数 d（面所在平面为 n·p = d，取面的前三个顶点）
+
+    退化面（前三个顶点共线）的法向量为零向量。
+    """
+    if np is not None and len(faces) >= NUMPY_MIN_POINTS:
+        v = np.asarray(vertices, dtype=float)
+        idx = np.asarray([face[:3] for face in faces], dtype=int)
+        v1, v2, v3 = v[idx[:, 0]], v[idx[:, 1]], v[idx[:, 2]]
+        n = np.cross(v2 - v1, v3 - v1)
+        length = np.sqrt((n * n).sum(axis=1))
+        n = n / np.where(length > 0, length, 1.0)[:, None]
+        d = (n * v1).sum(axis=1)
+        return list(map(tuple, n.tolist())), d.tolist()
+
+    normals = []
+    offsets = []
+    for face in faces:
+        (x1, y1, z1), (x2, y2, z2), (x3, y3, z3) = (vertices[i] for i in face[:3])
+        ax, ay, az = x2 - x1, y2 - y1, z2 - z1
+        bx, by, bz = x3 - x1, y3 - y1, z3 - z1
+        nx = ay * bz - az * by
+        ny = az * bx - ax * bz
+        nz = ax * by - ay * bx
+        length = math.sqrt(nx*nx + ny*ny + nz*nz)
+        if length > 0:
+            nx, ny, nz = nx / length, ny / length, nz / length
+        normals.append((nx, ny, nz))
+        offsets.append(nx * x1 + ny * y1 + nz * z1)
+    return normals, offsets
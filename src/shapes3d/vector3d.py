@@ -9,6 +9,8 @@ import math
 class Vector3D(BaseShape3D):
     """3D向量类 - 显示为圆柱体加圆锥的箭头"""
     
+    lod_enabled = True
+    
     def __init__(self, x: float = 0, y: float = 0, z: float = 0, 
                  vx: float = 1, vy: float = 0, vz: float = 0):
         super().__init__(x, y, z)
@@ -27,7 +29,12 @@ class Vector3D(BaseShape3D):
             return 1, 0, 0
         return self.vx/mag, self.vy/mag, self.vz/mag
     
-    def get_vertices(self) -> List[Tuple[float, float, float]]:
+    def mesh_key(self) -> Tuple:
+        """网格由方向、长度、各部分半径和细节级别决定"""
+        return (self.vx, self.vy, self.vz, self.length,
+                self.shaft_radius, self.head_radius, self.head_length, self.lod)
+    
+    def build_vertices(self) -> List[Tuple[float, float, float]]:
         """生成箭头的顶点（圆柱体 + 圆锥体）"""
         vertices = []
         
@@ -62,7 +69,7 @@ class Vector3D(BaseShape3D):
         perp2_z = dir_x * perp1_y - dir_y * perp1_x
         
         # 生成圆形截面的顶点
-        segments = 8  # 圆形分段数
+        segments = self.lod_count(8, 3)  # 圆形分段数
         
         # 圆柱体起点圆形
         for i in range(segments):
@@ -94,12 +101,12 @@ class Vector3D(BaseShape3D):
         # 箭头尖端
         vertices.append((head_tip_x, head_tip_y, head_tip_z))
         
-        return self.apply_vertex_transform(vertices)
+        return vertices
     
-    def get_edges(self) -> List[Tuple[int, int]]:
+    def build_edges(self) -> List[Tuple[int, int]]:
         """生成箭头的边"""
         edges = []
-        segments = 8
+        segments = self.lod_count(8, 3)
         
         # 圆柱体起点圆形的边
         for i in range(segments):
@@ -127,10 +134,10 @@ class Vector3D(BaseShape3D):
         
         return edges
     
-    def get_faces(self) -> List[List[int]]:
+    def build_faces(self) -> List[List[int]]:
         """生成箭头的面"""
         faces = []
-        segments = 8
+        segments = self.lod_count(8, 3)
         
         # 圆柱体底面（起点）
         bottom_face = list(range(segments))
@@ -224,6 +231,7 @@ class Vector3D(BaseShape3D):
         self.vx = vx
         self.vy = vy
         self.vz = vz
+        self.mark_changed()
     
     def set_length(self, length: float):
         """设置向量长度"""
@@ -231,15 +239,18 @@ class Vector3D(BaseShape3D):
         # 确保箭头头部不会太大
         if self.head_length > self.length * 0.5:
             self.head_length = self.length * 0.3
+        self.mark_changed()
     
     def set_shaft_radius(self, radius: float):
         """设置圆柱体半径"""
         self.shaft_radius = max(0.01, radius)
+        self.mark_changed()
     
     def set_head_size(self, radius: float, length: float):
         """设置箭头头部尺寸"""
         self.head_radius = max(0.05, radius)
         self.head_length = max(0.1, min(length, self.length * 0.5))
+        self.mark_changed()
     
     def to_dict(self):
         """转换为字典"""
@@ -1,6 +1,20 @@
 # UI模块初始化文件
-from .main_window import MainWindow
-from .tool_bar import ToolBar
-from .property_panel import PropertyPanel
+# 窗口类按需导入：光栅化、网格等纯计算模块可以在没有 PIL / Tk 的环境中单独使用
+import importlib
 
-__all__ = ['MainWindow', 'ToolBar', 'PropertyPanel']
\ No newline at end of file
+_EXPORTS = {
+    'MainWindow': 'main_window',
+    'ToolBar': 'tool_bar',
+    'PropertyPanel': 'property_panel',
+}
+
+__all__ = ['MainWindow', 'ToolBar', 'PropertyPanel']
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
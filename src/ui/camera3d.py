@@ -0,0 +1,205 @@
+"""
+3D相机 - 环绕目标点的透视相机
+
+相机参数（目标点、视距、偏航角、俯仰角、画布尺寸）变化时才重新计算相机位置、
+坐标基、视图矩阵、投影矩阵及其逆矩阵，渲染、拾取、背面剔除和操作控件共用同一份结果。
+"""
+import math
+from typing import List, Optional, Sequence, Tuple
+
+from shapes3d.transform3d import (multiply_matrices, project_points, project_points_depth,
+                                  homogeneous_points, clip_polygon_near, project_segments)
+
+FOV = 60.0  # 垂直视场角（度）
+NEAR = 0.1  # 近裁剪面距离
+
+# 包围球相对视锥的位置
+FRUSTUM_OUTSIDE = 0  # 完全在视锥外
+FRUSTUM_INSIDE = 1  # 与近平面不相交（侧面超出屏幕的部分由画布自行裁掉）
+FRUSTUM_NEAR = 2  # 与近平面相交，需要做近平面裁剪
+
+
+class Camera:
+    """环绕相机
+
+    视图坐标：x 向右，y 向上，z 为沿视线方向的深度（越远越大）。
+    屏幕坐标：sx = cx + f·x / z，sy = cy - f·y / z。
+    """
+
+    def __init__(self, fov: float = FOV, near: float = NEAR):
+        self.fov = fov
+        self.near = near
+        self._key = None
+
+        self.position = (0.0, 0.0, 0.0)
+        self.right = (1.0, 0.0, 0.0)
+        self.up = (0.0, 1.0, 0.0)
+        self.forward = (0.0, 0.0, 1.0)
+        self.focal = 1.0  # 投影比例（像素）
+        self.center = (0.0, 0.0)  # 屏幕中心
+        self.width = 0
+        self.height = 0
+        self._side_x = (1.0, 0.0)
+        self._side_y = (1.0, 0.0)
+
+        self.view_matrix: List[List[float]] = []
+        self.inverse_view_matrix: List[List[float]] = []
+        self.projection_matrix: List[List[float]] = []
+        self.view_projection_matrix: List[List[float]] = []
+
+    def update(self, target, distance: float, yaw: float, pitch: float,
+               width: int, height: int) -> bool:
+        """同步相机参数（角度为度），参数未变化时不重新计算，返回是否发生变化"""
+        key = (tuple(target), distance, yaw, pitch, width, height)
+        if key == self._key:
+            return False
+        self._key = key
+
+        # 相机位置（球坐标）
+        rad_yaw = math.radians(yaw)
+        rad_pitch = math.radians(pitch)
+        tx, ty, tz = target
+        px = tx + distance * math.cos(rad_pitch) * math.cos(rad_yaw)
+        py = ty + distance * math.sin(rad_pitch)
+        pz = tz + distance * math.cos(rad_pitch) * math.sin(rad_yaw)
+        self.position = (px, py, pz)
+
+        # 前向（相机 -> 目标）
+        zx, zy, zz = tx - px, ty - py, tz - pz
+        zlen = math.sqrt(zx*zx + zy*zy + zz*zz) or 1.0
+        zx, zy, zz = zx / zlen, zy / zlen, zz / zlen
+        # 右向 = 世界上方向 × 前向
+        xx, xy, xz = zz, 0.0, -zx
+        xlen = math.sqrt(xx*xx + xz*xz) or 1.0
+        xx, xz = xx / xlen, xz / xlen
+        # 上向 = 前向 × 右向
+        yx = zy * xz - zz * xy
+        yy = zz * xx - zx * xz
+        yz = zx * xy - zy * xx
+        self.right = (xx, xy, xz)
+        self.up = (yx, yy, yz)
+        self.forward = (zx, zy, zz)
+
+        # 视图矩阵（世界 -> 视图）及其逆矩阵（视图 -> 世界）
+        self.view_matrix = [
+            [xx, xy, xz, -(xx * px + xy * py + xz * pz)],
+            [yx, yy, yz, -(yx * px + yy * py + yz * pz)],
+            [zx, zy, zz, -(zx * px + zy * py + zz * pz)],
+            [0.0, 0.0, 0.0, 1.0],
+        ]
+        self.inverse_view_matrix = [
+            [xx, yx, zx, px],
+            [xy, yy, zy, py],
+            [xz, yz, zz, pz],
+            [0.0, 0.0, 0.0, 1.0],
+        ]
+
+        # 投影矩阵（视图 -> 齐次屏幕坐标，w 为深度）
+        self.width = width
+        self.height = height
+        self.focal = (height / 2.0) / math.tan(math.radians(self.fov) / 2.0)
+        cx, cy = width / 2.0, height / 2.0
+        self.center = (cx, cy)
+        f = self.focal
+        # 左右、上下侧面的单位法向量（视图空间，x/y 取绝对值后只需一对）
+        side = math.hypot(f, cx) or 1.0
+        self._side_x = (f / side, cx / side)
+        side = math.hypot(f, cy) or 1.0
+        self._side_y = (f / side, cy / side)
+        self.projection_matrix = [
+            [f, 0.0, cx, 0.0],
+            [0.0, -f, cy, 0.0],
+            [0.0, 0.0, 1.0, 0.0],
+            [0.0, 0.0, 1.0, 0.0],
+        ]
+        self.view_projection_matrix = multiply_matrices(self.projection_matrix, self.view_matrix)
+        return True
+
+    def world_to_view(self, x: float, y: float, z: float) -> Tuple[float, float, float]:
+        """世界坐标 -> 视图坐标"""
+        m = self.view_matrix
+        return (m[0][0] * x + m[0][1] * y + m[0][2] * z + m[0][3],
+                m[1][0] * x + m[1][1] * y + m[1][2] * z + m[1][3],
+                m[2][0] * x + m[2][1] * y + m[2][2] * z + m[2][3])
+
+    def view_depth(self, x: float, y: float, z: float) -> float:
+        """世界坐标点沿视线方向的深度"""
+        m = self.view_matrix[2]
+        return m[0] * x + m[1] * y + m[2] * z + m[3]
+
+    def classify_sphere(self, center: Tuple[float, float, float], radius: float) -> int:
+        """判断世界坐标系中的包围球相对视锥的位置（FRUSTUM_OUTSIDE/INSIDE/NEAR）"""
+        x, y, z = self.world_to_view(*center)
+        if z + radius <= self.near:
+            return FRUSTUM_OUTSIDE
+        nf, nc = self._side_x
+        if nf * abs(x) - nc * z > radius:
+            return FRUSTUM_OUTSIDE
+        nf, nc = self._side_y
+        if nf * abs(y) - nc * z > radius:
+            return FRUSTUM_OUTSIDE
+        if z - radius <= self.near:
+            return FRUSTUM_NEAR
+        return FRUSTUM_INSIDE
+
+    def world_to_screen(self, x: float, y: float, z: float) -> Optional[Tuple[float, float]]:
+        """世界坐标 -> 屏幕坐标，点在近裁剪面之前时返回None"""
+        m = self.view_matrix
+        rz = m[2][0] * x + m[2][1] * y + m[2][2] * z + m[2][3]
+        if rz <= self.near:
+            return None
+        rx = m[0][0] * x + m[0][1] * y + m[0][2] * z + m[0][3]
+        ry = m[1][0] * x + m[1][1] * y + m[1][2] * z + m[1][3]
+        f = self.focal / rz
+        return (self.center[0] + rx * f, self.center[1] - ry * f)
+
+    def project_points(self, points: Sequence[Tuple[float, float, float]]) -> List[Optional[Tuple[float, float]]]:
+        """批量投影世界坐标点，结果与逐点调用 world_to_screen 一致"""
+        return project_points(self.view_projection_matrix, points, self.near)
+
+    def project_points_depth(self, points: Sequence[Tuple[float, float, float]]) -> Tuple[List[Optional[Tuple[float, float]]], List[float]]:
+        """批量投影世界坐标点，同时返回各点的视图深度"""
+        return project_points_depth(self.view_projection_matrix, points, self.near)
+
+    def homogeneous_points(self, points: Sequence[Tuple[float, float, float]]) -> List[Tuple[float, float, float]]:
+        """批量变换世界坐标点到透视除法前的齐次坐标 (X, Y, W)，W 为视图深度"""
+        return homogeneous_points(self.view_projection_matrix, points)
+
+    def clip_polygon(self, polygon: Sequence[Tuple[float, float, float]]) -> Tuple[List[float], List[float]]:
+        """把齐次坐标多边形裁剪到近平面之后并投影，返回 (扁平屏幕坐标, 各顶点深度)
+
+        多边形整个在近平面之前时两个列表均为空。
+        """
+        coords = []
+        depths = []
+        for x, y, w in clip_polygon_near(polygon, self.near):
+            coords.append(x / w)
+            coords.append(y / w)
+            depths.append(w)
+        return coords, depths
+
+    def project_segments(self, starts: Sequence[Tuple[float, float, float]],
+                         ends: Sequence[Tuple[float, float, float]]) -> List[Optional[Tuple[float, float, float, float]]]:
+        """批量投影世界坐标线段，跨越近平面的线段裁剪到近平面上，整条在近平面之前的为None"""
+        return project_segments(self.view_projection_matrix, starts, ends, self.near)
+
+    def view_to_world(self, x: float, y: float, z: float) -> Tuple[float, float, float]:
+        """视图坐标 -> 世界坐标"""
+        m = self.inverse_view_matrix
+        return (m[0][0] * x + m[0][1] * y + m[0][2] * z + m[0][3],
+                m[1][0] * x + m[1][1] * y + m[1][2] * z + m[1][3],
+                m[2][0] * x + m[2][1] * y + m[2][2] * z + m[2][3])
+
+    def unproject(self, sx: float, sy: float, depth: float) -> Tuple[float, float, float]:
+        """屏幕坐标及深度 -> 世界坐标"""
+        rx = (sx - self.center[0]) * depth / self.focal
+        ry = (self.center[1] - sy) * depth / self.focal
+        return self.view_to_world(rx, ry, depth)
+
+    def screen_ray(self, sx: float, sy: float) -> Tuple[Tuple[float, float, float], Tuple[float, float, float]]:
+        """经过屏幕点的视线，返回 (起点, 单位方向)"""
+        px, py, pz = self.unproject(sx, sy, 1.0)
+        ox, oy, oz = self.position
+        dx, dy, dz = px - ox, py - oy, pz - oz
+        length = math.sqrt(dx*dx + dy*dy + dz*dz) or 1.0
+        return self.position, (dx / length, dy / length, dz / length)
@@ -7,6 +7,11 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from shapes3d import BaseShape3D, Point3D, Vector3D
+from .camera3d import Camera, FRUSTUM_NEAR, FRUSTUM_OUTSIDE
+from .rasterizer3d import ZBufferRasterizer, AVAILABLE as ZBUFFER_AVAILABLE
+from .grid3d import GridFloor
+
+LIGHT_DIRECTION = (0.5, 0.7, 0.5)  # 定向光源（从右上方照射）
 
 
 class Canvas3D:
@@ -21,12 +26,14 @@ class Canvas3D:
         self.distance = 20.0
         self.yaw = 45.0  # 水平角度（度）
         self.pitch = 30.0  # 俯仰角（度）
+        self.camera = Camera()  # 按上述参数缓存视图/投影矩阵
 
         # 网格参数
         self.grid_size = 10  # 基础网格大小
         self.grid_step = 1
         self.grid_color_major = "#3a3a3a"
         self.grid_color_minor = "#2a2a2a"
+        self.grid_floor = GridFloor()  # 网格线世界坐标按范围缓存
         self.axis_x_color = "#bb5555"
         self.axis_y_color = "#55bb55"  # Y轴绿色
         self.axis_z_color = "#5599bb"
@@ -41,16 +48,25 @@ class Canvas3D:
         
         # 回调函数
         self.selection_callback = None  # 选择改变时的回调
+        self.change_callback = None  # 拖动修改图形后的回调（松开鼠标时调用一次）
         
         # 状态
         self._last_rx = None
         self._last_ry = None
         self.has_content = False  # 网格不算内容
+        self._face_order = []  # 上一帧由远到近的面顺序 [(id(图形), 面索引)]
+        
+        # 深度缓冲渲染（需要NumPy）：所有面画进一张图像，替代逐面创建多边形
+        self.zbuffer_enabled = False
+        self._rasterizer = ZBufferRasterizer() if ZBUFFER_AVAILABLE else None
+        self._frame_image = None  # 保持图像引用，防止被回收
+        self._rgb_cache = {}  # 颜色名 -> (r, g, b)
 
         # 交互状态
         self.dragging = False
         self.drag_start_pos = None
         self.drag_gizmo_axis = None  # 当前拖动的轴（'x', 'y', 'z'）
+        self.drag_modified = False  # 本次拖动是否修改了图形
         self.rotation_start = {}  # 旋转模式的起始状态
         self.hover_gizmo_axis = None  # 当前悬停的轴
         
@@ -101,6 +117,12 @@ class Canvas3D:
             # 其他图形支持所有模式
             return ["move", "scale", "rotate"]
     
+    def set_zbuffer_enabled(self, enabled: bool) -> bool:
+        """开启或关闭深度缓冲渲染，返回实际状态（缺少NumPy时无法开启）"""
+        self.zbuffer_enabled = bool(enabled) and self._rasterizer is not None
+        self.redraw()
+        return self.zbuffer_enabled
+    
     def get_transform_mode(self):
         """获取当前变换模式"""
         return self.transform_mode
@@ -132,6 +154,7 @@ class Canvas3D:
         self.drag_start_pos = (event.x, event.y)
         self.dragging = False
         self.drag_gizmo_axis = None
+        self.drag_modified = False
         
         # 检查是否点击了gizmo控件
         if self.selected_shape and self.show_gizmos:
@@ -160,17 +183,25 @@ class Canvas3D:
         if self.drag_gizmo_axis and self.selected_shape:
             # 拖动gizmo轴进行单轴移动
             self._drag_gizmo(dx, dy)
+            self.drag_modified = self.drag_modified or bool(dx or dy)
         elif self.selected_shape:
             # 拖动图形进行自由移动
             self._drag_shape(dx, dy)
+            self.drag_modified = self.drag_modified or bool(dx or dy)
         
         self.drag_start_pos = (event.x, event.y)
     
     def _on_left_release(self, event):
         """左键释放处理"""
+        modified = self.drag_modified and self.selected_shape is not None
         self.dragging = False
         self.drag_start_pos = None
         self.drag_gizmo_axis = None
+        self.drag_modified = False
+        
+        # 一次拖动只通知一次修改
+        if modified and self.change_callback:
+            self.change_callback(self.selected_shape)
     
     def _on_mouse_move(self, event):
         """鼠标移动处理：更新悬停状态以高亮可选择的陀螺仪环"""
@@ -193,123 +224,35 @@ class Canvas3D:
             return
         c.delete("all")
 
-        # 计算相机位置
-        rad_yaw = math.radians(self.yaw)
-        rad_pitch = math.radians(self.pitch)
-        cx = self.target[0] + self.distance * math.cos(rad_pitch) * math.cos(rad_yaw)
-        cy = self.target[1] + self.distance * math.sin(rad_pitch)
-        cz = self.target[2] + self.distance * math.cos(rad_pitch) * math.sin(rad_yaw)
-
-        # 预计算投影比例
-        fov = math.radians(60.0)
-        f = 1.0 / math.tan(fov / 2.0)
-        scale = (h / 2.0) * f
-
-        def world_to_screen(px, py, pz):
-            # 视图坐标
-            # 生成相机坐标系
-            tx, ty, tz = self.target
-            # 前向（摄像机 -> 目标）
-            zx, zy, zz = (tx - cx, ty - cy, tz - cz)
-            zlen = math.sqrt(zx*zx + zy*zy + zz*zz) or 1.0
-            zx, zy, zz = zx / zlen, zy / zlen, zz / zlen
-            # 右向
-            upx, upy, upz = 0.0, 1.0, 0.0
-            xx = upy * zz - upz * zy
-            xy = upz * zx - upx * zz
-            xz = upx * zy - upy * zx
-            xlen = math.sqrt(xx*xx + xy*xy + xz*xz) or 1.0
-            xx, xy, xz = xx / xlen, xy / xlen, xz / xlen
-            # 上向
-            yx = zy * xz - zz * xy
-            yy = zz * xx - zx * xz
-            yz = zx * xy - zy * xx
-
-            # 点到相机坐标
-            dx, dy, dz = px - cx, py - cy, pz - cz
-            rx = dx * xx + dy * xy + dz * xz
-            ry = dx * yx + dy * yy + dz * yz
-            rz = dx * zx + dy * zy + dz * zz
-            if rz <= 0.1:
-                return None
-            sx = w/2.0 + (rx * scale) / rz
-            sy = h/2.0 - (ry * scale) / rz
-            return (sx, sy)
+        # 同步相机（参数未变化时沿用上次计算的矩阵）
+        camera = self._update_camera()
+        world_to_screen = camera.world_to_screen
 
         # 动态计算网格渲染范围（基于视距和视角）
         # 距离越远，需要渲染的网格范围越大，营造无限延伸的效果
         dynamic_range = max(30, int(self.distance * 2.0))
         
-        # 绘制网格线 - 使用更宽松的渲染条件
-        grid_lines = []
-        for i in range(-dynamic_range, dynamic_range + 1, self.grid_step):
-            color = self.grid_color_major if i % 5 == 0 else self.grid_color_minor
-            
-            # 线平行X轴（沿Z变化）
-            p1 = world_to_screen(-dynamic_range, 0, i)
-            p2 = world_to_screen(dynamic_range, 0, i)
-            # 只要有一个点能投影就绘制线段
-            if p1 or p2:
-                if not p1:
-                    p1 = world_to_screen(-dynamic_range*0.5, 0, i)
-                if not p2:
-                    p2 = world_to_screen(dynamic_range*0.5, 0, i)
-                if p1 and p2:
-                    grid_lines.append((*p1, *p2, color))
-                
-            # 线平行Z轴（沿X变化）
-            p3 = world_to_screen(i, 0, -dynamic_range)
-            p4 = world_to_screen(i, 0, dynamic_range)
-            # 只要有一个点能投影就绘制线段
-            if p3 or p4:
-                if not p3:
-                    p3 = world_to_screen(i, 0, -dynamic_range*0.5)
-                if not p4:
-                    p4 = world_to_screen(i, 0, dynamic_range*0.5)
-                if p3 and p4:
-                    grid_lines.append((*p3, *p4, color))
-        
-        # 绘制网格线
-        for x1, y1, x2, y2, color in grid_lines:
-            c.create_line(x1, y1, x2, y2, fill=color)
+        # 绘制网格线：裁剪到视锥后同色网格线连成少量折线，次网格线按屏幕间距淡出
+        minor_chains, major_chains, minor_alpha = self.grid_floor.build(
+            camera, dynamic_range, self.grid_step, self.distance)
+        if minor_chains:
+            minor_color = self._blend_color(self.grid_color_minor, c.cget("bg"), minor_alpha)
+            for coords in minor_chains:
+                c.create_line(*coords, fill=minor_color)
+        for coords in major_chains:
+            c.create_line(*coords, fill=self.grid_color_major)
 
         # 坐标轴（使用固定长度，确保在任何放大级别下都能正常显示）
         x0 = world_to_screen(0, 0, 0)
         # 使用适中的轴长度，既能看清方向又不会超出投影范围
         axis_length = min(10, self.distance)  # 轴长度与视距相关，但有上限
         
-        # X轴（红色）- 只向正方向延伸
-        x_pos = world_to_screen(axis_length, 0, 0)
-        if x0 and x_pos:
-            c.create_line(*x0, *x_pos, fill=self.axis_x_color, width=3)
-        elif x0:  # 如果终点投影失败，使用更短的轴
-            for length in [axis_length*0.5, axis_length*0.25, 1.0]:
-                x_fallback = world_to_screen(length, 0, 0)
-                if x_fallback:
-                    c.create_line(*x0, *x_fallback, fill=self.axis_x_color, width=3)
-                    break
-            
-        # Y轴（绿色）- 只向正方向延伸
-        y_pos = world_to_screen(0, axis_length, 0)
-        if x0 and y_pos:
-            c.create_line(*x0, *y_pos, fill=self.axis_y_color, width=3)
-        elif x0:  # 如果终点投影失败，使用更短的轴
-            for length in [axis_length*0.5, axis_length*0.25, 1.0]:
-                y_fallback = world_to_screen(0, length, 0)
-                if y_fallback:
-                    c.create_line(*x0, *y_fallback, fill=self.axis_y_color, width=3)
-                    break
-            
-        # Z轴（蓝色）- 只向正方向延伸
-        z_pos = world_to_screen(0, 0, axis_length)
-        if x0 and z_pos:
-            c.create_line(*x0, *z_pos, fill=self.axis_z_color, width=3)
-        elif x0:  # 如果终点投影失败，使用更短的轴
-            for length in [axis_length*0.5, axis_length*0.25, 1.0]:
-                z_fallback = world_to_screen(0, 0, length)
-                if z_fallback:
-                    c.create_line(*x0, *z_fallback, fill=self.axis_z_color, width=3)
-                    break
+        # X轴（红色）、Y轴（绿色）、Z轴（蓝色）只向正方向延伸，跨越近平面时裁剪到近平面上
+        axes = camera.project_segments([(0, 0, 0)] * 3,
+                                       [(axis_length, 0, 0), (0, axis_length, 0), (0, 0, axis_length)])
+        for segment, color in zip(axes, (self.axis_x_color, self.axis_y_color, self.axis_z_color)):
+            if segment:
+                c.create_line(*segment, fill=color, width=3)
         
         # 绘制坐标轴标签（如果原点可见）
         if x0:
@@ -332,144 +275,130 @@ class Canvas3D:
                              font=("Arial", 12, "bold"))
         
         # 绘制3D图形
-        self.draw_3d_shapes(world_to_screen)
+        self.draw_3d_shapes(camera)
         
         # 绘制选中图形的操作控件
         if self.selected_shape and self.show_gizmos:
             self.draw_gizmos(world_to_screen)
     
-    def draw_3d_shapes(self, world_to_screen):
+    def draw_3d_shapes(self, camera):
         """绘制3D图形（实体模式）"""
-        # 收集所有面信息用于深度排序
-        all_faces = []
-        
+        # 面记录按字段存放在平行数组中
+        face_keys = []  # (id(图形), 面索引)
+        face_shapes = []
+        face_coords = []  # 屏幕坐标（扁平列表）
+        face_depths = []  # 视图空间深度
+        face_brightness = []
+        face_vertex_depths = []  # 各顶点的视图深度
+        
+        # 视锥剔除：包围球完全在视锥外的图形不做任何顶点运算
+        shapes = []
+        near_flags = []  # 图形是否与近平面相交（只有这些图形的顶点可能无法投影）
         for shape in self.shapes_3d:
             if not shape.visible:
                 continue
-            
-            # 获取图形的顶点和面
-            vertices = shape.get_vertices()
+            state = camera.classify_sphere(shape.get_center(), shape.get_bounding_radius())
+            if state != FRUSTUM_OUTSIDE:
+                shapes.append(shape)
+                near_flags.append(state == FRUSTUM_NEAR)
+        self._update_lod(camera, shapes)
+        
+        # 整个场景的顶点一次性投影到屏幕坐标
+        shape_vertices = [shape.get_vertices() for shape in shapes]
+        scene_screen, scene_depths = camera.project_points_depth(
+            [v for vertices in shape_vertices for v in vertices])
+        
+        cam_x, cam_y, cam_z = camera.position
+        offset = 0
+        for shape, world_vertices, crosses_near in zip(shapes, shape_vertices, near_flags):
+            count = len(world_vertices)
+            screen_vertices = scene_screen[offset:offset + count]
+            vertex_depths = scene_depths[offset:offset + count]
+            offset += count
             faces = shape.get_faces() if hasattr(shape, 'get_faces') else []
+            # 面法向量和亮度只在图形变化后重新计算
+            normals, plane_offsets = shape.get_face_planes()
+            brightness = shape.get_face_brightness(LIGHT_DIRECTION)
+            shape_id = id(shape)
+            # 与近平面相交的图形保留齐次坐标，跨越近平面的面在透视除法之前裁剪
+            clip_vertices = camera.homogeneous_points(world_vertices) if crosses_near else None
             
-            # 将3D顶点投影到屏幕坐标
-            screen_vertices = []
-            world_vertices = []
-            for vertex in vertices:
-                screen_pos = world_to_screen(vertex[0], vertex[1], vertex[2])
-                screen_vertices.append(screen_pos)
-                world_vertices.append(vertex)
-            
-            # 收集所有面及其深度信息
-            for face in faces:
-                if len(face) >= 3:  # 至少需要3个顶点组成面
-                    # 计算面的平均Z深度（在世界坐标系中）
-                    total_z = 0
-                    valid_vertices = 0
-                    face_screen_coords = []
-                    face_world_coords = []
-                    
-                    for vertex_idx in face:
-                        if vertex_idx < len(world_vertices) and vertex_idx < len(screen_vertices):
-                            world_vertex = world_vertices[vertex_idx]
-                            screen_vertex = screen_vertices[vertex_idx]
-                            if screen_vertex:
-                                total_z += world_vertex[2]  # 使用世界坐标的Z值
-                                valid_vertices += 1
-                                face_screen_coords.append(screen_vertex)
-                                face_world_coords.append(world_vertex)
-                    
-                    if valid_vertices >= 3:  # 面有足够的有效顶点
-                        # 使用外积进行背面剔除
-                        if self._is_face_front_facing(face_world_coords):
-                            avg_z = total_z / valid_vertices
-                            face_info = {
-                                'shape': shape,
-                                'face_coords': face_screen_coords,
-                                'depth': avg_z,
-                                'face_indices': face
-                            }
-                            all_faces.append(face_info)
-        
-        # 按深度排序（远的先画）
-        all_faces.sort(key=lambda x: x['depth'], reverse=True)
+            for face_idx, face in enumerate(faces):
+                # 背面剔除：相机在面所在平面的背面一侧
+                nx, ny, nz = normals[face_idx]
+                if nx * cam_x + ny * cam_y + nz * cam_z >= plane_offsets[face_idx]:
+                    continue
+                
+                if crosses_near and not all(screen_vertices[vertex_idx] for vertex_idx in face):
+                    coords, depths = camera.clip_polygon([clip_vertices[vertex_idx] for vertex_idx in face])
+                else:
+                    coords = [c for vertex_idx in face for c in screen_vertices[vertex_idx]]
+                    depths = [vertex_depths[vertex_idx] for vertex_idx in face]
+                
+                if len(depths) >= 3:  # 裁剪后仍是多边形
+                    face_keys.append((shape_id, face_idx))
+                    face_shapes.append(shape)
+                    face_coords.append(coords)
+                    # 面中心的视图深度（取裁剪后顶点的平均值）
+                    face_depths.append(sum(depths) / len(depths))
+                    face_brightness.append(brightness[face_idx])
+                    face_vertex_depths.append(depths)
+        
+        if self.zbuffer_enabled:
+            # 深度缓冲逐像素决定遮挡，无需排序
+            polygons = [(face_coords[i], face_vertex_depths[i],
+                         self._face_rgb(face_shapes[i], face_brightness[i]))
+                        for i in range(len(face_keys))]
+            self._draw_zbuffer(camera, polygons)
+            return
+        
+        # 按深度排序（远的先画）：以上一帧的顺序为初始顺序，相机小幅移动时基本有序，
+        # 自适应排序（timsort）接近线性时间
+        index = {key: i for i, key in enumerate(face_keys)}
+        order = []
+        placed = bytearray(len(face_keys))
+        for key in self._face_order:
+            i = index.get(key)
+            if i is not None:
+                order.append(i)
+                placed[i] = 1
+        order.extend(i for i in range(len(face_keys)) if not placed[i])
+        order.sort(key=face_depths.__getitem__, reverse=True)
+        self._face_order = [face_keys[i] for i in order]
         
         # 绘制所有面
-        for face_info in all_faces:
-            self._draw_face(face_info)
+        for i in order:
+            self._draw_face(face_shapes[i], face_coords[i], face_brightness[i])
     
-    def _is_face_front_facing(self, face_world_coords):
-        """使用外积判断面是否朝向观察者（背面剔除）"""
-        if len(face_world_coords) < 3:
-            return True  # 不足3个点，默认渲染
-        
-        try:
-            # 获取面的前三个顶点
-            v1 = face_world_coords[0]
-            v2 = face_world_coords[1] 
-            v3 = face_world_coords[2]
-            
-            # 计算两个边向量
-            edge1 = (v2[0] - v1[0], v2[1] - v1[1], v2[2] - v1[2])
-            edge2 = (v3[0] - v1[0], v3[1] - v1[1], v3[2] - v1[2])
-            
-            # 计算法向量（外积）
-            normal = (
-                edge1[1] * edge2[2] - edge1[2] * edge2[1],  # nx
-                edge1[2] * edge2[0] - edge1[0] * edge2[2],  # ny  
-                edge1[0] * edge2[1] - edge1[1] * edge2[0]   # nz
-            )
-            
-            # 计算相机位置
-            camera_pos = self._get_camera_position()
-            
-            # 计算从面中心到相机的向量
-            face_center = (
-                (v1[0] + v2[0] + v3[0]) / 3,
-                (v1[1] + v2[1] + v3[1]) / 3,
-                (v1[2] + v2[2] + v3[2]) / 3
-            )
-            
-            view_vector = (
-                camera_pos[0] - face_center[0],
-                camera_pos[1] - face_center[1], 
-                camera_pos[2] - face_center[2]
-            )
-            
-            # 计算法向量与视线向量的点积
-            dot_product = (normal[0] * view_vector[0] + 
-                          normal[1] * view_vector[1] + 
-                          normal[2] * view_vector[2])
-            
-            # 如果点积为负，说明面朝向观察者（修复反向问题）
-            return dot_product < 0
-            
-        except (IndexError, ZeroDivisionError):
-            return True  # 出错时默认渲染
+    def _update_lod(self, camera, shapes):
+        """按包围球的投影半径为曲面图形选择细节级别"""
+        for shape in shapes:
+            if not shape.lod_enabled:
+                continue
+            depth = camera.view_depth(*shape.get_center())
+            if depth > camera.near:
+                shape.update_lod(shape.get_bounding_radius() * camera.focal / depth)
+    
+    def _update_camera(self):
+        """按当前视角参数和画布尺寸同步相机"""
+        self.camera.update(self.target, self.distance, self.yaw, self.pitch,
+                           self.canvas.winfo_width(), self.canvas.winfo_height())
+        return self.camera
     
     def _get_camera_position(self):
         """获取相机在世界坐标系中的位置"""
-        # 将球坐标转换为笛卡尔坐标
-        yaw_rad = math.radians(self.yaw)
-        pitch_rad = math.radians(self.pitch)
-        
-        x = self.target[0] + self.distance * math.cos(pitch_rad) * math.cos(yaw_rad)
-        y = self.target[1] + self.distance * math.sin(pitch_rad)
-        z = self.target[2] + self.distance * math.cos(pitch_rad) * math.sin(yaw_rad)
-        
-        return (x, y, z)
+        return self._update_camera().position
     
-    def _draw_face(self, face_info):
-        """绘制单个面"""
-        shape = face_info['shape']
-        face_coords = face_info['face_coords']
-        
-        if len(face_coords) < 3:
-            return
-        
-        # 计算面的法向量来确定明暗（简单光照）
-        brightness = self._calculate_face_brightness(face_info['face_indices'], shape)
+    def _draw_zbuffer(self, camera, polygons):
+        """用深度缓冲光栅化所有面，作为一张图像放到网格和坐标轴之上（只有填充，不画边框和线宽）"""
+        from PIL import ImageTk
         
-        # 根据选中状态和形状属性确定颜色
+        image = self._rasterizer.render(camera.width, camera.height, polygons)
+        self._frame_image = ImageTk.PhotoImage(image)
+        self.canvas.create_image(0, 0, anchor="nw", image=self._frame_image)
+    
+    def _face_colors(self, shape):
+        """面的填充色和边框色（未应用明暗）"""
         if shape.selected:
             # 选中时为黄色
             fill_color = "#ffff00"
@@ -482,67 +411,51 @@ class Canvas3D:
                 fill_color = shape.color
             # 线条颜色
             outline_color = shape.color if hasattr(shape, 'color') else "#333333"
+        return fill_color, outline_color
+    
+    def _color_rgb(self, color):
+        """颜色名 -> (r, g, b)"""
+        rgb = self._rgb_cache.get(color)
+        if rgb is None:
+            try:
+                rgb = tuple(v >> 8 for v in self.canvas.winfo_rgb(color))
+            except tk.TclError:
+                rgb = (0, 0, 0)
+            self._rgb_cache[color] = rgb
+        return rgb
+    
+    def _face_rgb(self, shape, brightness):
+        """应用明暗后的面填充色 (r, g, b)"""
+        rgb = self._color_rgb(self._face_colors(shape)[0])
+        return tuple(max(0, min(255, int(v * brightness))) for v in rgb)
+    
+    def _blend_color(self, color, background, alpha):
+        """按不透明度 alpha 把颜色混合到背景色上"""
+        if alpha >= 1.0:
+            return color
+        fg = self._color_rgb(color)
+        bg = self._color_rgb(background)
+        r, g, b = (int(round(v + (u - v) * alpha)) for u, v in zip(fg, bg))
+        return f"#{r:02x}{g:02x}{b:02x}"
+    
+    def _draw_face(self, shape, coords, brightness):
+        """绘制单个面（coords 为扁平的屏幕坐标列表，brightness 为面的亮度）"""
+        if len(coords) < 6:
+            return
+        
+        fill_color, outline_color = self._face_colors(shape)
         
         # 应用明暗效果到填充色
         face_color = self._apply_brightness(fill_color, brightness)
         
-        # 创建多边形坐标列表
-        coords = []
-        for coord in face_coords:
-            coords.extend([coord[0], coord[1]])
-        
         # 绘制填充的多边形
-        if len(coords) >= 6:  # 至少3个点，每个点2个坐标
-            # 获取线宽
-            line_width = shape.line_width if hasattr(shape, 'line_width') else 1
-            
-            self.canvas.create_polygon(
-                coords,
-                fill=face_color,
-                outline=outline_color,  # 使用形状的颜色作为边框
-                width=line_width
-            )
-    
-    def _calculate_face_brightness(self, face_indices, shape):
-        """计算面的亮度（简单的光照模拟）"""
-        if len(face_indices) < 3:
-            return 0.7
-        
-        try:
-            vertices = shape.get_vertices()
-            # 获取面的前三个顶点
-            v1 = vertices[face_indices[0]]
-            v2 = vertices[face_indices[1]]
-            v3 = vertices[face_indices[2]]
-            
-            # 计算法向量
-            edge1 = (v2[0] - v1[0], v2[1] - v1[1], v2[2] - v1[2])
-            edge2 = (v3[0] - v1[0], v3[1] - v1[1], v3[2] - v1[2])
-            
-            # 叉积得到法向量（调整顺序以匹配背面剔除逻辑）
-            normal = (
-                edge1[1] * edge2[2] - edge1[2] * edge2[1],
-                edge1[2] * edge2[0] - edge1[0] * edge2[2],
-                edge1[0] * edge2[1] - edge1[1] * edge2[0]
-            )
-            
-            # 归一化法向量
-            length = (normal[0]**2 + normal[1]**2 + normal[2]**2)**0.5
-            if length > 0:
-                normal = (normal[0]/length, normal[1]/length, normal[2]/length)
-            
-            # 简单的定向光源（从右上方照射）
-            light_direction = (0.5, 0.7, 0.5)
-            
-            # 计算光照强度（点积）- 反转以匹配新的面朝向
-            dot_product = normal[0]*light_direction[0] + normal[1]*light_direction[1] + normal[2]*light_direction[2]
-            
-            # 将亮度限制在0.3到1.0之间（反转亮度映射）
-            brightness = max(0.3, min(1.0, (-dot_product + 1) / 2))
-            return brightness
-            
-        except (IndexError, ZeroDivisionError):
-            return 0.7  # 默认亮度
+        line_width = shape.line_width if hasattr(shape, 'line_width') else 1
+        self.canvas.create_polygon(
+            coords,
+            fill=face_color,
+            outline=outline_color,  # 使用形状的颜色作为边框
+            width=line_width
+        )
     
     def _apply_brightness(self, color_hex, brightness):
         """将亮度应用到颜色上"""
@@ -925,56 +838,19 @@ class Canvas3D:
         """设置选择改变时的回调函数"""
         self.selection_callback = callback
     
+    def set_change_callback(self, callback):
+        """设置拖动修改图形后的回调函数"""
+        self.change_callback = callback
+    
     def get_selected_shape(self):
         """获取当前选中的图形"""
         return self.selected_shape
     
     def _pick_shape(self, screen_x, screen_y):
         """根据屏幕坐标选择3D图形"""
-        # 计算投影函数
-        w = self.canvas.winfo_width()
-        h = self.canvas.winfo_height()
-        if w <= 1 or h <= 1:
+        if self.canvas.winfo_width() <= 1 or self.canvas.winfo_height() <= 1:
             return None
-            
-        # 计算相机位置
-        rad_yaw = math.radians(self.yaw)
-        rad_pitch = math.radians(self.pitch)
-        cx = self.target[0] + self.distance * math.cos(rad_pitch) * math.cos(rad_yaw)
-        cy = self.target[1] + self.distance * math.sin(rad_pitch)
-        cz = self.target[2] + self.distance * math.cos(rad_pitch) * math.sin(rad_yaw)
-        
-        fov = math.radians(60.0)
-        f = 1.0 / math.tan(fov / 2.0)
-        scale = (h / 2.0) * f
-        
-        def world_to_screen(px, py, pz):
-            # 简化的投影计算
-            tx, ty, tz = self.target
-            zx, zy, zz = (tx - cx, ty - cy, tz - cz)
-            zlen = math.sqrt(zx*zx + zy*zy + zz*zz) or 1.0
-            zx, zy, zz = zx / zlen, zy / zlen, zz / zlen
-            
-            upx, upy, upz = 0.0, 1.0, 0.0
-            xx = upy * zz - upz * zy
-            xy = upz * zx - upx * zz
-            xz = upx * zy - upy * zx
-            xlen = math.sqrt(xx*xx + xy*xy + xz*xz) or 1.0
-            xx, xy, xz = xx / xlen, xy / xlen, xz / xlen
-            
-            yx = zy * xz - zz * xy
-            yy = zz * xx - zx * xz
-            yz = zx * xy - zy * xx
-            
-            dx, dy, dz = px - cx, py - cy, pz - cz
-            rx = dx * xx + dy * xy + dz * xz
-            ry = dx * yx + dy * yy + dz * yz
-            rz = dx * zx + dy * zy + dz * zz
-            if rz <= 0.1:
-                return None
-            sx = w/2.0 + (rx * scale) / rz
-            sy = h/2.0 - (ry * scale) / rz
-            return (sx, sy)
+        world_to_screen = self._update_camera().world_to_screen
         
         # 检查每个图形的中心点是否在点击范围内
         pick_radius = 20  # 选择半径
@@ -1147,18 +1023,10 @@ class Canvas3D:
         """移动模式：自由移动"""
         move_factor = 0.03  # 调整移动敏感度
         
-        # 计算相机的右向量和上向量
-        rad_yaw = math.radians(self.yaw)
-        rad_pitch = math.radians(self.pitch)
-        
-        # 右向量（X方向）
-        right_x = -math.sin(rad_yaw)
-        right_z = math.cos(rad_yaw)
-        
-        # 上向量投影到水平面
-        up_x = -math.cos(rad_yaw) * math.sin(rad_pitch)
-        up_y = math.cos(rad_pitch)
-        up_z = -math.sin(rad_yaw) * math.sin(rad_pitch)
+        # 相机的右向量和上向量
+        camera = self._update_camera()
+        right_x, _, right_z = camera.right
+        up_x, up_y, up_z = camera.up
         
         # 计算移动偏移（调整Y轴方向）
         offset_x = (dx * right_x - dy * up_x) * move_factor  # 注意dy变为负
@@ -0,0 +1,192 @@
+"""
+3D网格地板 - 网格线的世界坐标按范围缓存，每帧解析地裁剪到视锥后连成少量折线
+
+地面 (y=0) 上的网格范围正方形依次被近平面和外扩后的屏幕四个侧面裁剪，得到世界坐标中的
+凸多边形，每条网格线与它求交即得可见部分。同色网格线按"之"字形首尾相连成一条折线，
+相邻两条线之间的连接段沿多边形边界走：侧面边界在屏幕外，范围边界与最外圈的主网格线重合，
+都不可见；只有沿近平面的边界会露出，遇到时折线断开。次网格线按屏幕间距淡出或丢弃。
+"""
+from typing import List, Optional, Sequence, Tuple
+
+MAJOR_EVERY = 5  # 每隔几条网格线为一条主网格线
+VIEW_PAD = 4.0  # 屏幕外扩（像素），连接段落在可见区域之外
+MINOR_FADE_SPACING = 12.0  # 次网格线间距小于该值（像素）时开始淡出
+MINOR_HIDE_SPACING = 4.0  # 次网格线间距小于该值（像素）时不再绘制
+
+Point2 = Tuple[float, float]
+
+
+class GridFloor:
+    """网格地板几何"""
+
+    def __init__(self, major_every: int = MAJOR_EVERY):
+        self.major_every = major_every
+        self._key = None
+        self._lines = None  # (范围, 次网格线坐标, 主网格线坐标)
+
+    def get_lines(self, grid_range: int, step: int) -> Tuple[int, List[float], List[float]]:
+        """网格线的世界坐标（x 或 z 取值），范围向上取整到主网格间隔的整数倍，使最外圈为主网格线"""
+        key = (grid_range, step)
+        if key != self._key:
+            major_step = step * self.major_every
+            grid_range = -(-grid_range // major_step) * major_step
+            minor = []
+            major = []
+            for i in range(-grid_range, grid_range + 1, step):
+                (major if i % self.major_every == 0 else minor).append(float(i))
+            self._key = key
+            self._lines = (grid_range, minor, major)
+        return self._lines
+
+    def build(self, camera, grid_range: int, step: int,
+              distance: float) -> Tuple[List[List[float]], List[List[float]], float]:
+        """计算本帧的网格折线
+
+        返回 (次网格折线, 主网格折线, 次网格线不透明度)，折线为扁平屏幕坐标列表，
+        不透明度为0时次网格折线为空。
+        """
+        grid_range, minor, major = self.get_lines(grid_range, step)
+        region = self._clip_region(camera, grid_range)
+        if len(region) < 3:
+            return [], [], 0.0
+
+        # 次网格线按相机目标处的屏幕间距整体淡出
+        spacing = camera.focal * step / distance if distance > 0 else 0.0
+        alpha = (spacing - MINOR_HIDE_SPACING) / (MINOR_FADE_SPACING - MINOR_HIDE_SPACING)
+        alpha = max(0.0, min(1.0, alpha))
+
+        matrix = camera.view_projection_matrix
+        minor_chains = []
+        if alpha > 0:
+            # 最近处间距也过小的次网格线整条丢弃
+            max_depth = camera.focal * step / MINOR_HIDE_SPACING
+            minor_chains = self._chains(region, self._segments(region, minor, matrix, max_depth), matrix)
+        major_chains = self._chains(region, self._segments(region, major, matrix, None), matrix)
+        return minor_chains, major_chains, alpha
+
+    @staticmethod
+    def _clip_region(camera, grid_range: float) -> List[Tuple[Point2, bool]]:
+        """网格范围正方形裁剪到视锥后的凸多边形 [((x, z), 从该顶点出发的边是否可见)]"""
+        (x0, _, x1, x2), (y0, _, y1, y2), _, (w0, _, w1, w2) = camera.view_projection_matrix
+        near = camera.near
+        right = camera.width + VIEW_PAD
+        bottom = camera.height + VIEW_PAD
+        # 地面上各裁剪面的 a·x + b·z + c >= 0（先裁近平面，保证侧面判断时 W > 0）
+        planes = [
+            ((w0, w1, w2 - near), True),
+            ((x0 + VIEW_PAD * w0, x1 + VIEW_PAD * w1, x2 + VIEW_PAD * w2), False),
+            ((right * w0 - x0, right * w1 - x1, right * w2 - x2), False),
+            ((y0 + VIEW_PAD * w0, y1 + VIEW_PAD * w1, y2 + VIEW_PAD * w2), False),
+            ((bottom * w0 - y0, bottom * w1 - y1, bottom * w2 - y2), False),
+        ]
+
+        r = grid_range
+        polygon = [((-r, -r), False), ((r, -r), False), ((r, r), False), ((-r, r), False)]
+        for (a, b, c), visible in planes:
+            if len(polygon) < 3:
+                break
+            clipped = []
+            prev, prev_visible = polygon[-1]
+            prev_d = a * prev[0] + b * prev[1] + c
+            for point, point_visible in polygon:
+                d = a * point[0] + b * point[1] + c
+                if (d >= 0) != (prev_d >= 0):
+                    t = prev_d / (prev_d - d)
+                    crossing = (prev[0] + t * (point[0] - prev[0]), prev[1] + t * (point[1] - prev[1]))
+                    # 离开时交点之后的边沿裁剪面，进入时沿原来的边
+                    clipped.append((crossing, visible if prev_d >= 0 else prev_visible))
+                if d >= 0:
+                    clipped.append((point, point_visible))
+                prev, prev_visible, prev_d = point, point_visible, d
+            polygon = clipped
+        return polygon
+
+    @staticmethod
+    def _segments(region, values: Sequence[float], matrix,
+                  max_depth: Optional[float]) -> List[Tuple[int, Point2, int, Point2]]:
+        """网格线 z=c（再是 x=c）与多边形的交线段 [(起点所在边, 起点, 终点所在边, 终点)]
+
+        max_depth 不为None时丢弃最近端深度超过该值的线段。
+        """
+        w0, _, w1, w2 = matrix[3]
+        count = len(region)
+        segments = []
+        for axis in (1, 0):
+            coords = [point[axis] for point, _ in region]
+            low, high = min(coords), max(coords)
+            eps = 1e-9 * (high - low)
+            for value in values:
+                if value < low or value > high:
+                    continue
+                # 与多边形边界重合的最外圈网格线略向内收，确保恰有两个交点
+                value = min(max(value, low + eps), high - eps)
+                hits = []
+                for k in range(count):
+                    p, q = region[k][0], region[(k + 1) % count][0]
+                    if (p[axis] < value) != (q[axis] < value):
+                        t = (value - p[axis]) / (q[axis] - p[axis])
+                        other = p[1 - axis] + t * (q[1 - axis] - p[1 - axis])
+                        hits.append((k, (other, value) if axis == 1 else (value, other)))
+                if len(hits) != 2:
+                    continue
+                (ka, pa), (kb, pb) = hits
+                if max_depth is not None:
+                    depth = min(w0 * pa[0] + w1 * pa[1] + w2, w0 * pb[0] + w1 * pb[1] + w2)
+                    if depth > max_depth:
+                        continue
+                segments.append((ka, pa, kb, pb))
+        return segments
+
+    @staticmethod
+    def _walk(region, start: int, end: int) -> Optional[List[Point2]]:
+        """沿多边形边界从边 start 上一点走到边 end 上一点，返回途经的顶点；只能经过近平面时返回None"""
+        count = len(region)
+        if start == end:
+            return [] if not region[start][1] else None
+        best = None
+        # 正向经过边 start..end，反向经过边 start..end（递减）
+        for direction in (1, -1):
+            steps = ((end - start) * direction) % count
+            edges = [(start + direction * i) % count for i in range(steps + 1)]
+            if any(region[k][1] for k in edges):
+                continue
+            if direction == 1:
+                path = [region[(k + 1) % count][0] for k in edges[:-1]]
+            else:
+                path = [region[k][0] for k in edges[:-1]]
+            if best is None or len(path) < len(best):
+                best = path
+        return best
+
+    def _chains(self, region, segments, matrix) -> List[List[float]]:
+        """把线段首尾相连成尽量少的折线，并投影为扁平屏幕坐标列表"""
+        chains = []
+        chain = None
+        end_edge = None
+        for ka, pa, kb, pb in segments:
+            if chain is not None:
+                best = None
+                for k0, p0, k1, p1 in ((ka, pa, kb, pb), (kb, pb, ka, pa)):
+                    path = self._walk(region, end_edge, k0)
+                    if path is not None and (best is None or len(path) < len(best[0])):
+                        best = (path, p0, k1, p1)
+                if best is not None:
+                    path, p0, end_edge, p1 = best
+                    chain.extend(path)
+                    chain.append(p0)
+                    chain.append(p1)
+                    continue
+            chain = [pa, pb]
+            chains.append(chain)
+            end_edge = kb
+
+        (x0, _, x1, x2), (y0, _, y1, y2), _, (w0, _, w1, w2) = matrix
+        result = []
+        for chain in chains:
+            coords = []
+            for x, z in chain:
+                w = w0 * x + w1 * z + w2
+                coords.append((x0 * x + x1 * z + x2) / w)
+                coords.append((y0 * x + y1 * z + y2) / w)
+            result.append(coords)
+        return result
@@ -11,9 +11,12 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from managers.drawing_manager import DrawingManager
 from managers.drawing_manager3d import DrawingManager3D
+from managers.file_manager import FileManager, PROJECT_FILETYPES, read_project_header
+from managers.autosave_manager import AutosaveManager
 from .tool_bar import ToolBar
 from .property_panel import PropertyPanel
 from .canvas3d import Canvas3D
+from .rasterizer3d import AVAILABLE as ZBUFFER_AVAILABLE
 
 
 class MainWindow:
@@ -29,6 +32,13 @@ class MainWindow:
         self.drawing_manager = DrawingManager()
         self.drawing_manager3d = DrawingManager3D()
         
+        # 文件状态与自动保存
+        self.file_manager = FileManager()
+        self.drawing_manager.set_change_callback(self.file_manager.mark_modified)
+        self.drawing_manager3d.set_change_callback(self.file_manager.mark_modified)
+        self.autosave_manager = AutosaveManager(self.root, self.file_manager, self.get_document_snapshot,
+                                                on_saved=self.on_autosaved)
+        
         # 初始化界面组件
         self.setup_ui()
         
@@ -38,6 +48,10 @@ class MainWindow:
         # 当前选择的工具
         self.current_tool = "select"
         
+        # 界面初始化产生的历史记录不算修改
+        self.file_manager.mark_saved()
+        self.autosave_manager.start()
+        
     def setup_ui(self):
         """设置用户界面"""
         # 创建菜单栏
@@ -77,9 +91,10 @@ class MainWindow:
                             yscrollcommand=canvas_scrollbar_v.set,
                             xscrollcommand=canvas_scrollbar_h.set)
         
-        # 配置滚动条
-        canvas_scrollbar_v.config(command=self.canvas.yview)
-        canvas_scrollbar_h.config(command=self.canvas.xview)
+        # 配置滚动条（滚动后补画进入视口的图形并更新图像）
+        canvas_scrollbar_v.config(command=self.on_canvas_yview)
+        canvas_scrollbar_h.config(command=self.on_canvas_xview)
+        self.canvas.bind('<Configure>', lambda e: self.drawing_manager.refresh_view())
         
         # 布局滚动条和画布
         canvas_scrollbar_v.pack(side=tk.RIGHT, fill=tk.Y)
@@ -165,6 +180,13 @@ class MainWindow:
         view_menu.add_command(label="缩小", command=self.zoom_out, accelerator="Ctrl+-")
         view_menu.add_command(label="适应窗口", command=self.fit_to_window)
         view_menu.add_command(label="实际大小", command=self.actual_size)
+        view_menu.add_separator()
+        self.tiled_mode_var = tk.BooleanVar(value=False)
+        view_menu.add_checkbutton(label="无限画布（分块缓存）", variable=self.tiled_mode_var,
+                                  command=self.toggle_tiled_mode)
+        self.zbuffer_var = tk.BooleanVar(value=False)
+        view_menu.add_checkbutton(label="3D深度缓冲渲染（需要NumPy）", variable=self.zbuffer_var,
+                                  command=self.toggle_zbuffer)
         
         # 帮助菜单
         help_menu = tk.Menu(menubar, tearoff=0)
@@ -195,19 +217,29 @@ class MainWindow:
         self.root.bind('<Control-v>', lambda e: self.paste())
         self.root.bind('<Control-a>', lambda e: self.select_all())
         self.root.bind('<Delete>', lambda e: self.delete())
+        self.root.bind('<Escape>', lambda e: self.cancel_loading())
+        self.root.bind('<Control-plus>', lambda e: self.zoom_in())
+        self.root.bind('<Control-equal>', lambda e: self.zoom_in())
+        self.root.bind('<Control-minus>', lambda e: self.zoom_out())
+        self.root.bind('<Control-0>', lambda e: self.actual_size())
         
         # 画布事件（2D模式）
         self.bind_canvas_2d_events()
 
     def bind_canvas_2d_events(self):
         # 解绑所有旧事件，然后绑定2D事件
-        for seq in ['<Button-1>', '<B1-Motion>', '<ButtonRelease-1>', '<Motion>', '<Button-3>', '<MouseWheel>']:
+        for seq in ['<Button-1>', '<B1-Motion>', '<ButtonRelease-1>', '<Motion>', '<Button-3>', '<MouseWheel>',
+                    '<Control-MouseWheel>', '<Button-2>', '<B2-Motion>']:
             self.canvas.unbind(seq)
         self.canvas.bind('<Button-1>', self.on_canvas_click)
         self.canvas.bind('<B1-Motion>', self.on_canvas_drag)
         self.canvas.bind('<ButtonRelease-1>', self.on_canvas_release)
         self.canvas.bind('<Motion>', self.on_canvas_motion)
         self.canvas.bind('<Button-3>', self.on_canvas_right_click)
+        # Ctrl+滚轮以鼠标位置为中心缩放，中键拖动平移
+        self.canvas.bind('<Control-MouseWheel>', self.on_canvas_zoom_wheel)
+        self.canvas.bind('<Button-2>', self.on_canvas_pan_start)
+        self.canvas.bind('<B2-Motion>', self.on_canvas_pan)
         
     def on_tool_selected(self, action, data=None):
         """工具选择和动作回调"""
@@ -270,31 +302,23 @@ class MainWindow:
         """属性改变回调"""
         if property_name == "color":
             self.drawing_manager.set_current_color(value)
-            # 同步到3D绘图管理器
+            # 同步到3D绘图管理器（同时应用到3D画布选中的形状并记录修改）
             if hasattr(self, 'drawing_manager3d'):
                 self.drawing_manager3d.set_current_color(value)
-            # 应用到3D画布选中的形状
-            if self.canvas3d and self.canvas3d.selected_shape:
-                self.canvas3d.selected_shape.set_color(value)
-                self.canvas3d.redraw()
         elif property_name == "fill_color":
             self.drawing_manager.set_current_fill_color(value)
-            # 同步到3D绘图管理器
+            # 同步到3D绘图管理器（同时应用到3D画布选中的形状并记录修改）
             if hasattr(self, 'drawing_manager3d'):
                 self.drawing_manager3d.set_current_fill_color(value)
-            # 应用到3D画布选中的形状
-            if self.canvas3d and self.canvas3d.selected_shape:
-                self.canvas3d.selected_shape.set_fill_color(value)
-                self.canvas3d.redraw()
         elif property_name == "line_width":
-            self.drawing_manager.set_current_line_width(value)
-            # 同步到3D绘图管理器
+            # 滑块拖动中：实时应用到选中的形状，松开时再记录撤销状态
+            self.drawing_manager.set_current_line_width(value, record=False)
+            if hasattr(self, 'drawing_manager3d'):
+                self.drawing_manager3d.set_current_line_width(value, record=False)
+        elif property_name == "line_width_commit":
+            self.drawing_manager.commit_property_edit()
             if hasattr(self, 'drawing_manager3d'):
-                self.drawing_manager3d.set_current_line_width(value)
-            # 应用到3D画布选中的形状
-            if self.canvas3d and self.canvas3d.selected_shape:
-                self.canvas3d.selected_shape.set_line_width(value)
-                self.canvas3d.redraw()
+                self.drawing_manager3d.commit_property_edit()
         elif property_name == "brush_size":
             self.drawing_manager.set_current_brush_size(value)
     
@@ -312,26 +336,22 @@ class MainWindow:
             
     def on_canvas_click(self, event):
         """画布点击事件"""
-        x = self.canvas.canvasx(event.x)
-        y = self.canvas.canvasy(event.y)
+        x, y = self.drawing_manager.window_to_world(event.x, event.y)
         self.drawing_manager.on_mouse_press(x, y, self.current_tool)
         
     def on_canvas_drag(self, event):
         """画布拖拽事件"""
-        x = self.canvas.canvasx(event.x)
-        y = self.canvas.canvasy(event.y)
+        x, y = self.drawing_manager.window_to_world(event.x, event.y)
         self.drawing_manager.on_mouse_drag(x, y)
         
     def on_canvas_release(self, event):
         """画布释放事件"""
-        x = self.canvas.canvasx(event.x)
-        y = self.canvas.canvasy(event.y)
+        x, y = self.drawing_manager.window_to_world(event.x, event.y)
         self.drawing_manager.on_mouse_release(x, y)
         
     def on_canvas_motion(self, event):
         """鼠标移动事件"""
-        x = self.canvas.canvasx(event.x)
-        y = self.canvas.canvasy(event.y)
+        x, y = self.drawing_manager.window_to_world(event.x, event.y)
         self.coord_label.config(text=f"坐标: ({int(x)}, {int(y)})")
         
         # 多边形绘制时的实时预览
@@ -346,6 +366,34 @@ class MainWindow:
         # 可以添加右键菜单
         pass
         
+    def on_canvas_zoom_wheel(self, event):
+        """Ctrl+滚轮缩放，鼠标下的点保持不动"""
+        if event.delta > 0:
+            changed = self.drawing_manager.zoom_in(event.x, event.y)
+        else:
+            changed = self.drawing_manager.zoom_out(event.x, event.y)
+        if changed:
+            self.update_zoom_status()
+        
+    def on_canvas_pan_start(self, event):
+        """中键按下：记录平移起点"""
+        self.canvas.scan_mark(event.x, event.y)
+        
+    def on_canvas_pan(self, event):
+        """中键拖动平移画布"""
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self.drawing_manager.refresh_view()
+        
+    def on_canvas_xview(self, *args):
+        """水平滚动画布"""
+        self.canvas.xview(*args)
+        self.drawing_manager.refresh_view()
+        
+    def on_canvas_yview(self, *args):
+        """垂直滚动画布"""
+        self.canvas.yview(*args)
+        self.drawing_manager.refresh_view()
+        
     def update_status(self, message):
         """更新状态栏"""
         self.status_label.config(text=message)
@@ -374,6 +422,7 @@ class MainWindow:
                 self.canvas3d = Canvas3D(self.canvas_frame)
                 self.drawing_manager3d.set_canvas3d(self.canvas3d)  # 连接管理器和画布
                 self.canvas3d.set_selection_callback(self.on_3d_shape_selected)  # 连接选择回调
+                self.canvas3d.set_zbuffer_enabled(self.zbuffer_var.get())
             self.canvas3d.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
             self.switch_btn.config(text="切换到2D")
             self.mode_label.config(text="当前模式: 3D", foreground="blue")
@@ -397,20 +446,19 @@ class MainWindow:
     def new_file(self):
         """新建文件"""
         self.drawing_manager.clear()
+        self.file_manager.mark_saved()
         self.update_status("新建文件")
         
     def open_file(self):
         """打开文件"""
         filename = filedialog.askopenfilename(
             title="打开文件",
-            filetypes=[("项目文件", "*.json"), ("所有文件", "*.*")]
+            filetypes=PROJECT_FILETYPES
         )
         if filename:
             try:
-                # 首先尝试检测文件类型
-                import json
-                with open(filename, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                # 首先尝试检测文件类型（只读取文件头元数据）
+                data = read_project_header(filename)
                 
                 file_mode = data.get('mode', '2D')
                 
@@ -425,22 +473,55 @@ class MainWindow:
                         elif file_mode == '2D' and self.mode == '3D':
                             self.toggle_mode()
                 
-                # 加载文件
-                if self.mode == '3D':
-                    self.drawing_manager3d.load_from_file(filename)
-                else:
-                    self.drawing_manager.load_from_file(filename)
-                    
-                self.update_status(f"打开文件: {filename}")
+                # 渐进式加载文件：首屏先显示，其余图形分批补齐
+                manager = self.drawing_manager3d if self.mode == '3D' else self.drawing_manager
+                manager.load_from_file_async(
+                    filename,
+                    on_progress=lambda count, progress: self.update_status(
+                        f"正在加载 {filename}: {progress:.0%}（已加载 {count} 个图形，按 Esc 取消）"),
+                    on_done=lambda count, cancelled, error: self.on_file_loaded(filename, count, cancelled, error))
+                # 加载完成前文档不属于任何文件：取消或失败后留下的部分文档按未命名文档自动保存，
+                # 不会写到原来打开的文件旁边
+                self.file_manager.set_current_file(None)
+                self.update_status(f"正在加载 {filename}...")
             except Exception as e:
                 messagebox.showerror("错误", f"无法打开文件: {str(e)}")
                 
+    def get_document_snapshot(self):
+        """获取当前模式下的文档快照（供自动保存使用）"""
+        if self.mode == '3D':
+            return self.drawing_manager3d.get_snapshot()
+        return self.drawing_manager.get_snapshot()
+        
+    def on_autosaved(self, path, error):
+        """自动保存完成回调"""
+        if error:
+            self.update_status(f"自动保存失败: {error}")
+        else:
+            self.update_status(f"已自动保存: {path}")
+            
+    def on_file_loaded(self, filename, count, cancelled, error):
+        """渐进式加载结束回调"""
+        if error:
+            messagebox.showerror("错误", f"无法打开文件: {str(error)}")
+        elif cancelled:
+            self.update_status(f"已取消加载: {filename}（保留已加载的 {count} 个图形）")
+        else:
+            self.file_manager.mark_saved(filename)
+            self.update_status(f"打开文件: {filename}")
+            
+    def cancel_loading(self):
+        """取消正在进行的文件加载"""
+        manager = self.drawing_manager3d if self.mode == '3D' else self.drawing_manager
+        if manager.is_loading():
+            manager.cancel_loading()
+                
     def save_file(self):
         """保存文件"""
         filename = filedialog.asksaveasfilename(
             title="保存文件",
             defaultextension=".json",
-            filetypes=[("项目文件", "*.json"), ("所有文件", "*.*")]
+            filetypes=PROJECT_FILETYPES
         )
         if filename:
             try:
@@ -448,6 +529,8 @@ class MainWindow:
                     self.drawing_manager3d.save_to_file(filename)
                 else:
                     self.drawing_manager.save_to_file(filename)
+                self.autosave_manager.discard()
+                self.file_manager.mark_saved(filename)
                 self.update_status(f"保存文件: {filename}")
             except Exception as e:
                 messagebox.showerror("错误", f"无法保存文件: {str(e)}")
@@ -593,21 +676,46 @@ class MainWindow:
         self.drawing_manager.clear_selection()
         self.update_status("已清除选中")
         
+    def update_zoom_status(self):
+        """在状态栏显示当前缩放比例"""
+        self.update_status(f"缩放: {self.drawing_manager.get_zoom() * 100:.0f}%")
+        
     def zoom_in(self):
         """放大"""
-        self.update_status("放大")
+        self.drawing_manager.zoom_in()
+        self.update_zoom_status()
         
     def zoom_out(self):
         """缩小"""
-        self.update_status("缩小")
+        self.drawing_manager.zoom_out()
+        self.update_zoom_status()
         
     def fit_to_window(self):
         """适应窗口"""
-        self.update_status("适应窗口")
+        self.drawing_manager.fit_to_window()
+        self.update_zoom_status()
         
     def actual_size(self):
         """实际大小"""
-        self.update_status("实际大小")
+        self.drawing_manager.actual_size()
+        self.update_zoom_status()
+        
+    def toggle_tiled_mode(self):
+        """切换无限画布模式"""
+        enabled = self.tiled_mode_var.get()
+        self.drawing_manager.set_tiled_mode(enabled)
+        self.update_status("无限画布已开启" if enabled else "无限画布已关闭")
+    
+    def toggle_zbuffer(self):
+        """切换3D深度缓冲渲染"""
+        enabled = self.zbuffer_var.get()
+        if enabled and not ZBUFFER_AVAILABLE:
+            self.zbuffer_var.set(False)
+            messagebox.showwarning("提示", "深度缓冲渲染需要安装NumPy")
+            return
+        if self.canvas3d:
+            self.canvas3d.set_zbuffer_enabled(enabled)
+        self.update_status("深度缓冲渲染已开启（面不绘制边框和线宽）" if enabled else "深度缓冲渲染已关闭")
         
     def show_help(self):
         """显示帮助"""
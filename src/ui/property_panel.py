@@ -62,6 +62,9 @@ class PropertyPanel:
                                    orient=tk.HORIZONTAL,
                                    command=self.on_line_width_change)
         line_width_scale.pack(fill=tk.X, pady=2)
+        # 拖动过程中只实时预览，松开滑块时才记录一次撤销状态
+        line_width_scale.bind("<ButtonRelease-1>", self.on_line_width_release)
+        self.last_line_width = 1
         
         self.line_width_label = ttk.Label(line_frame, text="1 像素")
         self.line_width_label.pack(anchor=tk.W)
@@ -116,10 +119,18 @@ class PropertyPanel:
     def on_line_width_change(self, value):
         """线宽改变回调"""
         width = int(float(value))
+        if width == self.last_line_width:
+            return  # 滑块每次移动都会回调，取整后未变化时忽略
+        self.last_line_width = width
         self.line_width_label.config(text=f"{width} 像素")
         if self.callback:
             self.callback("line_width", width)
             
+    def on_line_width_release(self, event=None):
+        """线宽滑块松开回调"""
+        if self.callback:
+            self.callback("line_width_commit", self.last_line_width)
+            
     def on_brush_size_change(self, value):
         """笔刷大小改变回调"""
         size = int(float(value))
@@ -165,6 +176,7 @@ class PropertyPanel:
             
         if hasattr(shape, 'line_width') and shape.line_width:
             self.line_width_var.set(shape.line_width)
+            self.last_line_width = shape.line_width
             self.line_width_label.config(text=f"{shape.line_width} 像素")
     
     def hide_fill_controls(self):
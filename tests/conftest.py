@@ -0,0 +1,21 @@
+"""
+测试公共设置 - 把 src 加入模块搜索路径，并提供多个测试共用的测试替身
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+
+class Box:
+    """只有边界框的测试图形"""
+
+    def __init__(self, x1, y1, x2, y2):
+        self.bounds = (x1, y1, x2, y2)
+
+    def get_bounds(self):
+        return self.bounds
+
+    def move(self, dx, dy):
+        x1, y1, x2, y2 = self.bounds
+        self.bounds = (x1 + dx, y1 + dy, x2 + dx, y2 + dy)
@@ -0,0 +1,153 @@
+"""
+自动保存测试 - 后台写入、正式保存后删除、从自动保存文件恢复文档
+"""
+import os
+import tempfile
+
+import pytest
+
+from managers.autosave_manager import AutosaveManager
+from managers.file_manager import FileManager, read_project_data, write_project_data
+
+
+class _Root:
+    """只记录 after 回调的假 Tk 根窗口，由测试手动执行"""
+
+    def __init__(self):
+        self.pending = {}
+        self.next_id = 0
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.pending[self.next_id] = (ms, callback)
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def run_polls(self, manager):
+        """等后台写入结束，再执行轮询回调（定时器回调保留）"""
+        if manager._thread is not None:
+            manager._thread.join(5)
+        for after_id, (ms, callback) in sorted(self.pending.items()):
+            if ms == 100:
+                del self.pending[after_id]
+                callback()
+
+
+DOCUMENT = {'version': '1.0', 'mode': '2D',
+            'shapes': [{'type': 'line', 'x1': 0, 'y1': 0, 'x2': 10.5, 'y2': 20, 'color': '#ff0000'}]}
+
+
+@pytest.fixture
+def untitled_dir(tmp_path, monkeypatch):
+    """未命名文档的自动保存文件写到测试目录"""
+    directory = tmp_path / 'untitled'
+    directory.mkdir()
+    monkeypatch.setattr(tempfile, 'tempdir', str(directory))
+    return directory
+
+
+def _autosave(tmp_path, current_file='drawing.json'):
+    file_manager = FileManager()
+    if current_file:
+        file_manager.mark_saved(str(tmp_path / current_file))
+    root = _Root()
+    saved = []
+    manager = AutosaveManager(root, file_manager, lambda: dict(DOCUMENT),
+                              on_saved=lambda path, error: saved.append((path, error)))
+    return file_manager, root, manager, saved
+
+
+def test_write_and_recover(tmp_path):
+    file_manager, root, manager, saved = _autosave(tmp_path)
+    # 未修改时不写入
+    assert not manager.autosave_now()
+
+    file_manager.mark_modified()
+    assert manager.autosave_now()
+    root.run_polls(manager)
+    path = str(tmp_path / 'drawing.autosave.gdsb')
+    assert saved == [(path, None)]
+    assert manager.last_autosave_path == path
+    # 恢复：自动保存文件读回的就是当时的文档快照
+    assert read_project_data(path) == DOCUMENT
+
+    # 快照之后没有新的修改时不再重复写入
+    assert not manager.autosave_now()
+    file_manager.mark_modified()
+    assert manager.autosave_now()
+    root.run_polls(manager)
+    assert len(saved) == 2
+
+
+def test_discard_after_explicit_save(tmp_path):
+    file_manager, root, manager, saved = _autosave(tmp_path)
+    file_manager.mark_modified()
+    manager.autosave_now()
+    root.run_polls(manager)
+    path = manager.last_autosave_path
+    assert os.path.exists(path)
+
+    write_project_data(file_manager.current_file, DOCUMENT)
+    manager.discard()
+    file_manager.mark_saved(file_manager.current_file)
+    assert not os.path.exists(path)
+    assert manager.last_autosave_path is None
+    assert not manager.autosave_now()
+
+
+class _AliveThread:
+    """模拟仍在写入的后台线程"""
+
+    def is_alive(self):
+        return True
+
+    def join(self, timeout=None):
+        pass
+
+
+def test_discard_during_write_removes_file_afterwards(tmp_path):
+    file_manager, root, manager, saved = _autosave(tmp_path)
+    file_manager.mark_modified()
+    manager.autosave_now()
+    manager._thread.join(5)
+    manager._thread = _AliveThread()  # 模拟写入尚未结束
+    manager.discard()
+    manager._thread = None
+    root.run_polls(manager)
+    assert saved and not os.path.exists(saved[0][0])
+    assert manager.last_autosave_path is None
+
+
+def test_untitled_document_autosaves_to_temp_dir(tmp_path, untitled_dir):
+    file_manager, root, manager, saved = _autosave(tmp_path, current_file=None)
+    file_manager.mark_modified()
+    manager.autosave_now()
+    root.run_polls(manager)
+    assert os.path.dirname(saved[0][0]) == str(untitled_dir)
+    assert read_project_data(saved[0][0]) == DOCUMENT
+
+
+def test_partial_load_does_not_autosave_next_to_previous_file(tmp_path, untitled_dir):
+    file_manager, root, manager, saved = _autosave(tmp_path)
+    # 打开另一个文件：加载开始前文档脱离原文件，取消或失败后保留下的部分文档按未命名保存
+    file_manager.set_current_file(None)
+    file_manager.mark_modified()
+    manager.autosave_now()
+    root.run_polls(manager)
+    assert not os.path.exists(str(tmp_path / 'drawing.autosave.gdsb'))
+    assert os.path.dirname(saved[0][0]) == str(untitled_dir)
+
+
+def test_failed_write_is_reported(tmp_path):
+    file_manager, root, manager, saved = _autosave(tmp_path, current_file='missing/drawing.json')
+    file_manager.mark_modified()
+    manager.autosave_now()
+    root.run_polls(manager)
+    path, error = saved[0]
+    assert error is not None and not os.path.exists(path)
+    assert manager.last_autosave_path is None
+    # 失败后同一修改仍会重试
+    assert manager.autosave_now()
+    root.run_polls(manager)
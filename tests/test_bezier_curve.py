@@ -0,0 +1,140 @@
+"""
+贝塞尔曲线几何测试 - 精确边界框与距离计算对照密集采样结果
+"""
+import math
+
+import pytest
+
+from shapes import BezierCurve
+from shapes.bezier_curve import FLATNESS_EPSILON, FLATTEN_TOLERANCE
+
+
+SAMPLES = 4000
+
+CURVES = {
+    's_curve': ((0, 0), (10, 20), (30, -20.5), (40, 0)),
+    'loop': ((0, 0), (100, 100), (-50, 100), (50, 0)),
+    # 控制点共线且超出端点：曲线折返，极值在端点之外
+    'collinear': ((0, 0), (100, 0), (-80, 0), (20, 0)),
+    'collinear_diagonal': ((0, 0), (10, 10), (20, 20), (30, 30)),
+    # 控制点与端点重合
+    'coincident_all': ((5, 5), (5, 5), (5, 5), (5, 5)),
+    'coincident_handles': ((0, 0), (0, 0), (40, 10), (40, 10)),
+    # t=0.5 处导数为零的尖点
+    'cusp': ((0, 0), (100, 100), (0, 100), (100, 0)),
+    # 退化为二次曲线（导数的二次项系数为零）
+    'quadratic': ((0, 0), (20, 40), (40, 40), (60, 0)),
+}
+
+
+def _samples(curve):
+    return [curve.bezier_point(i / SAMPLES) for i in range(SAMPLES + 1)]
+
+
+def _polyline_distance(points, x, y):
+    best = math.inf
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        dx, dy = x2 - x1, y2 - y1
+        length_sq = dx * dx + dy * dy
+        t = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / length_sq))
+        best = min(best, math.hypot(x1 + t * dx - x, y1 + t * dy - y))
+    return best
+
+
+def _sampled_distance(curve, x, y):
+    return _polyline_distance(_samples(curve), x, y)
+
+
+@pytest.mark.parametrize('name', sorted(CURVES))
+def test_bounds_match_dense_sampling(name):
+    curve = BezierCurve(*CURVES[name])
+    x1, y1, x2, y2 = curve.get_bounds()
+    points = _samples(curve)
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    # 边界框包含所有采样点，且与采样结果的差距不超过采样误差
+    assert x1 <= min(xs) + 1e-9 and y1 <= min(ys) + 1e-9
+    assert x2 >= max(xs) - 1e-9 and y2 >= max(ys) - 1e-9
+    assert (min(xs) - x1, min(ys) - y1, x2 - max(xs), y2 - max(ys)) == pytest.approx((0, 0, 0, 0), abs=1e-4)
+
+
+def test_collinear_bounds_extend_past_endpoints():
+    curve = BezierCurve(*CURVES['collinear'])
+    x1, y1, x2, y2 = curve.get_bounds()
+    assert x1 < 0 and x2 > 20
+    assert y1 == y2 == 0
+
+
+@pytest.mark.parametrize('name', sorted(CURVES))
+def test_distance_matches_dense_sampling(name):
+    curve = BezierCurve(*CURVES[name])
+    x1, y1, x2, y2 = curve.get_bounds()
+    for i in range(7):
+        for j in range(7):
+            x = x1 - 10 + (x2 - x1 + 20) * i / 6
+            y = y1 - 10 + (y2 - y1 + 20) * j / 6
+            expected = _sampled_distance(curve, x, y)
+            assert curve.distance_to_point(x, y) == pytest.approx(expected, abs=FLATNESS_EPSILON + 1e-3)
+
+
+@pytest.mark.parametrize('name', sorted(CURVES))
+def test_distance_limit_only_decides_threshold(name):
+    curve = BezierCurve(*CURVES[name])
+    x1, y1, x2, y2 = curve.get_bounds()
+    for i in range(9):
+        x = x1 - 5 + (x2 - x1 + 10) * i / 8
+        y = (y1 + y2) / 2 + 3
+        exact = curve.distance_to_point(x, y)
+        for limit in (1, 5, 20):
+            result = curve.distance_to_point(x, y, limit)
+            if exact <= limit - FLATNESS_EPSILON:
+                assert result <= limit
+            elif exact > limit + FLATNESS_EPSILON:
+                assert result > limit
+
+
+def test_contains_point_uses_tolerance():
+    curve = BezierCurve(*CURVES['cusp'])
+    x, y = curve.bezier_point(0.5)
+    assert curve.contains_point(x, y)
+    assert curve.contains_point(x, y + 4)
+    assert not curve.contains_point(x, y - 30)
+    assert not curve.contains_point(-20, -20)
+
+
+@pytest.mark.parametrize('scale', [0.25, 1.0, 4.0])
+@pytest.mark.parametrize('name', sorted(CURVES))
+def test_flattening_stays_within_tolerance(name, scale):
+    curve = BezierCurve(*CURVES[name])
+    points = curve.get_curve_points(scale)
+    tolerance = FLATTEN_TOLERANCE / scale
+    assert points[0] == curve.p0 and points[-1] == curve.p3
+    # 折线顶点都在曲线上，曲线上每个采样点离折线都不超过容差
+    for x, y in points:
+        assert curve.distance_to_point(x, y) <= FLATNESS_EPSILON + 1e-9
+    for i in range(0, SAMPLES + 1, 20):
+        x, y = curve.bezier_point(i / SAMPLES)
+        assert _polyline_distance(points, x, y) <= tolerance + 1e-9
+
+
+def test_flattening_adapts_to_curvature_and_scale():
+    straight = BezierCurve(*CURVES['collinear_diagonal'])
+    assert len(straight.get_curve_points(1.0)) == 2
+    assert len(BezierCurve(*CURVES['coincident_all']).get_curve_points(1.0)) == 2
+
+    curve = BezierCurve(*CURVES['loop'])
+    coarse = curve.get_curve_points(0.25)
+    fine = curve.get_curve_points(4.0)
+    assert 2 < len(coarse) < len(fine)
+
+
+def test_flattened_polyline_is_cached_until_control_points_change():
+    curve = BezierCurve(*CURVES['s_curve'])
+    points = curve.get_curve_points(1.0)
+    assert curve.get_curve_points(1.0) is points
+    curve.move(5, -5)
+    moved = curve.get_curve_points(1.0)
+    assert moved is not points
+    assert len(moved) == len(points)
+    for (x, y), expected in zip(moved, points):
+        assert (x, y) == pytest.approx((expected[0] + 5, expected[1] - 5))
@@ -0,0 +1,105 @@
+"""
+二进制项目格式往返测试 - JSON 与 GDSB 两种格式读出的数据必须逐字节一致
+"""
+import json
+import random
+
+import pytest
+
+from managers.binary_format import encode_document, decode_document, iter_shape_records
+import shapes
+import shapes3d
+from shapes import Point, Line, Rectangle, Circle, Polygon, BezierCurve, BrushStroke
+from shapes3d import Point3D, Vector3D, Cube3D, Sphere3D, Pyramid3D, Cone3D
+
+
+def _brush(brush_type):
+    """按笔刷类型逐点绘制，生成喷雾散点、铅笔纹理等附加数据"""
+    random.seed(brush_type)
+    stroke = BrushStroke([], brush_type)
+    for i in range(20):
+        stroke.add_point(10 + i * 3.5, 20 + (i % 4))
+    return stroke
+
+
+def _shapes_2d():
+    # Image 图形依赖 PIL，其余用例不需要
+    pytest.importorskip('PIL')
+    from shapes import Image
+
+    rect = Rectangle(0, 0, 40, 30)
+    rect.fill_color = '#ff0000'
+    rect.line_width = 3
+    return [
+        Point(1, 2),
+        Point(1.5, 2.5, 4),
+        Line(0, 0, 100, 50.5),
+        rect,
+        Circle(50, 50, 12.5),
+        Polygon([(0, 0), (10, 0), (10.5, 8), (0, 8)]),
+        Polygon([(0, 0), (10, 0), (5, 8)]),
+        BezierCurve((0, 0), (10, 20), (30, 20.5), (40, 0)),
+        _brush('brush_ballpoint'),
+        _brush('brush_spray'),
+        _brush('brush_pencil'),
+        _brush('brush_highlighter'),
+        Image(0, 0, 64, 48),
+    ]
+
+
+def _shapes_3d():
+    cube = Cube3D(1, 2, 3, 2.5)
+    cube.set_rotation(0.5, 0, 1)
+    cube.set_scale(1, 2.0, 1)
+    return [Point3D(1, 2, 3), Vector3D(0.5, 0, 0), cube,
+            Sphere3D(0, 1, 0, 1.5), Pyramid3D(), Cone3D(-2, 0, 2.5)]
+
+
+def _assert_round_trip(data):
+    """JSON 文本 -> 字典 -> GDSB -> 字典 -> JSON 文本，与原文本一致"""
+    text = json.dumps(data, ensure_ascii=False)
+    loaded = json.loads(text)
+    encoded = encode_document(loaded)
+    assert json.dumps(decode_document(encoded), ensure_ascii=False) == text
+    # 逐条解码与整体解码一致
+    records = [json.dumps(record, ensure_ascii=False) for record in iter_shape_records(memoryview(encoded))]
+    assert records == [json.dumps(shape, ensure_ascii=False) for shape in loaded['shapes']]
+
+
+def test_round_trip_2d_shapes():
+    instances = _shapes_2d()
+    # 覆盖所有导出的图形类型
+    assert {type(shape).__name__ for shape in instances} == set(shapes.__all__) - {'BaseShape'}
+    _assert_round_trip({'version': '1.0', 'mode': '2D',
+                        'shapes': [shape.to_dict() for shape in instances]})
+
+
+def test_round_trip_3d_shapes():
+    instances = _shapes_3d()
+    assert {type(shape).__name__ for shape in instances} == set(shapes3d.__all__) - {'BaseShape3D'}
+    _assert_round_trip({'version': '1.0', 'mode': '3D',
+                        'shapes': [shape.to_dict() for shape in instances]})
+
+
+def test_mixed_numbers_keep_their_types():
+    _assert_round_trip({'shapes': [{
+        'type': 'test',
+        'mixed': [1, 2.5, 3],
+        'nested': [[1, 2], [3, 4.5]],
+        'floats': [1.0, 2.0],
+        'ints': [1, 2],
+        'big': [2 ** 53 + 1, 1],
+        'huge': [2 ** 70, 1],
+        'bools': [True, False, 1],
+        'strings': ['a', 'b', 'a'],
+        'empty': [],
+    }]})
+
+
+def test_record_lists_with_empty_dicts():
+    _assert_round_trip({'version': '1', 'shapes': [{
+        'type': 'line',
+        'meta': [{'a': 1}, {}],
+        'blank': [{}, {}],
+        'tail': [{'a': 1}, {'a': 2.5}, {}],
+    }]})
@@ -0,0 +1,146 @@
+"""
+网格地板测试 - 连成折线的网格与逐条近平面裁剪后投影的网格线在屏幕上重合
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from ui.camera3d import Camera
+from ui.grid3d import GridFloor
+
+WIDTH, HEIGHT = 400, 300
+TOLERANCE = 0.05  # 像素
+
+VIEWS = [
+    # (目标点, 视距, 偏航角, 俯仰角, 网格范围)
+    ((0, 0, 0), 20.0, 45.0, 30.0, 40),
+    ((0, 0, 0), 3.0, 10.0, 5.0, 30),       # 贴近地面，近平面切过网格
+    ((5, 0, -3), 8.0, 200.0, 70.0, 30),
+    ((0, 0, 0), 15.0, 120.0, -25.0, 30),   # 从地面下方仰视
+    ((0, 0, 0), 200.0, 30.0, 45.0, 400),   # 远处，次网格线隐藏
+]
+
+
+def _camera(target, distance, yaw, pitch):
+    camera = Camera()
+    camera.update(target, distance, yaw, pitch, WIDTH, HEIGHT)
+    return camera
+
+
+def _clip_to_screen(segment):
+    """Liang-Barsky 裁剪到屏幕矩形，返回可见部分或None"""
+    x1, y1, x2, y2 = segment
+    dx, dy = x2 - x1, y2 - y1
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x1), (dx, WIDTH - x1), (-dy, y1), (dy, HEIGHT - y1)):
+        if p == 0:
+            if q < 0:
+                return None
+            continue
+        t = q / p
+        if p < 0:
+            t0 = max(t0, t)
+        else:
+            t1 = min(t1, t)
+    if t0 >= t1:
+        return None
+    return (x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy)
+
+
+def _reference_segments(camera, values, grid_range):
+    """逐条网格线裁剪到近平面后投影，再裁剪到屏幕"""
+    starts = [(v, 0.0, -grid_range) for v in values] + [(-grid_range, 0.0, v) for v in values]
+    ends = [(v, 0.0, grid_range) for v in values] + [(grid_range, 0.0, v) for v in values]
+    visible = []
+    for segment in camera.project_segments(starts, ends):
+        if segment is not None:
+            segment = _clip_to_screen(segment)
+            if segment is not None:
+                visible.append(segment)
+    return np.asarray(visible, dtype=float).reshape(-1, 4)
+
+
+def _chain_segments(chains):
+    segments = []
+    for coords in chains:
+        for i in range(0, len(coords) - 2, 2):
+            segments.append(coords[i:i + 4])
+    return np.asarray(segments, dtype=float).reshape(-1, 4)
+
+
+def _sample(segments, count=25):
+    t = np.linspace(0, 1, count)[:, None, None]
+    points = segments[:, :2] + t * (segments[:, 2:] - segments[:, :2])
+    return points.reshape(-1, 2)
+
+
+def _distance(points, segments):
+    """每个点到线段集合的最近距离"""
+    a = segments[None, :, :2]
+    d = segments[None, :, 2:] - a
+    p = points[:, None, :]
+    length_sq = (d * d).sum(axis=2)
+    t = np.clip(((p - a) * d).sum(axis=2) / np.where(length_sq > 0, length_sq, 1), 0, 1)
+    closest = a + t[:, :, None] * d
+    return np.sqrt(((p - closest) ** 2).sum(axis=2)).min(axis=1)
+
+
+def _on_screen(points, margin=0.5):
+    return points[(points[:, 0] > margin) & (points[:, 0] < WIDTH - margin) &
+                  (points[:, 1] > margin) & (points[:, 1] < HEIGHT - margin)]
+
+
+@pytest.mark.parametrize('view', VIEWS)
+def test_major_chains_match_clipped_lines(view):
+    target, distance, yaw, pitch, grid_range = view
+    camera = _camera(target, distance, yaw, pitch)
+    floor = GridFloor()
+    rounded, minor, major = floor.get_lines(grid_range, 1)
+    _, major_chains, _ = floor.build(camera, grid_range, 1, distance)
+
+    reference = _reference_segments(camera, major, rounded)
+    chains = _chain_segments(major_chains)
+    assert len(reference) and len(chains)
+    # 每条网格线的可见部分都被折线覆盖
+    assert _distance(_sample(reference), chains).max() < TOLERANCE
+    # 折线在屏幕内的部分都落在某条网格线上（连接段只走屏幕外或最外圈主网格线）
+    points = _on_screen(_sample(chains))
+    assert _distance(points, reference).max() < TOLERANCE
+
+
+@pytest.mark.parametrize('view', VIEWS)
+def test_minor_chains_lie_on_grid_lines(view):
+    target, distance, yaw, pitch, grid_range = view
+    camera = _camera(target, distance, yaw, pitch)
+    floor = GridFloor()
+    rounded, minor, major = floor.get_lines(grid_range, 1)
+    minor_chains, _, alpha = floor.build(camera, grid_range, 1, distance)
+    assert 0.0 <= alpha <= 1.0
+    if alpha == 0:
+        assert minor_chains == []
+        return
+
+    points = _on_screen(_sample(_chain_segments(minor_chains)))
+    assert len(points)
+    # 连接段可能沿最外圈的主网格线走
+    lines = np.vstack((_reference_segments(camera, minor, rounded),
+                       _reference_segments(camera, major, rounded)))
+    assert _distance(points, lines).max() < TOLERANCE
+
+
+def test_grid_lines_are_cached_and_end_on_major_lines():
+    floor = GridFloor(major_every=5)
+    rounded, minor, major = floor.get_lines(12, 1)
+    assert rounded == 15
+    assert major == [-15.0, -10.0, -5.0, 0.0, 5.0, 10.0, 15.0]
+    assert len(minor) == 31 - len(major)
+    assert floor.get_lines(12, 1)[1] is minor
+    assert floor.get_lines(12, 2)[0] == 20
+
+
+def test_far_view_hides_minor_lines():
+    target, distance, yaw, pitch, grid_range = VIEWS[-1]
+    minor_chains, major_chains, alpha = GridFloor().build(
+        _camera(target, distance, yaw, pitch), grid_range, 1, distance)
+    assert alpha == 0.0 and minor_chains == [] and major_chains
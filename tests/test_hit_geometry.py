@@ -0,0 +1,84 @@
+"""
+点击判定几何测试 - 预计算的边表、包围盒与逐次计算的结果一致，几何变化后缓存随之失效
+"""
+import math
+
+import pytest
+
+from shapes import Line, Circle, Polygon
+from shapes.polygon import EDGE_GRID_MIN_VERTICES
+
+
+def _ray_cast(points, x, y):
+    """朴素射线法，作为参照"""
+    inside = False
+    j = len(points) - 1
+    for i in range(len(points)):
+        xi, yi = points[i]
+        xj, yj = points[j]
+        if ((yi > y) != (yj > y)) and (x < (xj - xi) * (y - yi) / (yj - yi) + xi):
+            inside = not inside
+        j = i
+    return inside
+
+
+def _star(count, cx=100.0, cy=100.0):
+    return [(cx + (80 if i % 2 else 30) * math.cos(2 * math.pi * i / count),
+             cy + (80 if i % 2 else 30) * math.sin(2 * math.pi * i / count)) for i in range(count)]
+
+
+def _grid(x1, y1, x2, y2, steps=41):
+    # 采样点避开整数坐标，不落在边或顶点上
+    for i in range(steps):
+        for j in range(steps):
+            yield (x1 + (x2 - x1) * (i + 0.37) / steps, y1 + (y2 - y1) * (j + 0.61) / steps)
+
+
+@pytest.mark.parametrize('count', [5, 12, EDGE_GRID_MIN_VERTICES, 400])
+def test_polygon_contains_matches_ray_cast(count):
+    polygon = Polygon(_star(count))
+    if count >= EDGE_GRID_MIN_VERTICES:
+        assert polygon.get_geometry()['bands'] is not None
+    for x, y in _grid(0, 0, 200, 200):
+        assert polygon.contains_point(x, y) == _ray_cast(polygon.points, x, y)
+
+
+def test_polygon_geometry_follows_point_changes():
+    polygon = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)])
+    assert polygon.contains_point(5, 5)
+    polygon.move(100, 0)
+    assert not polygon.contains_point(5, 5)
+    assert polygon.contains_point(105, 5)
+    assert polygon.get_bounds() == (100, 0, 110, 10)
+    polygon.add_point(105, 30)
+    assert polygon.get_bounds() == (100, 0, 110, 30)
+
+
+def test_line_contains_uses_segment_distance():
+    line = Line(0, 0, 100, 0)
+    assert line.contains_point(50, 4.9)
+    assert not line.contains_point(50, 5.1)
+    # 端点之外按到端点的距离判定
+    assert line.contains_point(103, 3)
+    assert not line.contains_point(104, 4)
+    line.move(0, 50)
+    assert not line.contains_point(50, 0)
+    assert line.contains_point(50, 50)
+    assert line.get_bounds() == (0, 50, 100, 50)
+
+
+def test_zero_length_line():
+    line = Line(10, 10, 10, 10)
+    assert line.contains_point(13, 14)
+    assert not line.contains_point(14, 14)
+
+
+def test_circle_contains_follows_radius_changes():
+    circle = Circle(0, 0, 10)
+    for x, y in _grid(-15, -15, 15, 15, 21):
+        assert circle.contains_point(x, y) == (x * x + y * y <= 100)
+    circle.radius_x = 20
+    assert circle.contains_point(15, 0)
+    assert circle.get_bounds() == (-20, -10, 20, 10)
+    circle.radius_y = 0
+    assert not circle.contains_point(0, 0)
@@ -0,0 +1,112 @@
+"""
+图像缓存测试 - LRU淘汰、内存统计、工作副本升级与金字塔层级选择
+"""
+
+import pytest
+
+pytest.importorskip('PIL')
+
+from PIL import Image as PILImage
+
+from shapes.image_cache import ImageCache, decode_image, image_nbytes, PYRAMID_MIN_SIZE
+
+
+@pytest.fixture
+def png(tmp_path):
+    path = str(tmp_path / 'photo.png')
+    PILImage.new('RGB', (1024, 768), 'blue').save(path)
+    return path
+
+
+def test_lru_evicts_oldest_but_keeps_newest():
+    cache = ImageCache(max_bytes=100)
+    cache._put('a', 'A', 40)
+    cache._put('b', 'B', 40)
+    cache._entries.move_to_end('a')  # a 最近使用
+    cache._put('c', 'C', 40)
+    assert list(cache._entries) == ['a', 'c']
+    assert cache.total_bytes == 80
+    # 单项超过上限时淘汰其他所有项，但保留刚加入的项
+    cache._put('d', 'D', 500)
+    assert list(cache._entries) == ['d']
+    assert cache.total_bytes == 500
+
+
+def test_grow_counts_bytes_and_evicts_others():
+    cache = ImageCache(max_bytes=100)
+    cache._put('a', 'A', 30)
+    cache._put('b', 'B', 30)
+    cache._grow('b', 50)
+    assert list(cache._entries) == ['b']
+    assert cache._entries['b'][1] == 80
+    assert cache.total_bytes == 80
+    cache._remove('b')
+    cache._remove('missing')
+    assert cache.total_bytes == 0
+
+
+def test_working_copy_upgrade_invalidates_pyramid(png):
+    cache = ImageCache()
+    key = cache.file_key(png)
+    small = cache.get_working_image(key, (100, 75))
+    assert small.size == (205, 154)  # 不小于显示尺寸的两倍，由 reduce(5) 降采样解码
+    assert cache.total_bytes == image_nbytes(small)
+    cache.get_pyramid_level(key, (64, 48))
+    assert ('pyramid', key) in cache._entries
+
+    # 更小的副本不替换现有副本
+    cache._store_working_copy(key, PILImage.new('RGB', (128, 96)), False)
+    assert cache.get_working_image(key, (10, 10)) is small
+
+    # 需要更大尺寸时重新解码替换，旧副本的金字塔随之失效
+    large = cache.get_working_image(key, (300, 225))
+    assert large.width > small.width
+    assert ('pyramid', key) not in cache._entries
+    assert cache.total_bytes == image_nbytes(large)
+
+
+def test_pyramid_picks_smallest_sufficient_level(png):
+    cache = ImageCache()
+    key = cache.file_key(png)
+    source = cache.get_working_image(key, (512, 384))
+    assert source.size == (1024, 768)
+
+    level = cache.get_pyramid_level(key, (200, 150))
+    assert level.size == (256, 192)
+    # 目标尺寸之间的层级都已生成，命中缓存时返回同一对象
+    assert cache.get_pyramid_level(key, (250, 190)) is level
+    assert cache.get_pyramid_level(key, (300, 150)).size == (512, 384)
+    # 最小层级不低于 PYRAMID_MIN_SIZE
+    assert min(cache.get_pyramid_level(key, (1, 1)).size) >= PYRAMID_MIN_SIZE
+    # 超过工作副本时直接返回工作副本
+    assert cache.get_pyramid_level(key, (2000, 1500)) is source
+    pyramid, nbytes = cache._entries[('pyramid', key)]
+    assert nbytes == sum(image_nbytes(image) for image in pyramid[1:])
+
+
+def test_pyramid_without_working_copy(png):
+    cache = ImageCache()
+    key = cache.file_key(png)
+    assert cache.get_pyramid_level(key, (100, 75), decode=False) is None
+    assert cache.get_preview(key, (100, 75)) is None
+    assert not cache._entries
+
+
+def test_reduced_resolution_decode(png):
+    image, full = decode_image(png, (200, 150))
+    assert image.size == (205, 154) and not full
+    image, full = decode_image(png, (256, 192))
+    assert image.size == (256, 192) and not full
+    image, full = decode_image(png, (600, 450))
+    assert image.size == (1024, 768) and full
+    image, full = decode_image(png)
+    assert full
+
+
+def test_reduced_resolution_decode_jpeg(tmp_path):
+    path = str(tmp_path / 'photo.jpg')
+    PILImage.new('RGB', (1024, 768), 'green').save(path)
+    image, full = decode_image(path, (120, 90))
+    assert not full
+    assert image.width >= 120 and image.height >= 90
+    assert image.width <= 256
@@ -0,0 +1,58 @@
+"""
+图像图形测试 - 移动后模型坐标必须与画布项的位移一致，拖动缩放时不在Tk线程解码
+"""
+
+import pytest
+
+pytest.importorskip('PIL')
+
+from PIL import Image as PILImage
+
+import shapes.image
+from shapes import Rectangle, Image
+from shapes.image_cache import ImageCache
+
+
+def test_move_shifts_image_once():
+    image = Image(10, 20, 74, 68)
+    image.move(5, -3)
+    assert image.get_bounds() == (15, 17, 79, 65)
+    assert (image.x, image.y) == (47, 41)
+    assert (image.width, image.height) == (64, 48)
+
+
+def test_move_matches_rectangle():
+    image = Image(0, 0, 40, 30)
+    rect = Rectangle(0, 0, 40, 30)
+    for dx, dy in [(3, 4), (-10, 2.5), (0, -7)]:
+        image.move(dx, dy)
+        rect.move(dx, dy)
+    assert image.get_bounds() == rect.get_bounds()
+    assert image.contains_point(rect.x1 + 1, rect.y1 + 1)
+    assert not image.contains_point(rect.x2 + 1, rect.y2)
+
+
+class _Widget:
+    """只记录 after 调度的假控件"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay, callback):
+        self.scheduled.append(callback)
+
+
+def test_resize_preview_defers_decode(tmp_path, monkeypatch):
+    path = str(tmp_path / 'photo.png')
+    PILImage.new('RGB', (400, 300), 'red').save(path)
+    cache = ImageCache()
+    monkeypatch.setattr(shapes.image, 'image_cache', cache)
+    image = Image(0, 0, 200, 150, path)
+    image.canvas = _Widget()
+
+    image.resize_by_handle('se', 20, 15)
+    # 没有工作副本：预览为空（显示占位框），解码交给后台
+    assert image.tk_image is None
+    assert ('source', image.cache_key) not in cache._entries
+    assert ('variant', image.cache_key, image._display_size()) in cache._pending
+    assert image.canvas.scheduled
@@ -0,0 +1,174 @@
+"""
+项目流式读取测试 - 按任意块大小增量解析的结果必须与一次性 json.load 一致
+"""
+import json
+
+import pytest
+
+from managers.binary_format import encode_document
+from managers.drawing_manager3d import DrawingManager3D
+from managers.project_stream import ProjectStreamReader
+from managers.progressive_loader import ProgressiveLoader
+
+
+DOCUMENT = {
+    'version': '1.0',
+    'mode': '2D',
+    'shapes': [
+        {'type': 'line', 'x1': 0, 'y1': 0, 'x2': 100.25, 'y2': -50, 'color': '#000000'},
+        # 字符串里的括号、逗号、转义引号和反斜杠都不能被当成结构字符
+        {'type': 'text', 'label': 'a}b]{c[,"d"\\', 'escaped': '\\"}', 'unicode': '图形 ✓ é'},
+        {'type': 'polygon', 'points': [[0, 0], [10, 0], [5, 8.5]], 'meta': {'nested': [{}, []]}},
+        {'type': 'point', 'x': 12345678901234567890, 'y': 1e-7},
+    ],
+    'canvas': {'width': 800, 'height': 600},
+}
+
+
+def _write(tmp_path, text, name='project.json'):
+    path = tmp_path / name
+    path.write_bytes(text.encode('utf-8') if isinstance(text, str) else text)
+    return str(path)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, 1 << 16])
+@pytest.mark.parametrize('indent', [None, 2])
+def test_records_split_across_chunks(tmp_path, chunk_size, indent):
+    path = _write(tmp_path, json.dumps(DOCUMENT, ensure_ascii=False, indent=indent))
+    with ProjectStreamReader(path, chunk_size=chunk_size) as reader:
+        assert reader.header == {'version': '1.0', 'mode': '2D'}
+        assert list(reader) == DOCUMENT['shapes']
+        # shapes 之后的顶层字段在读完图形后补入 header
+        assert reader.header['canvas'] == DOCUMENT['canvas']
+        assert reader.shapes_read == len(DOCUMENT['shapes'])
+        assert reader.progress() == 1.0
+
+
+def test_utf8_bom_and_empty_shapes(tmp_path):
+    path = _write(tmp_path, b'\xef\xbb\xbf' + json.dumps({'mode': '3D', 'shapes': []}).encode('utf-8'))
+    with ProjectStreamReader(path, chunk_size=3) as reader:
+        assert reader.header == {'mode': '3D'}
+        assert list(reader) == []
+
+
+def test_binary_file(tmp_path):
+    path = _write(tmp_path, encode_document(DOCUMENT), 'project.gdsb')
+    with ProjectStreamReader(path) as reader:
+        assert reader.is_binary
+        assert reader.shape_count == len(DOCUMENT['shapes'])
+        assert list(reader) == DOCUMENT['shapes']
+
+
+@pytest.mark.parametrize('cut', [0.3, 0.6, 0.95])
+def test_truncated_file(tmp_path, cut):
+    text = json.dumps(DOCUMENT, ensure_ascii=False)
+    path = _write(tmp_path, text[:int(len(text) * cut)])
+    with pytest.raises(ValueError):
+        with ProjectStreamReader(path, chunk_size=5) as reader:
+            list(reader)
+
+
+def test_number_cut_by_chunk_boundary(tmp_path):
+    # 缓冲区恰好在数字中间结束时，必须读入后续数据再解析
+    path = _write(tmp_path, '{"shapes": [123456789, -2.5e10, 7]}')
+    for chunk_size in range(1, 12):
+        with ProjectStreamReader(path, chunk_size=chunk_size) as reader:
+            assert list(reader) == [123456789, -2.5e10, 7]
+
+
+def test_close_stops_iteration(tmp_path):
+    path = _write(tmp_path, json.dumps(DOCUMENT))
+    reader = ProjectStreamReader(path, chunk_size=8)
+    shapes = iter(reader)
+    assert next(shapes) == DOCUMENT['shapes'][0]
+    reader.close()
+    assert list(shapes) == []
+
+
+class _IdleWidget:
+    """只记录 after_idle 回调的假控件，由测试手动逐个执行"""
+
+    def __init__(self):
+        self.pending = {}
+        self.next_id = 0
+
+    def after_idle(self, callback):
+        self.next_id += 1
+        self.pending[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def run_one(self):
+        after_id = min(self.pending)
+        self.pending.pop(after_id)()
+
+
+def _loader(tmp_path, **kwargs):
+    path = _write(tmp_path, json.dumps(DOCUMENT))
+    widget = _IdleWidget()
+    batches, done = [], []
+    loader = ProgressiveLoader(widget, ProjectStreamReader(path, chunk_size=16),
+                               create_shape=lambda data: data['type'],
+                               add_batch=batches.append,
+                               on_done=lambda *args: done.append(args),
+                               time_budget_ms=0, max_budget_ms=0, **kwargs)
+    loader.start()
+    return loader, widget, batches, done
+
+
+def test_progressive_load_completes(tmp_path):
+    loader, widget, batches, done = _loader(tmp_path)
+    while widget.pending:
+        widget.run_one()
+    assert [shape for batch in batches for shape in batch] == [s['type'] for s in DOCUMENT['shapes']]
+    assert done == [(len(DOCUMENT['shapes']), False, None)]
+    assert loader.reader.header['canvas'] == DOCUMENT['canvas']
+
+
+def test_cancel_keeps_loaded_shapes(tmp_path):
+    loader, widget, batches, done = _loader(tmp_path)
+    widget.run_one()
+    loader.cancel()
+    assert not widget.pending
+    assert batches == [['line']]
+    assert done == [(1, True, None)]
+    # 取消后再次取消不会重复通知
+    loader.cancel()
+    assert len(done) == 1
+
+
+def test_silent_cancel_skips_on_done(tmp_path):
+    loader, widget, batches, done = _loader(tmp_path)
+    widget.run_one()
+    loader.cancel(silent=True)
+    assert loader.finished and not widget.pending
+    assert done == []
+
+
+def test_load_error_is_reported(tmp_path):
+    text = json.dumps(DOCUMENT)
+    path = _write(tmp_path, text[:len(text) // 2])
+    widget = _IdleWidget()
+    batches, done = [], []
+    loader = ProgressiveLoader(widget, ProjectStreamReader(path, chunk_size=16),
+                               create_shape=lambda data: data['type'],
+                               add_batch=batches.append,
+                               on_done=lambda *args: done.append(args))
+    loader.start()
+    while widget.pending:
+        widget.run_one()
+    count, cancelled, error = done[0]
+    assert not cancelled and isinstance(error, ValueError)
+    assert count == sum(len(batch) for batch in batches)
+
+
+def test_3d_load_requires_canvas(tmp_path):
+    path = _write(tmp_path, json.dumps(dict(DOCUMENT, mode='3D', shapes=[])))
+    manager = DrawingManager3D()
+    manager.shapes.append(manager.create_shape('cube3d'))
+    with pytest.raises(RuntimeError):
+        manager.load_from_file_async(path)
+    # 没有画布时不会清空当前文档
+    assert len(manager.shapes) == 1 and manager.loader is None
@@ -0,0 +1,67 @@
+"""
+属性修改测试 - 每次真实修改最多记录一条撤销状态，线宽滑块松开时才记录
+"""
+
+import pytest
+
+pytest.importorskip('PIL')
+
+from managers.drawing_manager import DrawingManager
+from managers.drawing_manager3d import DrawingManager3D
+from shapes import Line
+
+
+def _manager_2d():
+    manager = DrawingManager()
+    shape = Line(0, 0, 10, 10)
+    manager.shapes.append(shape)
+    manager.selected_shapes = [shape]
+    manager.save_state()
+    return manager, shape
+
+
+def _manager_3d():
+    manager = DrawingManager3D()
+    shape = manager.create_shape('cube3d')
+    manager.shapes.append(shape)
+    manager.selected_shapes = [shape]
+    manager.save_state()
+    return manager, shape
+
+
+@pytest.mark.parametrize('factory', [_manager_2d, _manager_3d])
+def test_unchanged_value_records_nothing(factory):
+    manager, shape = factory()
+    marks = []
+    manager.set_change_callback(lambda: marks.append(1))
+    manager.set_current_color('red')
+    manager.set_current_color('red')
+    manager.set_current_fill_color(shape.fill_color)
+    assert len(manager.history) == 2
+    assert len(marks) == 1
+    assert shape.color == 'red'
+
+
+@pytest.mark.parametrize('factory', [_manager_2d, _manager_3d])
+def test_slider_drag_records_once_on_release(factory):
+    manager, shape = factory()
+    marks = []
+    manager.set_change_callback(lambda: marks.append(1))
+    for width in (2, 3, 3, 4):
+        manager.set_current_line_width(width, record=False)
+    # 拖动中图形实时更新、文档标记为已修改，但不写撤销历史
+    assert shape.line_width == 4
+    assert len(manager.history) == 1
+    assert marks
+    manager.commit_property_edit()
+    manager.commit_property_edit()
+    assert len(manager.history) == 2
+    manager.undo()
+    assert manager.shapes[0].line_width != 4
+
+
+@pytest.mark.parametrize('factory', [_manager_2d, _manager_3d])
+def test_release_without_change_records_nothing(factory):
+    manager, _ = factory()
+    manager.commit_property_edit()
+    assert len(manager.history) == 1
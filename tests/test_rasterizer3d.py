@@ -0,0 +1,89 @@
+"""
+深度缓冲光栅化测试 - 批量扫描转换的结果与逐像素参照实现一致
+"""
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('PIL')
+
+from ui.rasterizer3d import ZBufferRasterizer, LARGE_TRIANGLE_PIXELS
+
+
+def _reference(width, height, polygons):
+    """逐像素参照：像素中心的重心坐标都不小于0即覆盖，1/深度线性插值，更近（更大）者写入"""
+    color = np.zeros((height, width, 4), dtype=np.uint8)
+    inv_depth = np.zeros((height, width))
+    py, px = np.mgrid[0:height, 0:width] + 0.5
+    for coords, depths, rgb in polygons:
+        for k in range(1, len(depths) - 1):
+            (x0, y0), (x1, y1), (x2, y2) = [(coords[2 * i], coords[2 * i + 1]) for i in (0, k, k + 1)]
+            area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+            if abs(area) < 1e-9:
+                continue
+            b0 = ((x1 - px) * (y2 - py) - (x2 - px) * (y1 - py)) / area
+            b1 = ((x2 - px) * (y0 - py) - (x0 - px) * (y2 - py)) / area
+            b2 = 1 - b0 - b1
+            z = b0 / depths[0] + b1 / depths[k] + b2 / depths[k + 1]
+            win = (b0 >= 0) & (b1 >= 0) & (b2 >= 0) & (z > inv_depth)
+            inv_depth[win] = z[win]
+            color[win] = (rgb[0], rgb[1], rgb[2], 255)
+    return color
+
+
+def _random_polygons(seed, count, size, width, height):
+    random.seed(seed)
+    polygons = []
+    for _ in range(count):
+        cx, cy = random.uniform(-10, width + 10), random.uniform(-10, height + 10)
+        sides = random.choice([3, 4, 5])
+        coords = []
+        for _ in range(sides):
+            coords += [cx + random.uniform(-size, size), cy + random.uniform(-size, size)]
+        depths = [random.uniform(1, 20) for _ in range(sides)]
+        polygons.append((coords, depths, tuple(random.randrange(256) for _ in range(3))))
+    return polygons
+
+
+def _mismatch(width, height, polygons):
+    image = np.asarray(ZBufferRasterizer().render(width, height, polygons))
+    expected = _reference(width, height, polygons)
+    return int((image != expected).any(axis=2).sum())
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_small_triangles_match_reference(seed):
+    # 随机坐标下像素中心恰好落在边上的概率可以忽略，结果应逐像素一致
+    assert _mismatch(96, 64, _random_polygons(seed, 150, 8, 96, 64)) == 0
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_large_and_mixed_triangles_match_reference(seed):
+    polygons = _random_polygons(seed, 12, 90, 160, 120) + _random_polygons(seed + 10, 80, 6, 160, 120)
+    random.Random(seed).shuffle(polygons)
+    assert _mismatch(160, 120, polygons) == 0
+
+
+def test_large_triangle_path_is_used():
+    side = int(LARGE_TRIANGLE_PIXELS ** 0.5) * 2
+    polygons = [([0, 0, side, 0, 0, side], [2, 2, 2], (255, 0, 0))]
+    assert _mismatch(side, side, polygons) == 0
+
+
+def test_nearer_face_wins_regardless_of_order():
+    far = ([0, 0, 40, 0, 40, 40, 0, 40], [10, 10, 10, 10], (0, 0, 255))
+    near = ([10, 10, 30, 10, 30, 30, 10, 30], [5, 5, 5, 5], (255, 0, 0))
+    for polygons in ([far, near], [near, far]):
+        image = np.asarray(ZBufferRasterizer().render(40, 40, polygons))
+        assert tuple(image[20, 20]) == (255, 0, 0, 255)
+        assert tuple(image[5, 5]) == (0, 0, 255, 255)
+
+
+def test_uncovered_pixels_stay_transparent():
+    polygons = [([2, 2, 8, 2, 2, 8], [1, 1, 1], (9, 9, 9)),
+                ([20, 20, 30, 20, 20, 20], [1, 1, 1], (9, 9, 9))]  # 退化三角形
+    image = np.asarray(ZBufferRasterizer().render(32, 32, polygons))
+    assert image[:, :, 3].sum() == 255 * _reference(32, 32, polygons)[:, :, 3].astype(bool).sum()
+    assert image[25, 25, 3] == 0
+    assert not np.asarray(ZBufferRasterizer().render(8, 8, []))[:, :, 3].any()
@@ -0,0 +1,94 @@
+"""
+空间索引测试 - 候选集合必须覆盖所有边界框与查询矩形相交的图形
+"""
+import random
+
+from conftest import Box
+from managers.spatial_index import SpatialIndex, MAX_CELLS_PER_SHAPE
+
+
+def _overlaps(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _exact(index, rect):
+    """候选集合再按边界框精确筛选"""
+    return {shape for shape in index.query(*rect) if _overlaps(shape.get_bounds(), rect)}
+
+
+def test_queries_across_cell_boundaries():
+    index = SpatialIndex(cell_size=10)
+    straddling = Box(8, 8, 12, 12)     # 横跨四个单元
+    negative = Box(-15, -5, -11, -1)   # 负坐标单元
+    edge = Box(20, 0, 20, 0)           # 恰好落在单元边界上的点
+    for shape in (straddling, negative, edge):
+        index.insert(shape)
+
+    assert len(index) == 3
+    assert straddling in index.query(0, 0, 9, 9)
+    assert straddling in index.query(11, 11, 19, 19)
+    assert negative in index.query(-12, -2, -12, -2)
+    assert edge in index.query(19.5, -1, 20, 1)
+    # 反向给出的矩形等价
+    assert index.query(20, 1, 19.5, -1) == index.query(19.5, -1, 20, 1)
+
+
+def test_matches_brute_force():
+    random.seed(37)
+    index = SpatialIndex(cell_size=32)
+    shapes = []
+    for _ in range(300):
+        x, y = random.uniform(-500, 500), random.uniform(-500, 500)
+        shapes.append(Box(x, y, x + random.uniform(0, 80), y + random.uniform(0, 80)))
+    index.rebuild(shapes)
+
+    for _ in range(200):
+        x, y = random.uniform(-600, 600), random.uniform(-600, 600)
+        # 小查询逐单元查找，大查询遍历已占用单元，两条路径都要覆盖
+        size = random.choice([5, 50, 2000])
+        rect = (x, y, x + size, y + size)
+        expected = {shape for shape in shapes if _overlaps(shape.get_bounds(), rect)}
+        assert _exact(index, rect) == expected
+
+
+def test_update_after_move_and_remove():
+    index = SpatialIndex(cell_size=10)
+    box = Box(0, 0, 5, 5)
+    other = Box(1, 1, 2, 2)
+    index.insert(box)
+    index.insert(other)
+
+    box.move(100, 100)
+    index.update(box)
+    assert box not in index.query(0, 0, 6, 6)
+    assert box in index.query(101, 101, 102, 102)
+    assert len(index) == 2
+
+    index.remove(box)
+    assert box not in index
+    assert box not in index.query(-1000, -1000, 1000, 1000)
+    assert index.query(0, 0, 6, 6) == {other}
+    # 重复删除、删除未登记的图形不报错
+    index.remove(box)
+    index.remove(Box(0, 0, 1, 1))
+
+    index.remove(other)
+    assert len(index) == 0
+    assert not index._cells
+
+
+def test_large_shapes_are_always_candidates():
+    index = SpatialIndex(cell_size=1)
+    side = int(MAX_CELLS_PER_SHAPE ** 0.5) + 2
+    large = Box(0, 0, side, side)
+    index.insert(large)
+    assert large in index.query(-50, -50, -40, -40)
+    assert not index._cells
+
+    large.bounds = (0, 0, 1, 1)
+    index.update(large)
+    assert large not in index.query(-50, -50, -40, -40)
+    assert large in index.query(0, 0, 0.5, 0.5)
+
+    index.clear()
+    assert len(index) == 0 and index.query(0, 0, 1, 1) == set()
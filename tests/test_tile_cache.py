@@ -0,0 +1,149 @@
+"""
+瓦片缓存测试 - 图形移动或样式变化后只丢弃受影响的瓦片
+"""
+from conftest import Box
+from managers.tile_cache import TileCache, SHAPE_PAD
+
+
+class _Scene:
+    """按边界框把图形渲染进瓦片的假渲染器，记录每次渲染"""
+
+    def __init__(self, shapes):
+        self.shapes = shapes
+        self.renders = []
+
+    def render(self, rect, scale):
+        x1, y1, x2, y2 = rect
+        drawn = [shape for shape in self.shapes
+                 if shape.bounds[0] - SHAPE_PAD <= x2 and x1 <= shape.bounds[2] + SHAPE_PAD
+                 and shape.bounds[1] - SHAPE_PAD <= y2 and y1 <= shape.bounds[3] + SHAPE_PAD]
+        self.renders.append(rect)
+        return object(), drawn
+
+
+def _filled(scene, region, scale=1.0, tile_size=100, max_tiles=100):
+    cache = TileCache(scene.render, tile_size=tile_size, max_tiles=max_tiles)
+    keys = cache.tile_keys(region, scale)
+    for key in keys:
+        cache.get(key)
+    return cache, keys
+
+
+def test_tile_keys_cover_region():
+    cache = TileCache(lambda rect, scale: (None, []), tile_size=100)
+    keys = cache.tile_keys((-50, 0, 150, 99), 1.0)
+    assert keys == [(1.0, -1, 0), (1.0, 0, 0), (1.0, 1, 0)]
+    assert cache.tile_rect((1.0, -1, 0)) == (-100, 0, 0, 100)
+    # 放大两倍时瓦片对应的世界尺寸减半
+    assert cache.tile_rect((2.0, 1, 1)) == (50, 50, 100, 100)
+    assert len(cache.tile_keys((0, 0, 99, 99), 2.0)) == 4
+
+
+def test_cached_tiles_are_reused():
+    scene = _Scene([Box(10, 10, 20, 20)])
+    cache, keys = _filled(scene, (0, 0, 299, 299))
+    assert len(scene.renders) == 9
+    images = [cache.peek(key) for key in keys]
+    assert [cache.get(key) for key in keys] == images
+    assert len(scene.renders) == 9
+
+
+def test_lru_eviction():
+    scene = _Scene([])
+    cache, keys = _filled(scene, (0, 0, 399, 99), max_tiles=3)
+    assert len(cache) == 3
+    assert keys[0] not in cache
+    cache.get(keys[1])  # 最近使用
+    cache.get(keys[0])
+    assert keys[1] in cache and keys[2] not in cache
+
+
+def test_move_invalidates_old_and_new_tiles_only():
+    box = Box(150, 150, 160, 160)
+    scene = _Scene([box])
+    cache, keys = _filled(scene, (0, 0, 499, 499))
+
+    box.bounds = (450, 450, 460, 460)
+    cache.invalidate_shape(box, True)
+    stale = {key for key in keys if key not in cache}
+    assert stale == {(1.0, 1, 1), (1.0, 4, 4)}
+
+    count = len(scene.renders)
+    for key in keys:
+        cache.get(key)
+    assert len(scene.renders) == count + 2
+
+
+def test_style_change_invalidates_rendered_tiles():
+    # 样式变化不改变边界框，渲染过该图形的瓦片（含线宽外扩范围）都要重画
+    box = Box(95, 95, 105, 105)
+    scene = _Scene([box])
+    cache, keys = _filled(scene, (0, 0, 299, 299))
+    cache.invalidate_shape(box, True)
+    assert {key for key in keys if key not in cache} == {
+        (1.0, 0, 0), (1.0, 1, 0), (1.0, 0, 1), (1.0, 1, 1)}
+
+
+def test_selected_shape_leaves_its_tiles():
+    box = Box(150, 150, 160, 160)
+    scene = _Scene([box])
+    cache, keys = _filled(scene, (0, 0, 299, 299))
+    # 选中后不再画进瓦片：只丢弃渲染过它的瓦片，移动后的位置不受影响
+    box.bounds = (250, 250, 260, 260)
+    cache.invalidate_shape(box, False)
+    assert {key for key in keys if key not in cache} == {(1.0, 1, 1)}
+    # 没有渲染记录时不再丢弃任何瓦片
+    cache.invalidate_shape(box, False)
+    assert len(cache) == 8
+
+
+def test_padding_reaches_neighbouring_tiles():
+    box = Box(100 + SHAPE_PAD - 1, 150, 100 + SHAPE_PAD + 5, 160)
+    scene = _Scene([box])
+    cache, keys = _filled(scene, (0, 0, 299, 299))
+    cache.invalidate_shape(box, True)
+    # 左侧瓦片在外扩范围内也要重画
+    assert (1.0, 0, 1) not in cache and (1.0, 1, 1) not in cache
+    assert (1.0, 2, 1) in cache
+
+
+def test_clear():
+    scene = _Scene([Box(0, 0, 1, 1)])
+    cache, keys = _filled(scene, (0, 0, 99, 99))
+    cache.clear()
+    assert len(cache) == 0 and cache.peek(keys[0]) is None
+
+
+def test_reserve_keeps_a_whole_pass_cached():
+    scene = _Scene([])
+    cache = TileCache(scene.render, tile_size=100, max_tiles=3)
+    keys = cache.tile_keys((0, 0, 399, 199), 1.0)
+    cache.reserve(len(keys))
+    assert cache.max_tiles == 2 * len(keys)
+    for key in keys:
+        cache.get(key)
+    # 同一次绘制渲染的瓦片不会互相淘汰，再次绘制时全部命中
+    assert all(key in cache for key in keys)
+    for key in keys:
+        cache.get(key)
+    assert len(scene.renders) == len(keys)
+    # 绘制区域变小时不降低上限
+    cache.reserve(1)
+    assert cache.max_tiles == 2 * len(keys)
+
+
+def test_eviction_forgets_shapes_only_in_evicted_tiles():
+    left = Box(10, 10, 20, 20)
+    both = Box(95, 10, 105, 20)
+    right = Box(250, 10, 260, 20)
+    scene = _Scene([left, both, right])
+    cache, keys = _filled(scene, (0, 0, 299, 99), max_tiles=2)
+    assert keys[0] not in cache
+    # 只出现在被淘汰瓦片中的图形不再保留渲染记录，仍在缓存瓦片中的图形保留
+    assert id(left) not in cache._rendered
+    assert id(both) in cache._rendered and id(right) in cache._rendered
+    cache.invalidate_shape(both, False)
+    assert id(both) not in cache._rendered
+    assert id(right) in cache._rendered
+    cache.clear()
+    assert not cache._rendered
@@ -0,0 +1,71 @@
+"""
+瓦片渲染测试 - 未选中图形渲染进瓦片后的样子要与屏幕绘制一致
+"""
+import random
+
+import pytest
+
+pytest.importorskip('PIL')
+
+from PIL import Image, ImageDraw
+
+from managers.drawing_manager import DrawingManager
+from shapes import Polygon, BrushStroke
+
+
+def _render(shape, size=120):
+    """按瓦片路径（export=False）把图形渲染到透明图像上"""
+    image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    DrawingManager().draw_shape_to_image(ImageDraw.Draw(image), shape, 0, 0, image, 1.0, export=False)
+    return image
+
+
+def _painted(image):
+    return [(x, y) for y in range(image.height) for x in range(image.width)
+            if image.getpixel((x, y))[3]]
+
+
+def _stroke(brush_type):
+    random.seed(brush_type)
+    stroke = BrushStroke([], brush_type)
+    stroke.color = '#0000ff'
+    stroke.brush_size = 10
+    for i in range(20):
+        stroke.add_point(10 + i * 4, 60 + (i % 3))
+    return stroke
+
+
+def test_spray_stroke_draws_only_its_dots():
+    stroke = _stroke('brush_spray')
+    painted = _painted(_render(stroke))
+    assert painted
+    # 每个着色像素都落在某个预生成散点上，而不是一条实心粗线
+    for x, y in painted:
+        assert any(abs(x - dx) <= size + 1 and abs(y - dy) <= size + 1
+                   for dx, dy, size in stroke.spray_dots)
+
+
+def test_pencil_stroke_uses_texture_colors():
+    stroke = _stroke('brush_pencil')
+    image = _render(stroke)
+    colors = {image.getpixel(point)[:3] for point in _painted(image)}
+    texture_colors = {item['color'] for item in stroke.pencil_texture}
+    assert len(texture_colors) > 1
+    assert len(colors) > 1
+
+
+def test_highlighter_stroke_is_half_transparent():
+    image = _render(_stroke('brush_highlighter'))
+    alphas = {image.getpixel(point)[3] for point in _painted(image)}
+    assert alphas == {128}
+    assert image.getpixel((40, 61))[:3] == (0, 0, 255)
+
+
+def test_polygon_outline_uses_line_width():
+    polygon = Polygon([(20, 20), (100, 20), (100, 100), (20, 100)])
+    polygon.line_width = 7
+    image = _render(polygon)
+    # 上边中点两侧各约 3 像素都在描边内，内部不填充
+    for y in range(17, 24):
+        assert image.getpixel((60, y))[3] == 255
+    assert image.getpixel((60, 60))[3] == 0
@@ -0,0 +1,115 @@
+"""
+近平面裁剪测试 - 齐次坐标中的裁剪结果与在世界空间中裁剪线段再投影一致
+"""
+import math
+import random
+
+import pytest
+
+from shapes3d import transform3d
+from shapes3d.transform3d import clip_polygon_near, project_segments, NUMPY_MIN_POINTS
+from ui.camera3d import Camera
+
+NEAR = 0.5
+
+
+def _camera():
+    camera = Camera(near=NEAR)
+    camera.update((0, 0, 0), 5.0, 30.0, 20.0, 400, 300)
+    return camera
+
+
+def _view_depth(camera, point):
+    return camera.world_to_view(*point)[2]
+
+
+def _world_clip(camera, start, end):
+    """参照：在世界空间中把线段截到视图深度 >= near 的一侧，再逐点投影"""
+    da, db = _view_depth(camera, start), _view_depth(camera, end)
+    if da < NEAR and db < NEAR:
+        return None
+
+    def lerp(s):
+        return tuple(a + s * (b - a) for a, b in zip(start, end))
+
+    if da < NEAR:
+        start = lerp((NEAR - da) / (db - da))
+    elif db < NEAR:
+        end = lerp((NEAR - da) / (db - da))
+    result = []
+    for point in (start, end):
+        x, y, z = camera.world_to_view(*point)
+        result += [camera.center[0] + camera.focal * x / z, camera.center[1] - camera.focal * y / z]
+    return tuple(result)
+
+
+def _random_segments(count, seed):
+    rng = random.Random(seed)
+    # 相机位于 (约4.07, 1.71, 2.35)，在其附近取点，保证大量线段跨越近平面
+    def point():
+        return (rng.uniform(-2, 8), rng.uniform(-2, 5), rng.uniform(-3, 7))
+    return [point() for _ in range(count)], [point() for _ in range(count)]
+
+
+def _assert_segments(camera, starts, ends):
+    result = project_segments(camera.view_projection_matrix, starts, ends, NEAR)
+    crossing = 0
+    for start, end, segment in zip(starts, ends, result):
+        expected = _world_clip(camera, start, end)
+        if expected is None:
+            assert segment is None
+            continue
+        crossing += (_view_depth(camera, start) < NEAR) != (_view_depth(camera, end) < NEAR)
+        assert segment == pytest.approx(expected, rel=1e-6, abs=1e-6)
+    return crossing
+
+
+def test_project_segments_matches_world_space_clipping(monkeypatch):
+    camera = _camera()
+    starts, ends = _random_segments(NUMPY_MIN_POINTS - 1, 49)
+    monkeypatch.setattr(transform3d, 'np', None)
+    assert _assert_segments(camera, starts, ends) > 0
+
+
+def test_project_segments_numpy_matches_pure_python(monkeypatch):
+    pytest.importorskip('numpy')
+    camera = _camera()
+    starts, ends = _random_segments(4 * NUMPY_MIN_POINTS, 50)
+    assert _assert_segments(camera, starts, ends) > 0
+    vectorized = project_segments(camera.view_projection_matrix, starts, ends, NEAR)
+    monkeypatch.setattr(transform3d, 'np', None)
+    pure = project_segments(camera.view_projection_matrix, starts, ends, NEAR)
+    for a, b in zip(vectorized, pure):
+        assert (a is None) == (b is None)
+        if a is not None:
+            assert a == pytest.approx(b, rel=1e-9, abs=1e-9)
+
+
+def _area(polygon):
+    return sum(p[0] * q[2] - q[0] * p[2] for p, q in zip(polygon, polygon[1:] + polygon[:1])) / 2
+
+
+def test_clip_polygon_keeps_front_side():
+    square = [(0.0, 0.0, -1.0), (2.0, 0.0, -1.0), (2.0, 0.0, 3.0), (0.0, 0.0, 3.0)]
+    clipped = clip_polygon_near(square, 1.0)
+    assert sorted(clipped) == sorted([(2.0, 0.0, 1.0), (2.0, 0.0, 3.0), (0.0, 0.0, 3.0), (0.0, 0.0, 1.0)])
+    # 顶点顺序（环绕方向）保持不变
+    assert math.copysign(1, _area(clipped)) == math.copysign(1, _area(square))
+    assert _area(clipped) == pytest.approx(_area(square) / 2)
+
+
+def test_clip_polygon_all_in_front_or_behind():
+    triangle = [(0.0, 0.0, 2.0), (1.0, 0.0, 3.0), (0.0, 1.0, 4.0)]
+    assert clip_polygon_near(triangle, 1.0) == triangle
+    assert clip_polygon_near(triangle, 5.0) == []
+    # 恰好在近平面上的顶点保留
+    assert clip_polygon_near(triangle, 2.0) == triangle
+
+
+def test_clip_triangle_with_one_vertex_behind_becomes_quad():
+    triangle = [(0.0, 0.0, 2.0), (4.0, 0.0, 2.0), (2.0, 4.0, -2.0)]
+    clipped = clip_polygon_near(triangle, 1.0)
+    assert len(clipped) == 4
+    assert all(w >= 1.0 for _, _, w in clipped)
+    # 交点位于原来的边上：W 从 2 到 -2，W=1 处为四分之一
+    assert (0.5, 1.0, 1.0) in clipped and (3.5, 1.0, 1.0) in clipped